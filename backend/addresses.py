@@ -0,0 +1,216 @@
+"""Address normalization for matching.
+
+CALSAWS sends "123 Maple St, Springfield, IL", CALPADS and the Faker data use
+other spellings of the same places ("123 MAPLE STREET APT. 4, Springfield, IL
+62701"). normalize_address parses one into street, unit, city, state and ZIP
+with USPS abbreviations, and its key is what two spellings of one address
+have in common:
+
+    "123 maple st #4|springfield"
+
+The unit designator is dropped ("Apt 4", "Unit 4" and "#4" are one unit), so
+is the state, and the ZIP only stands in for a missing city. Parsing is
+memoized on the raw string, since imports see the same addresses over and
+over.
+
+Beneficiary and Households store the key in an indexed AddressKey column, so
+lookups by address (household resolution) are index seeks. Rows written
+before the column existed are filled in by backfill_address_keys, which
+`python backend/households.py` runs before resolving; on its own:
+
+    python backend/addresses.py
+"""
+import argparse
+import re
+import sqlite3
+from functools import lru_cache
+from typing import NamedTuple
+
+import queries
+from db import DEFAULT_DB_PATH
+
+DB_PATH = DEFAULT_DB_PATH
+CACHE_SIZE = 200_000
+BACKFILL_BATCH_SIZE = 10_000
+
+STREET_SUFFIXES = {
+    'street': 'st', 'str': 'st', 'avenue': 'ave', 'av': 'ave', 'avn': 'ave', 'boulevard': 'blvd',
+    'road': 'rd', 'drive': 'dr', 'drv': 'dr', 'lane': 'ln', 'court': 'ct', 'place': 'pl',
+    'circle': 'cir', 'terrace': 'ter', 'parkway': 'pkwy', 'highway': 'hwy', 'square': 'sq',
+    'trail': 'trl', 'crossing': 'xing', 'heights': 'hts', 'center': 'ctr', 'freeway': 'fwy',
+    'expressway': 'expy', 'plaza': 'plz', 'ridge': 'rdg', 'route': 'rte', 'alley': 'aly',
+    'creek': 'crk', 'crescent': 'cres', 'extension': 'ext', 'grove': 'grv', 'harbor': 'hbr',
+    'hill': 'hl', 'junction': 'jct', 'lake': 'lk', 'landing': 'lndg', 'meadow': 'mdw',
+    'meadows': 'mdws', 'mount': 'mt', 'point': 'pt', 'station': 'sta', 'summit': 'smt',
+    'turnpike': 'tpke', 'valley': 'vly', 'view': 'vw', 'village': 'vlg', 'vista': 'vis',
+}
+SUFFIX_ABBREVIATIONS = set(STREET_SUFFIXES.values()) | {'way', 'loop', 'run', 'walk', 'path', 'pike'}
+DIRECTIONALS = {
+    'north': 'n', 'south': 's', 'east': 'e', 'west': 'w',
+    'northeast': 'ne', 'northwest': 'nw', 'southeast': 'se', 'southwest': 'sw',
+}
+UNIT_DESIGNATORS = {
+    '#', 'apt', 'apartment', 'unit', 'ste', 'suite', 'rm', 'room', 'fl', 'floor',
+    'bldg', 'building', 'lot', 'spc', 'space',
+}
+STATES = {
+    'alabama': 'al', 'alaska': 'ak', 'arizona': 'az', 'arkansas': 'ar', 'california': 'ca',
+    'colorado': 'co', 'connecticut': 'ct', 'delaware': 'de', 'florida': 'fl', 'georgia': 'ga',
+    'hawaii': 'hi', 'idaho': 'id', 'illinois': 'il', 'indiana': 'in', 'iowa': 'ia', 'kansas': 'ks',
+    'kentucky': 'ky', 'louisiana': 'la', 'maine': 'me', 'maryland': 'md', 'massachusetts': 'ma',
+    'michigan': 'mi', 'minnesota': 'mn', 'mississippi': 'ms', 'missouri': 'mo', 'montana': 'mt',
+    'nebraska': 'ne', 'nevada': 'nv', 'new hampshire': 'nh', 'new jersey': 'nj', 'new mexico': 'nm',
+    'new york': 'ny', 'north carolina': 'nc', 'north dakota': 'nd', 'ohio': 'oh', 'oklahoma': 'ok',
+    'oregon': 'or', 'pennsylvania': 'pa', 'rhode island': 'ri', 'south carolina': 'sc',
+    'south dakota': 'sd', 'tennessee': 'tn', 'texas': 'tx', 'utah': 'ut', 'vermont': 'vt',
+    'virginia': 'va', 'washington': 'wa', 'west virginia': 'wv', 'wisconsin': 'wi', 'wyoming': 'wy',
+    'district of columbia': 'dc', 'puerto rico': 'pr',
+}
+STATE_CODES = set(STATES.values())
+
+ZIP_PATTERN = re.compile(r'(\d{5})(?:-\d{4})?')
+PUNCTUATION = re.compile(r"[^a-z0-9#,\s-]+")
+
+
+class Address(NamedTuple):
+    street: str
+    unit: str
+    city: str
+    state: str
+    zip: str
+
+    @property
+    def key(self):
+        street = f"{self.street} #{self.unit}" if self.unit else self.street
+        locality = self.city or self.zip
+        return f"{street}|{locality}" if locality else street
+
+    @property
+    def completeness(self):
+        return sum(1 for part in (self.street, self.unit, self.city, self.state, self.zip) if part)
+
+
+def split_unit(tokens):
+    """(street tokens, unit) with the first unit designator and its value
+    taken out."""
+    for i, token in enumerate(tokens):
+        if token in UNIT_DESIGNATORS and i > 0:
+            unit = tokens[i + 1] if i + 1 < len(tokens) else ''
+            return tokens[:i] + tokens[i + 2:], unit
+        if token.startswith('#') and len(token) > 1:
+            return tokens[:i] + tokens[i + 1:], token[1:]
+    return tokens, ''
+
+
+def take_state_and_zip(tokens, strict=False):
+    """Strip a trailing ZIP and state off tokens; returns (tokens, state, zip).
+
+    strict is for addresses without commas, where "123 Main Ct" and "55
+    Washington" end in a street, not a state, unless a ZIP follows."""
+    zip_code = state = ''
+    if tokens and ZIP_PATTERN.fullmatch(tokens[-1]):
+        zip_code = tokens.pop()[:5]
+    strict = strict and not zip_code
+    if tokens and tokens[-1] in STATE_CODES and not (strict and tokens[-1] in SUFFIX_ABBREVIATIONS):
+        state = tokens.pop()
+    elif not strict:
+        for length in (3, 2, 1):
+            name = ' '.join(tokens[-length:])
+            if len(tokens) > length - 1 and name in STATES:
+                state = STATES[name]
+                del tokens[-length:]
+                break
+    if not zip_code and tokens and ZIP_PATTERN.fullmatch(tokens[-1]):
+        zip_code = tokens.pop()[:5]  # "Springfield 62701 IL"
+    return tokens, state, zip_code
+
+
+def abbreviate(tokens):
+    return [STREET_SUFFIXES.get(token) or DIRECTIONALS.get(token) or token for token in tokens]
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def normalize_address(raw):
+    """The parsed Address for a raw string, or None if there is nothing to
+    parse."""
+    if not raw:
+        return None
+    text = PUNCTUATION.sub(' ', raw.lower().replace('\n', ','))
+    text = text.replace('#', ' #')
+    parts = [part.split() for part in text.split(',')]
+    parts = [part for part in parts if part]
+    if not parts:
+        return None
+
+    street_tokens = parts[0]
+    locality = [token for part in parts[1:] for token in part]
+    if not locality:
+        # No commas: the city starts after the last street suffix or unit
+        street_tokens, state, zip_code = take_state_and_zip(list(street_tokens), strict=True)
+        split_at = None
+        for i, token in enumerate(street_tokens):
+            if i > 0 and (token in STREET_SUFFIXES or token in SUFFIX_ABBREVIATIONS):
+                split_at = i + 1
+        if split_at is not None:
+            if split_at < len(street_tokens) and street_tokens[split_at] in UNIT_DESIGNATORS:
+                split_at += 2
+            elif split_at < len(street_tokens) and street_tokens[split_at].startswith('#'):
+                split_at += 1
+            street_tokens, locality = street_tokens[:split_at], street_tokens[split_at:]
+    else:
+        locality, state, zip_code = take_state_and_zip(locality)
+
+    street_tokens, unit = split_unit(street_tokens)
+    street = ' '.join(abbreviate(street_tokens))
+    city = ' '.join(abbreviate(locality))
+    if not street and not city and not zip_code:
+        return None
+    return Address(street, unit.lstrip('#'), city, state, zip_code)
+
+
+def address_key(raw):
+    address = normalize_address(raw)
+    return None if address is None else address.key
+
+
+def preferred_address(*candidates):
+    """The most complete of several raw spellings of one address (the first
+    on a tie), e.g. the CALSAWS and CALPADS addresses of one person."""
+    best, best_score = None, -1
+    for raw in candidates:
+        address = normalize_address(raw)
+        score = -1 if address is None else address.completeness
+        if score > best_score:
+            best, best_score = raw, score
+    return best
+
+
+def backfill_address_keys(conn):
+    """Fill in AddressKey for Beneficiary and Households rows that don't have
+    one yet; the caller commits. Returns the number of rows updated."""
+    updated = 0
+    for select, update in (('addresses.beneficiaries_without_key', 'addresses.set_beneficiary_key'),
+                           ('addresses.households_without_key', 'addresses.set_household_key')):
+        after = -1
+        while True:
+            rows = queries.fetchall(conn, select, (after, BACKFILL_BATCH_SIZE))
+            if not rows:
+                break
+            keyed = [(address_key(row['Address']), row['RowID']) for row in rows]
+            keyed = [(key, row_id) for key, row_id in keyed if key is not None]
+            queries.executemany(conn, update, keyed)
+            updated += len(keyed)
+            after = rows[-1]['RowID']
+    return updated
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fill in AddressKey for existing beneficiaries and households")
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    conn.row_factory = sqlite3.Row
+    print(f"Done: {backfill_address_keys(conn)} address key(s) written")
+    conn.commit()
+    conn.close()
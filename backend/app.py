@@ -1,180 +1,71 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import sqlite3
-import hashlib
-from datetime import datetime
+"""Application factory for the CalEdu backend.
+
+One Flask app serves the staff, customer, import and reporting routes.
+Settings come from CALIEDU_* environment variables and can be overridden by
+passing a dict to create_app().
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for React frontend
+Run with:  flask --app backend/app.py run
+"""
+import os
+
+from flask import Flask
+from flask_cors import CORS
 
-def get_db_connection():
-    conn = sqlite3.connect('caliedu.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+from db import DEFAULT_DB_PATH, ConnectionPool
 
-# Authentication endpoints
-@app.route('/api/auth/login', methods=['POST'])
-def login():
-    data = request.get_json()
-    username = data.get('username')
-    password = data.get('password')
-    
-    conn = get_db_connection()
-    user = conn.execute(
-        'SELECT * FROM Users WHERE Username = ?', (username,)
-    ).fetchone()
-    conn.close()
-    
-    if user and user['PasswordHash'] == hashlib.sha256(password.encode()).hexdigest():
-        return jsonify({
-            'success': True,
-            'user': {
-                'id': user['UserID'],
-                'username': user['Username'],
-                'email': user['Email'],
-                'roleId': user['RoleID']
-            }
-        })
-    
-    return jsonify({'success': False, 'message': 'Invalid credentials'}), 401
 
-# Eligibility Records endpoints
-@app.route('/api/eligibility', methods=['GET'])
-def get_eligibility_records():
-    conn = get_db_connection()
-    records = conn.execute('''
-        SELECT e.*, h.HouseholdName, h.Address 
-        FROM EligibilityRecords e
-        LEFT JOIN Households h ON e.HouseholdID = h.HouseholdID
-    ''').fetchall()
-    conn.close()
-    
-    return jsonify([dict(record) for record in records])
+def default_config():
+    return {
+        'DB_PATH': DEFAULT_DB_PATH,
+        'DB_POOL_SIZE': int(os.environ.get('CALIEDU_DB_POOL_SIZE', 8)),
+        'SECRET_KEY': os.environ.get('CALIEDU_SECRET_KEY', 'your-secret-key-change-this'),
+        # Worker processes and threads per worker for the serving entry points
+        'WORKERS': int(os.environ.get('CALIEDU_WORKERS', 1)),
+        'THREADS': int(os.environ.get('CALIEDU_THREADS', 4)),
+        # Group commit for EligibilityApplications inserts
+        'APPLICATION_BATCH_SIZE': int(os.environ.get('CALIEDU_APPLICATION_BATCH_SIZE', 256)),
+        'APPLICATION_BATCH_WAIT': float(os.environ.get('CALIEDU_APPLICATION_BATCH_WAIT', 0.002)),
+        # Finished import jobs are deleted after this many days
+        'IMPORT_JOB_RETENTION_DAYS': int(os.environ.get('CALIEDU_IMPORT_JOB_RETENTION_DAYS', 7)),
+        # Sampling profiler, see request_metrics.py; 0 disables it
+        'PROFILE_SAMPLE_RATE': float(os.environ.get('CALIEDU_PROFILE_SAMPLE_RATE', 0)),
+        'PROFILE_DIR': os.environ.get('CALIEDU_PROFILE_DIR', 'profiles'),
+        # Start from a prebuilt image when DB_PATH doesn't exist, see snapshot.py
+        'SNAPSHOT_SCALE': int(os.environ['CALIEDU_SNAPSHOT_SCALE']) if 'CALIEDU_SNAPSHOT_SCALE' in os.environ else None,
+        'SNAPSHOT_SEED': int(os.environ.get('CALIEDU_SNAPSHOT_SEED', 0)),
+    }
 
-@app.route('/api/eligibility', methods=['POST'])
-def create_eligibility_record():
-    data = request.get_json()
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO EligibilityRecords 
-        (ParticipantID, IssuanceType, IssuanceAmount, IssuanceDate, ApprovalStatus, HouseholdID)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
-        data.get('participantId'),
-        data.get('issuanceType'),
-        data.get('issuanceAmount'),
-        data.get('issuanceDate'),
-        data.get('approvalStatus', 'Pending'),
-        data.get('householdId')
-    ))
-    
-    record_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    return jsonify({'success': True, 'id': record_id}), 201
 
-# Households endpoints
-@app.route('/api/households', methods=['GET'])
-def get_households():
-    conn = get_db_connection()
-    households = conn.execute('SELECT * FROM Households').fetchall()
-    conn.close()
-    
-    return jsonify([dict(household) for household in households])
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_mapping(default_config())
+    if config:
+        app.config.update(config)
 
-@app.route('/api/households', methods=['POST'])
-def create_household():
-    data = request.get_json()
-    
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        INSERT INTO Households (HouseholdName, Address)
-        VALUES (?, ?)
-    ''', (data.get('householdName'), data.get('address')))
-    
-    household_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
-    
-    return jsonify({'success': True, 'id': household_id}), 201
+    CORS(app)  # Enable CORS for React frontend
 
-# Documents endpoints
-@app.route('/api/documents/<int:eligibility_id>', methods=['GET'])
-def get_documents(eligibility_id):
-    conn = get_db_connection()
-    documents = conn.execute('''
-        SELECT d.*, u.Username as UploadedByName
-        FROM Documents d
-        LEFT JOIN Users u ON d.UploadedBy = u.UserID
-        WHERE d.EligibilityID = ?
-    ''', (eligibility_id,)).fetchall()
-    conn.close()
-    
-    return jsonify([dict(doc) for doc in documents])
+    if app.config['SNAPSHOT_SCALE'] is not None and not os.path.exists(app.config['DB_PATH']):
+        from snapshot import clone_snapshot
+        clone_snapshot(app.config['DB_PATH'], app.config['SNAPSHOT_SCALE'], app.config['SNAPSHOT_SEED'])
 
-# Users endpoints
-@app.route('/api/users', methods=['GET'])
-def get_users():
-    conn = get_db_connection()
-    users = conn.execute('''
-        SELECT u.UserID, u.Username, u.Email, u.RoleID, u.LastLogin, r.RoleName
-        FROM Users u
-        LEFT JOIN Roles r ON u.RoleID = r.RoleID
-    ''').fetchall()
-    conn.close()
-    
-    return jsonify([dict(user) for user in users])
+    # Imported here so that importing this module stays cheap
+    from ebt_cards import CardNumberAllocator
+    from write_queue import GroupCommitQueue
+    app.extensions['db_pool'] = ConnectionPool(app.config['DB_PATH'], app.config['DB_POOL_SIZE'])
+    app.extensions['card_allocator'] = CardNumberAllocator(app.config['DB_PATH'])
+    app.extensions['application_writer'] = GroupCommitQueue(
+        app.config['DB_PATH'],
+        max_batch=app.config['APPLICATION_BATCH_SIZE'],
+        max_wait=app.config['APPLICATION_BATCH_WAIT']
+    )
 
-# Reports endpoints
-@app.route('/api/reports/summary', methods=['GET'])
-def get_summary_report():
-    conn = get_db_connection()
-    
-    # Get total records
-    total_records = conn.execute('SELECT COUNT(*) as count FROM EligibilityRecords').fetchone()['count']
-    
-    # Get pending approvals
-    pending_approvals = conn.execute(
-        "SELECT COUNT(*) as count FROM EligibilityRecords WHERE ApprovalStatus = 'Pending'"
-    ).fetchone()['count']
-    
-    # Get approved records
-    approved_records = conn.execute(
-        "SELECT COUNT(*) as count FROM EligibilityRecords WHERE ApprovalStatus = 'Approved'"
-    ).fetchone()['count']
-    
-    conn.close()
-    
-    return jsonify({
-        'totalRecords': total_records,
-        'pendingApprovals': pending_approvals,
-        'approvedRecords': approved_records
-    })
+    import request_metrics
+    request_metrics.init_app(app)
 
-# Audit logs endpoints
-@app.route('/api/audit-logs', methods=['GET'])
-def get_audit_logs():
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    offset = (page - 1) * per_page
-    
-    conn = get_db_connection()
-    logs = conn.execute('''
-        SELECT a.*, u.Username
-        FROM AuditLogs a
-        LEFT JOIN Users u ON a.UserID = u.UserID
-        ORDER BY a.ActionDate DESC
-        LIMIT ? OFFSET ?
-    ''', (per_page, offset)).fetchall()
-    conn.close()
-    
-    return jsonify([dict(log) for log in logs])
+    from blueprints import customer, imports, reporting, staff
+    app.register_blueprint(staff.bp)
+    app.register_blueprint(customer.bp)
+    app.register_blueprint(imports.bp)
+    app.register_blueprint(reporting.bp)
 
-if __name__ == '__main__':
-    app.run(debug=True, port=5000)
+    return app
@@ -0,0 +1,158 @@
+"""Asyncio serving path for the customer API.
+
+    uvicorn --app-dir backend asgi:app --port 5000
+
+/api/customer/am-i-eligible is handled natively on the event loop, so an idle
+or slow client costs a coroutine rather than a worker thread. Its application
+insert goes through the app's application_writer (GroupCommitQueue) and is
+awaited without blocking the loop, so both serving paths commit applications
+the same way. Every other route is handed to the Flask app in a thread pool,
+so the full API stays available behind the same port.
+"""
+import asyncio
+import io
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from app import create_app
+from blueprints.customer import add_next_steps, calculate_eligibility, save_application
+
+
+async def read_body(receive):
+    body = b''
+    while True:
+        message = await receive()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def send_json(send, payload, status=200):
+    body = json.dumps(payload).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode()),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def check_eligibility(writer, body, send):
+    try:
+        data = json.loads(body or b'{}')
+
+        # Validate required fields
+        required_fields = ['household_size', 'monthly_income']
+        for field in required_fields:
+            if field not in data:
+                return await send_json(send, {'error': f'{field} is required'}, 400)
+
+        eligibility_result = calculate_eligibility(data)
+
+        # If customer is logged in, save the application
+        customer_id = data.get('customer_id')
+        if customer_id:
+            # Committed together with other requests' applications, as on
+            # the WSGI path
+            future = writer.submit(save_application, customer_id, data, eligibility_result)
+            eligibility_result['application_id'] = await asyncio.wait_for(asyncio.wrap_future(future), 30)
+
+        add_next_steps(eligibility_result)
+        await send_json(send, eligibility_result)
+
+    except Exception as e:
+        await send_json(send, {'error': str(e)}, 500)
+
+
+class WSGIFallback:
+    """Serve a request with the Flask app on a worker thread."""
+
+    def __init__(self, wsgi_app, max_threads=16):
+        self.wsgi_app = wsgi_app
+        self.executor = ThreadPoolExecutor(max_threads, thread_name_prefix='wsgi')
+
+    def environ(self, scope, body):
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'],
+            'QUERY_STRING': scope['query_string'].decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+        }
+        for name, value in scope['headers']:
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name == 'CONTENT_TYPE':
+                environ['CONTENT_TYPE'] = value
+            elif name != 'CONTENT_LENGTH':
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    def call(self, environ):
+        response = {}
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = int(status.split(' ', 1)[0])
+            response['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        result = self.wsgi_app(environ, start_response)
+        try:
+            body = b''.join(result)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], body
+
+    async def __call__(self, scope, body, send):
+        loop = asyncio.get_running_loop()
+        status, headers, body = await loop.run_in_executor(self.executor, self.call, self.environ(scope, body))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+def create_asgi_app(flask_app=None):
+    flask_app = flask_app or create_app()
+    fallback = WSGIFallback(flask_app.wsgi_app)
+    writer = flask_app.extensions['application_writer']
+
+    async def asgi_app(scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        body = await read_body(receive)
+        method, path = scope['method'], scope['path']
+
+        if method == 'POST' and path == '/api/customer/am-i-eligible':
+            return await check_eligibility(writer, body, send)
+
+        await fallback(scope, body, send)
+
+    return asgi_app
+
+
+app = create_asgi_app()
@@ -0,0 +1,124 @@
+"""Side-by-side benchmark of the async and Flask customer API.
+
+Opens many concurrent keep-alive connections with an asyncio client and posts
+eligibility checks (half anonymous, half saving an application) to gunicorn
+serving the Flask app and to uvicorn serving asgi.py.
+
+    python backend/async_benchmark.py --connections 2000 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def request_bytes(port, payload):
+    body = json.dumps(payload).encode()
+    return (
+        f"POST /api/customer/am-i-eligible HTTP/1.1\r\n"
+        f"Host: 127.0.0.1:{port}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n"
+    ).encode() + body
+
+
+async def read_response(reader):
+    headers = await reader.readuntil(b'\r\n\r\n')
+    status = int(headers.split(b' ', 2)[1])
+    length = 0
+    for line in headers.split(b'\r\n'):
+        if line.lower().startswith(b'content-length:'):
+            length = int(line.split(b':', 1)[1])
+    await reader.readexactly(length)
+    return status
+
+
+async def connection(port, requests, stop_at, latencies, errors):
+    try:
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    except OSError:
+        errors.append('connect')
+        return
+    n = 0
+    try:
+        while time.time() < stop_at:
+            started = time.perf_counter()
+            writer.write(requests[n % len(requests)])
+            n += 1
+            status = await read_response(reader)
+            if status == 200:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors.append(status)
+    except (OSError, asyncio.IncompleteReadError):
+        errors.append('io')
+    finally:
+        writer.close()
+
+
+async def drive(port, connections, duration):
+    requests = [
+        request_bytes(port, {'household_size': 4, 'monthly_income': 2500}),
+        request_bytes(port, {'household_size': 3, 'monthly_income': 4000, 'customer_id': 1}),
+    ]
+    latencies, errors = [], []
+    stop_at = time.time() + duration
+    await asyncio.gather(*[
+        connection(port, requests, stop_at, latencies, errors) for _ in range(connections)
+    ])
+    return latencies, errors
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] if values else 0.0
+
+
+def wait_until_up(port, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            asyncio.run(asyncio.wait_for(asyncio.open_connection('127.0.0.1', port), 1))
+            return
+        except (OSError, asyncio.TimeoutError):
+            time.sleep(0.2)
+    raise RuntimeError(f"Server on port {port} did not start")
+
+
+def run_server(name, command, port, connections, duration):
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_until_up(port)
+        latencies, errors = asyncio.run(drive(port, connections, duration))
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{name:<8} {len(latencies) / duration:>9.1f} req/s  "
+          f"p50 {percentile(latencies, 0.5) * 1000:>7.1f} ms  "
+          f"p99 {percentile(latencies, 0.99) * 1000:>7.1f} ms  "
+          f"errors {len(errors)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    # Every connection is a file descriptor on both ends
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, max(soft, args.connections * 2 + 256)), hard))
+
+    run_server('flask', [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                         '--bind', '127.0.0.1:5201', '--workers', str(args.workers), 'wsgi:app'],
+               5201, args.connections, args.duration)
+    run_server('asyncio', [sys.executable, '-m', 'uvicorn', '--port', '5202', '--workers', str(args.workers),
+                           '--log-level', 'warning', 'asgi:app'],
+               5202, args.connections, args.duration)
@@ -0,0 +1,41 @@
+"""Password and MFA helpers shared by the staff and customer blueprints."""
+import hashlib
+
+
+def hash_password(password):
+    """Simple password hashing - use bcrypt in production"""
+    return hashlib.sha256(password.encode()).hexdigest()
+ 
+def verify_password(password, hashed):
+    return hash_password(password) == hashed
+ 
+# pyotp and qrcode are only needed for MFA, so they are imported on first use
+# to keep worker startup fast
+
+def generate_mfa_secret():
+    import pyotp
+    return pyotp.random_base32()
+ 
+def verify_mfa_token(secret, token):
+    import pyotp
+    totp = pyotp.TOTP(secret)
+    return totp.verify(token, valid_window=1)
+
+def mfa_qr_code(secret, email):
+    """Base64 PNG of the provisioning QR code for an authenticator app."""
+    import base64
+    import io
+    import pyotp
+    import qrcode
+
+    totp_uri = pyotp.totp.TOTP(secret).provisioning_uri(
+        email,
+        issuer_name="CalEdu Benefits"
+    )
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data(totp_uri)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    img_buffer = io.BytesIO()
+    img.save(img_buffer, format='PNG')
+    return base64.b64encode(img_buffer.getvalue()).decode()
@@ -0,0 +1,287 @@
+"""Parallel import of a cycle's CALPADS/CALSAWS extracts.
+
+/api/import-data handles one payload in one transaction on the single SQLite
+writer. For a cycle's worth of county files this script instead parses and
+validates every file at once in worker processes, each writing its rows to
+its own staging database with journaling off. The merge step then attaches
+the staging databases to caliedu.db one at a time and copies the new rows
+in with a single INSERT ... SELECT each, so the main database is only
+written during that short final step. Reconciliation runs once at the end,
+for the rows that were inserted.
+
+Each file gets an ImportJobs row like an API import, and a file whose
+payload was already imported (see import_manifests.py) is not merged again.
+
+    python backend/batch_import.py extracts/*.json extracts/*.csv --workers 8
+
+JSON files hold the /api/import-data body ({"source": ..., "data": [...]})
+or a bare list of rows. For CSV files and bare lists the source is taken
+from the file name, which must contain CALPADS or CALSAWS.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sqlite3
+import time
+import uuid
+
+import queries
+from db import DEFAULT_DB_PATH
+from import_jobs import MAX_ERROR_SAMPLES, finish_job, save_progress, start_job
+from import_manifests import find_manifest, payload_hash, record_manifest, row_hash
+from dedup_errors import MAX_ROW_DATA
+from import_validation import RAW_TABLES, compile_validator, table_schema
+
+DB_PATH = DEFAULT_DB_PATH
+BATCH_SIZE = 10000
+
+
+def source_from_name(path):
+    name = os.path.basename(path).upper()
+    for source in RAW_TABLES:
+        if source in name:
+            return source
+    return None
+
+
+def read_file(path):
+    """(source, rows) for one extract."""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='') as f:
+            # Empty CSV cells are NULLs, as they would be in a JSON payload
+            rows = [{k: (v if v != '' else None) for k, v in row.items()} for row in csv.DictReader(f)]
+        return source_from_name(path), rows
+    with open(path) as f:
+        payload = json.load(f)
+    if isinstance(payload, list):
+        return source_from_name(path), payload
+    return payload.get('source') or source_from_name(path), payload.get('data', [])
+
+
+def relaxed_connection(path):
+    conn = sqlite3.connect(path)
+    # Staging files are thrown away if anything fails
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+def stage_file(job):
+    """Worker: parse and validate one file into its own staging database.
+
+    Valid rows go to its Staged table, normalized by the source's compiled
+    validator; rejected rows go to Rejected for DeduplicationErrors. When a
+    key appears more than once in a file the last row wins.
+    """
+    path, staging_path, schemas = job
+    started = time.time()
+    result = {'path': path, 'staging_path': staging_path, 'source': None, 'total': 0, 'staged': 0,
+              'errors': [], 'error_count': 0, 'failed': None, 'payload_hash': None}
+
+    def reject(index, message):
+        result['error_count'] += 1
+        if len(result['errors']) < MAX_ERROR_SAMPLES:
+            result['errors'].append({'row': index, 'error': message})
+
+    try:
+        source, rows = read_file(path)
+    except (OSError, ValueError, csv.Error) as e:
+        result['failed'] = f"Could not read {path}: {e}"
+        return result
+    source = (source or '').upper()
+    result['source'], result['total'] = source, len(rows)
+    if source not in RAW_TABLES:
+        result['failed'] = f"Unknown source for {path}"
+        return result
+
+    validator = compile_validator(source, schemas[source])
+    hashes = [row_hash(row) if isinstance(row, dict) else '' for row in rows]
+    result['payload_hash'] = payload_hash(source, hashes)
+    good, bad = validator.validate_batch(rows)
+    for index, message in bad:
+        reject(index, message)
+    staged = {}
+    for index, values in good:
+        staged[validator.key(values)] = (validator.key(values), hashes[index]) + values
+
+    conn = relaxed_connection(staging_path)
+    conn.execute(f"CREATE TABLE Staged (RowKey TEXT PRIMARY KEY, RowHash TEXT, {', '.join(validator.columns)})")
+    conn.execute("CREATE TABLE Rejected (RowIndex INT, Message TEXT, RowData TEXT)")
+    sql = f"INSERT INTO Staged VALUES ({', '.join(['?'] * (len(validator.columns) + 2))})"
+    values = list(staged.values())
+    conn.execute("BEGIN")
+    for start in range(0, len(values), BATCH_SIZE):
+        conn.executemany(sql, values[start:start + BATCH_SIZE])
+    conn.executemany("INSERT INTO Rejected VALUES (?, ?, ?)", [
+        (index, message[:255], json.dumps(rows[index], default=str)[:MAX_ROW_DATA]) for index, message in bad
+    ])
+    conn.commit()
+    conn.close()
+    result['staged'] = len(staged)
+    result['seconds'] = time.time() - started
+    return result
+
+
+def merge_staged(conn, result, retention_days):
+    """Copy one staged file into its raw table. Returns (job, inserted keys),
+    the job left in 'reconciling' when rows were inserted and finished
+    otherwise."""
+    job = start_job(conn, str(uuid.uuid4()), result['source'] or 'unknown', result['total'], retention_days)
+    job.error_count, job.errors = result['error_count'], list(result['errors'])
+    if result['failed']:
+        job.row_error(None, result['failed'])
+        finish_job(conn, job, 'failed')
+        return job, []
+
+    source = result['source']
+    earlier = find_manifest(conn, source, result['payload_hash'])
+    if earlier is not None:
+        job.unchanged = result['total']
+        job.duplicate_of = earlier['JobID']
+        finish_job(conn, job, 'done')
+        return job, []
+
+    validator = compile_validator(source, table_schema(conn, source))
+    table = validator.table
+    columns = ', '.join(validator.columns)
+    key_column = validator.key_column
+    timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
+    inserted_keys = []
+    conn.execute("ATTACH DATABASE ? AS staging", (result['staging_path'],))
+    try:
+        # Sort the staged keys before writing anything: new keys get inserted,
+        # keys stored with the same hash are matched, and keys stored with a
+        # different hash conflict. Only the first two go into the manifest
+        keyed_hashes = {}
+        conflicted = 0
+        for row in queries.execute_dynamic(conn, 'batch_import.classify_staged', f"""
+            SELECT s.RowKey, s.RowHash, r.RowHash AS StoredHash, r.{key_column} IS NOT NULL AS Stored
+            FROM staging.Staged s
+            LEFT JOIN main.{table} r ON r.{key_column} = s.RowKey
+        """):
+            if not row['Stored']:
+                inserted_keys.append(row['RowKey'])
+                keyed_hashes[row['RowKey']] = row['RowHash']
+            elif row['StoredHash'] == row['RowHash']:
+                keyed_hashes[row['RowKey']] = row['RowHash']
+            elif row['StoredHash'] is not None:
+                conflicted += 1
+
+        # Same rule as /api/import-data: a key already in the table is skipped
+        cursor = queries.execute_dynamic(conn, 'batch_import.merge_staged', f"""
+            INSERT INTO main.{table} ({columns}, RowHash, ImportTimestamp)
+            SELECT {columns}, RowHash, ? FROM staging.Staged s
+            WHERE NOT EXISTS (SELECT 1 FROM main.{table} r WHERE r.{key_column} = s.RowKey)
+        """, (timestamp,))
+        job.inserted = cursor.rowcount
+        job.skipped = result['staged'] - job.inserted
+        # ErrorID is a plain INT key; the write lock is held from the INSERT above
+        next_error_id = conn.execute("SELECT COALESCE(MAX(ErrorID), 0) + 1 FROM main.DeduplicationErrors").fetchone()[0]
+        queries.execute_dynamic(conn, 'batch_import.merge_rejected', """
+            INSERT INTO main.DeduplicationErrors (ErrorID, Source, RecordID, ErrorMessage, Reviewed, LoggedAt, JobID, RowData)
+            SELECT ? + ROW_NUMBER() OVER (ORDER BY RowIndex) - 1, ?, RowIndex, Message, 0, ?, ?, RowData
+            FROM staging.Rejected
+        """, (next_error_id, source, timestamp, job.job_id))
+        # Keys that were already imported with different data, logged the
+        # same way as by /api/import-data
+        next_error_id = conn.execute("SELECT COALESCE(MAX(ErrorID), 0) + 1 FROM main.DeduplicationErrors").fetchone()[0]
+        queries.execute_dynamic(conn, 'batch_import.merge_conflicts', f"""
+            INSERT OR IGNORE INTO main.DeduplicationErrors
+            (ErrorID, Source, RecordKey, MatchedRecord, ErrorMessage, Reviewed, LoggedAt, JobID, ConflictKey)
+            SELECT ? + ROW_NUMBER() OVER (ORDER BY s.RowKey) - 1, ?, s.RowKey, s.RowKey,
+                   substr('{key_column} ' || s.RowKey || ' was already imported with different data; '
+                          || 'import with mode ''cdc'' to apply the changes', 1, 255),
+                   0, ?, ?, 'import:' || ? || ':' || s.RowKey || ':' || s.RowHash
+            FROM staging.Staged s
+            JOIN main.{table} r ON r.{key_column} = s.RowKey
+            WHERE r.RowHash IS NOT NULL AND r.RowHash != s.RowHash
+        """, (next_error_id, source, timestamp, job.job_id, source))
+        if not job.error_count and not conflicted:
+            # Same rule as /api/import-data: rows that conflicted were never
+            # stored, so the payload mustn't short-circuit next time
+            record_manifest(conn, source, result['payload_hash'], job.job_id, keyed_hashes, result['total'])
+        if job.inserted:
+            save_progress(conn, job, 'reconciling')
+            conn.commit()
+        else:
+            finish_job(conn, job, 'done')
+    except sqlite3.Error as e:
+        conn.rollback()
+        inserted_keys = []
+        job.inserted = 0
+        job.row_error(None, e)
+        finish_job(conn, job, 'failed')
+    finally:
+        conn.execute("DETACH DATABASE staging")
+    return job, inserted_keys
+
+
+def run_import(paths, db_path=DB_PATH, workers=None):
+    from app import create_app
+    from reconciliation import reconcile_records
+
+    app = create_app({'DB_PATH': db_path})
+    retention_days = app.config['IMPORT_JOB_RETENTION_DAYS']
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    schemas = {source: table_schema(conn, source) for source in RAW_TABLES}
+
+    staging_dir = f"{db_path}.import-staging"
+    os.makedirs(staging_dir, exist_ok=True)
+    # Biggest files first so the pool isn't left waiting on one straggler
+    paths = sorted(paths, key=lambda p: -os.path.getsize(p) if os.path.exists(p) else 0)
+    jobs = [(path, os.path.join(staging_dir, f"{i}.db"), schemas) for i, path in enumerate(paths)]
+
+    jobs_to_reconcile = []
+    inserted_by_source = {}
+    try:
+        started = time.time()
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            results = list(pool.imap_unordered(stage_file, jobs))
+        print(f"Staged {len(results)} files in {time.time() - started:.1f}s")
+
+        started = time.time()
+        for result in sorted(results, key=lambda r: r['path']):
+            job, inserted_keys = merge_staged(conn, result, retention_days)
+            print(f"{result['path']}: {job.inserted} inserted, {job.skipped} skipped, "
+                  f"{job.unchanged} unchanged, {job.error_count} errors")
+            if job.inserted:
+                jobs_to_reconcile.append(job)
+                inserted_by_source.setdefault(result['source'], []).extend(inserted_keys)
+        print(f"Merged in {time.time() - started:.1f}s")
+    finally:
+        for _, staging_path, _ in jobs:
+            if os.path.exists(staging_path):
+                os.remove(staging_path)
+        os.rmdir(staging_dir)
+
+    failed = False
+    if jobs_to_reconcile:
+        # Only the people behind the inserted rows, as for an append import
+        with app.app_context():
+            for source, keys in inserted_by_source.items():
+                records = [(key, None) for key in keys]
+                failed = reconcile_records(source, records, status='eligible',
+                                           update_existing=False) is not None or failed
+    for job in jobs_to_reconcile:
+        if failed:
+            job.row_error(None, 'Reconciliation failed')
+        finish_job(conn, job, 'failed' if failed else 'done')
+    conn.close()
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('files', nargs='+', help='CALPADS/CALSAWS extracts (.json or .csv)')
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--workers', type=int, help='Parser processes (default: CPU count)')
+    args = parser.parse_args()
+    if not run_import(args.files, os.path.abspath(args.db), args.workers):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,444 @@
+"""Reproducible in-process benchmark of the API and the import path.
+
+Builds (or reuses) a seeded synthetic database at one of the standard scales,
+copies it to a scratch file, then drives each endpoint through the Flask test
+client and the import/reconciliation path with deterministic inputs. Results
+are written as JSON so two runs can be diffed, or checked against a baseline:
+
+    python backend/benchmark_suite.py --scale 10k --output bench-10k.json
+    python backend/benchmark_suite.py --scale 10k --baseline bench-10k.json
+
+With --baseline the run exits non-zero if any case's p50 got slower than the
+baseline by more than --threshold (default 20%).
+
+Datasets are cached in --data-dir by scale, seed and DATASET_VERSION, since
+the 10m one takes a while to generate. Bump DATASET_VERSION whenever the
+generator changes so old caches aren't compared against new ones.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+from auth import hash_password
+from metrics import percentile, query_stats
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+INIT_DB_SCRIPT = os.path.join(BACKEND_DIR, '..', 'init_db.py')
+
+SUITE_VERSION = 1
+DATASET_VERSION = 4
+SCALES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+DEFAULT_SEED = 20240601
+CHUNK_SIZE = 50_000
+
+FIRST_NAMES = [
+    'Maria', 'Jose', 'Sofia', 'Daniel', 'Emily', 'Michael', 'Camila', 'David', 'Isabella', 'James',
+    'Valeria', 'Anthony', 'Olivia', 'Christopher', 'Mia', 'Luis', 'Ava', 'Juan', 'Emma', 'Carlos',
+    'Abigail', 'Kevin', 'Ximena', 'Brian', 'Nathan', 'Chloe', 'Adrian', 'Aaliyah', 'Diego', 'Grace',
+]
+LAST_NAMES = [
+    'Garcia', 'Hernandez', 'Lopez', 'Martinez', 'Gonzalez', 'Rodriguez', 'Perez', 'Sanchez', 'Ramirez',
+    'Torres', 'Nguyen', 'Kim', 'Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Miller', 'Davis',
+    'Wilson', 'Anderson', 'Thomas', 'Lee', 'Chen', 'Wong', 'Patel', 'Flores', 'Rivera', 'Reyes', 'Cruz',
+]
+STREETS = ['Main St', 'Oak Ave', 'Pine St', 'Maple Dr', 'Cedar Ln', 'Elm St', 'Mission Blvd', 'Sunset Blvd']
+CITIES = ['Los Angeles', 'Fresno', 'Sacramento', 'San Jose', 'Oakland', 'Bakersfield', 'Riverside', 'Stockton']
+SCHOOLS = ['Lincoln Elementary', 'Washington Middle', 'Roosevelt High', 'Jefferson Elementary', 'Kennedy High']
+MEAL_STATUSES = ['Free', 'Reduced', 'Paid']
+PROGRAM_TYPES = ['CalFresh', 'CalWORKs', 'Medi-Cal']
+CASE_STATUSES = ['eligible', 'pending', 'denied']
+AUDIT_ACTIONS = ['LOGIN', 'LOGOUT', 'CREATE_CASE', 'UPDATE_CASE', 'DELETE_CASE', 'VIEW_REPORT']
+AUDIT_TABLES = ['Users', 'Beneficiary', 'EligibilityRecords', 'BenefitIssuances']
+STAFF_USERS = [
+    (1, 'admin', 'hashed_password_123', 'admin@caliedu.gov', 1),
+    (2, 'supervisor', 'hashed_password_456', 'supervisor@caliedu.gov', 2),
+    (3, 'caseworker1', 'hashed_password_789', 'worker1@caliedu.gov', 3),
+    (4, 'caseworker2', 'hashed_password_abc', 'worker2@caliedu.gov', 3),
+    (5, 'viewer', 'hashed_password_def', 'viewer@caliedu.gov', 4),
+]
+
+MASK64 = (1 << 64) - 1
+BASE_DOB = date(2006, 1, 1)
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def mix(x):
+    """splitmix64 finalizer: a cheap, stable hash of an integer."""
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def person(i, seed):
+    """Person i of the dataset. Derived from (seed, i) alone, so the CALPADS
+    and CALSAWS generators can refer to the same people without keeping
+    millions of them in memory."""
+    h = mix(seed * 1_000_003 + i)
+    return {
+        'SSID': f"{i + 1:010d}",
+        'FirstName': FIRST_NAMES[h % len(FIRST_NAMES)],
+        'LastName': LAST_NAMES[(h >> 8) % len(LAST_NAMES)],
+        'DOB': (BASE_DOB + timedelta(days=(h >> 16) % 6570)).isoformat(),
+        'Address': f"{(h >> 32) % 9999 + 1} {STREETS[(h >> 45) % len(STREETS)]}, "
+                   f"{CITIES[(h >> 50) % len(CITIES)]}, CA",
+        'hash': h,
+    }
+
+
+def timestamp(h, days=365):
+    return (BASE_TIME - timedelta(seconds=h % (days * 86400))).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def calpads_rows(seed, start, stop):
+    for i in range(start, stop):
+        p = person(i, seed)
+        h = p['hash']
+        yield (p['SSID'], p['FirstName'], p['LastName'], p['DOB'], p['Address'],
+               SCHOOLS[(h >> 20) % len(SCHOOLS)], (h >> 24) % 12 + 1,
+               MEAL_STATUSES[(h >> 28) % len(MEAL_STATUSES)], timestamp(h >> 3, 30))
+
+
+def calsaws_rows(seed, rows):
+    # Every other CALPADS student also has a CalSAWS case, so the
+    # reconciliation joins match about half of each side
+    for j in range(rows):
+        p = person(j * 2, seed)
+        h = p['hash']
+        yield (f"CS{j + 1:09d}", p['FirstName'], p['LastName'], p['DOB'], p['Address'],
+               PROGRAM_TYPES[(h >> 36) % len(PROGRAM_TYPES)], timestamp(h >> 5, 30))
+
+
+def beneficiary_rows(seed, rows):
+    for i in range(rows):
+        p = person(i, seed)
+        yield (i + 1, p['FirstName'], p['LastName'], p['SSID'], p['DOB'], p['Address'], str(i // 4 + 1))
+
+
+def case_rows(seed, rows):
+    for i in range(rows):
+        h = person(i, seed)['hash']
+        yield (f"{i + 1}-2025", i + 1, CASE_STATUSES[(h >> 40) % len(CASE_STATUSES)], timestamp(h >> 7),
+               MEAL_STATUSES[(h >> 28) % len(MEAL_STATUSES)])
+
+
+def audit_rows(seed, rows):
+    for i in range(rows):
+        h = mix(seed * 7_000_003 + i)
+        yield (i + 1, h % 5 + 1, AUDIT_ACTIONS[(h >> 8) % len(AUDIT_ACTIONS)],
+               AUDIT_TABLES[(h >> 16) % len(AUDIT_TABLES)], (h >> 24) % 100_000 + 1,
+               f"old-{h >> 40 & 0xffff:04x}", f"new-{h >> 24 & 0xffff:04x}", timestamp(h >> 11, 90))
+
+
+def insert_all(conn, sql, rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            conn.executemany(sql, chunk)
+            chunk = []
+    if chunk:
+        conn.executemany(sql, chunk)
+    conn.commit()
+
+
+def build_dataset(db_path, rows, seed):
+    """Create the schema with init_db.py, then fill the raw, beneficiary,
+    case and audit tables with `rows` rows each (CalSAWS gets half)."""
+    build_dir = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(build_dir, exist_ok=True)
+    schema_path = os.path.join(build_dir, 'caliedu.db')
+    if os.path.exists(schema_path):
+        raise RuntimeError(f"{schema_path} exists; use an empty --data-dir")
+    subprocess.run([sys.executable, os.path.abspath(INIT_DB_SCRIPT)], cwd=build_dir,
+                   check=True, stdout=subprocess.DEVNULL)
+    os.replace(schema_path, db_path)
+
+    conn = sqlite3.connect(db_path)
+    # Nothing to protect while building; a failed build is deleted anyway
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany("""
+        INSERT INTO Users (UserID, Username, PasswordHash, Email, RoleID)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(user_id, username, hash_password(password), email, role_id)
+          for user_id, username, password, email, role_id in STAFF_USERS])
+    insert_all(conn, """
+        INSERT INTO RawCALPADS
+        (SSID, FirstName, LastName, DOB, Address, SchoolName, Grade, MealStatus, ImportTimestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, calpads_rows(seed, 0, rows))
+    insert_all(conn, """
+        INSERT INTO RawCALSAWS
+        (CaseNumber, FirstName, LastName, DOB, Address, ProgramType, ImportTimestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, calsaws_rows(seed, rows // 2))
+    insert_all(conn, """
+        INSERT INTO Beneficiary (BeneficiaryID, FirstName, LastName, SSID, DOB, Address, HouseholdID)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, beneficiary_rows(seed, rows))
+    insert_all(conn, """
+        INSERT INTO CaseBenefit (CaseID, BeneficiaryID, Status, Created, EligibilityReason)
+        VALUES (?, ?, ?, ?, ?)
+    """, case_rows(seed, rows))
+    insert_all(conn, """
+        INSERT INTO AuditLogs
+        (LogID, UserID, Action, TableAffected, RecordID, OldValue, NewValue, ActionDate)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, audit_rows(seed, rows))
+    conn.execute("ANALYZE")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.close()
+
+
+def dataset_path(data_dir, scale, seed):
+    return os.path.join(data_dir, f"bench-{scale}-seed{seed}-v{DATASET_VERSION}.db")
+
+
+def ensure_dataset(data_dir, scale, rows, seed):
+    path = dataset_path(data_dir, scale, seed)
+    if os.path.exists(path):
+        return path, False
+    tmp_dir = os.path.join(data_dir, f"build-{os.getpid()}")
+    tmp_path = os.path.join(tmp_dir, 'dataset.db')
+    try:
+        build_dataset(tmp_path, rows, seed)
+        os.replace(tmp_path, path)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return path, True
+
+
+def table_counts(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ('RawCALPADS', 'RawCALSAWS', 'Beneficiary', 'CaseBenefit', 'AuditLogs')
+        }
+    finally:
+        conn.close()
+
+
+# (name, method, path, json body); deep pages are computed from the scale
+def endpoint_cases(rows):
+    last_page = max(1, rows // 50)
+    return [
+        ('GET /api/reports/summary', 'GET', '/api/reports/summary', None),
+        ('GET /api/users', 'GET', '/api/users', None),
+        ('POST /api/auth/login', 'POST', '/api/auth/login', {'username': 'admin', 'password': 'hashed_password_123'}),
+        ('POST /api/customer/am-i-eligible', 'POST', '/api/customer/am-i-eligible',
+         {'household_size': 4, 'monthly_income': 2500}),
+        ('GET /api/audit-logs first page', 'GET', '/api/audit-logs?page=1&per_page=50', None),
+        ('GET /api/audit-logs last page', 'GET', f'/api/audit-logs?page={last_page}&per_page=50', None),
+        ('GET /api/cases', 'GET', '/api/cases', None),
+        ('GET /api/results', 'GET', '/api/results', None),
+    ]
+
+
+def import_batch(source, seed, rows, run, size):
+    """A batch of new people, past the end of the generated dataset. The
+    server stamps ImportTimestamp itself, so it isn't sent."""
+    start = rows + run * size
+    if source == 'CALPADS':
+        keys = ['SSID', 'FirstName', 'LastName', 'DOB', 'Address', 'SchoolName', 'Grade', 'MealStatus']
+        return [dict(zip(keys, row)) for row in calpads_rows(seed, start, start + size)]
+    keys = ['CaseNumber', 'FirstName', 'LastName', 'DOB', 'Address', 'ProgramType']
+    rows = []
+    for i in range(start, start + size):
+        p = person(i, seed)
+        rows.append(dict(zip(keys, (f"CS-I{i:09d}", p['FirstName'], p['LastName'], p['DOB'], p['Address'],
+                                    PROGRAM_TYPES[(p['hash'] >> 36) % len(PROGRAM_TYPES)]))))
+    return rows
+
+
+def summarize(name, latencies, errors, started, finished):
+    total = finished - started
+    return {
+        'name': name,
+        'calls': len(latencies),
+        'errors': errors,
+        'total_seconds': round(total, 6),
+        'throughput_per_second': round(len(latencies) / total, 3) if total > 0 else None,
+        'mean_ms': round(sum(latencies) / len(latencies) * 1000, 3) if latencies else None,
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+        'p90_ms': round(percentile(latencies, 0.9) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        'max_ms': round(max(latencies) * 1000, 3) if latencies else None,
+        # Where the time went, from the named-query instrumentation
+        'top_queries': [
+            {k: (round(v, 6) if isinstance(v, float) else v) for k, v in q.items()}
+            for q in sorted(query_stats.snapshot(), key=lambda q: -q['total_seconds'])[:5]
+        ],
+    }
+
+
+def run_case(name, call, iterations, warmup, budget):
+    for _ in range(warmup):
+        call()
+    query_stats.reset()
+    latencies = []
+    errors = 0
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        if not call():
+            errors += 1
+        latencies.append(time.perf_counter() - t0)
+        # Full-table endpoints at 10m rows take seconds per call
+        if time.perf_counter() - started > budget:
+            break
+    return summarize(name, latencies, errors, started, time.perf_counter())
+
+
+def run_suite(db_path, rows, seed, args):
+    from app import create_app
+    from reconciliation import insert_beneficiary, insert_case_benefit
+
+    app = create_app({'DB_PATH': db_path, 'PROFILE_SAMPLE_RATE': 0.0})
+    client = app.test_client()
+    results = []
+
+    for name, method, path, body in endpoint_cases(rows):
+        if args.case and not any(c in name for c in args.case):
+            continue
+
+        def call(method=method, path=path, body=body):
+            response = client.open(path, method=method, json=body)
+            response.get_data()
+            return response.status_code < 400
+
+        results.append(run_case(name, call, args.iterations, args.warmup, args.budget))
+
+    # The import path changes the database, so each run gets a fresh batch and
+    # no warmup; the scratch copy is thrown away afterwards
+    for source in ('CALPADS', 'CALSAWS'):
+        name = f'POST /api/import-data {source} x{args.import_size}'
+        if args.case and not any(c in name for c in args.case):
+            continue
+        batches = iter([import_batch(source, seed, rows, run, args.import_size) for run in range(args.import_runs)])
+
+        def call(source=source, batches=batches):
+            response = client.post('/api/import-data', json={'source': source, 'data': next(batches)})
+            return response.status_code == 200
+
+        results.append(run_case(name, call, args.import_runs, 0, float('inf')))
+
+    for name, fn in (('reconciliation.insert_beneficiary', insert_beneficiary),
+                     ('reconciliation.insert_case_benefit', insert_case_benefit)):
+        if args.case and not any(c in name for c in args.case):
+            continue
+
+        def call(fn=fn):
+            with app.app_context():
+                return fn() is None  # both return an error response on failure
+
+        results.append(run_case(name, call, 1, 0, float('inf')))
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    previous = {r['name']: r for r in baseline['results']}
+    regressions = []
+    for r in results:
+        old = previous.get(r['name'])
+        if not old or not old['p50_ms'] or not r['p50_ms']:
+            continue
+        change = r['p50_ms'] / old['p50_ms'] - 1
+        if change > threshold:
+            regressions.append({'name': r['name'], 'baseline_p50_ms': old['p50_ms'],
+                                'p50_ms': r['p50_ms'], 'change': round(change, 3)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='10k')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--data-dir', default='bench-data', help='Where generated datasets are cached')
+    parser.add_argument('--iterations', type=int, default=50, help='Calls per endpoint case')
+    parser.add_argument('--warmup', type=int, default=2)
+    parser.add_argument('--budget', type=float, default=30.0, help='Max seconds per endpoint case')
+    parser.add_argument('--import-size', type=int, default=1000, help='Rows per import batch')
+    parser.add_argument('--import-runs', type=int, default=3)
+    parser.add_argument('--case', action='append', help='Only run cases whose name contains this (repeatable)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='Earlier JSON report to check for regressions')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    args = parser.parse_args()
+
+    rows = SCALES[args.scale]
+    os.makedirs(args.data_dir, exist_ok=True)
+    build_started = time.perf_counter()
+    dataset, built = ensure_dataset(args.data_dir, args.scale, rows, args.seed)
+    build_seconds = time.perf_counter() - build_started
+
+    work_path = os.path.join(args.data_dir, f"run-{os.getpid()}.db")
+    shutil.copyfile(dataset, work_path)
+    try:
+        report = {
+            'suite_version': SUITE_VERSION,
+            'dataset_version': DATASET_VERSION,
+            'scale': args.scale,
+            'rows': rows,
+            'seed': args.seed,
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'sqlite': sqlite3.sqlite_version,
+                'platform': platform.platform(),
+                'cpus': os.cpu_count(),
+            },
+            'dataset': {
+                'path': dataset,
+                'built': built,
+                'build_seconds': round(build_seconds, 3) if built else None,
+                'tables': table_counts(work_path),
+            },
+            'settings': {
+                'iterations': args.iterations,
+                'warmup': args.warmup,
+                'budget': args.budget,
+                'import_size': args.import_size,
+                'import_runs': args.import_runs,
+            },
+        }
+        # Route code print()s as it goes; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            report['results'] = run_suite(work_path, rows, args.seed, args)
+    finally:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(work_path + suffix):
+                os.remove(work_path + suffix)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline.get('scale'), baseline.get('seed')) != (args.scale, args.seed):
+            print('Baseline was run with a different scale or seed', file=sys.stderr)
+        report['regressions'] = compare(report['results'], baseline, args.threshold)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if report.get('regressions'):
+        for r in report['regressions']:
+            print(f"REGRESSION {r['name']}: p50 {r['baseline_p50_ms']}ms -> {r['p50_ms']}ms", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""Route blueprints registered by app.create_app()."""
@@ -0,0 +1,486 @@
+"""Customer-facing routes: registration, login, eligibility checks, document
+uploads, EBT replacement and program preferences."""
+import os
+import re
+import secrets
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, jsonify, request
+from werkzeug.utils import secure_filename
+
+from auth import generate_mfa_secret, hash_password, mfa_qr_code, verify_mfa_token, verify_password
+from customer_cache import cached_json_response, preferences_cache, profile_cache
+from db import get_db
+from document_worker import enqueue_document
+from ebt_cards import ReplacementLimitError, mask_card_number, replace_card
+from preferences import bulk_preference_rows, customer_preference_rows, import_opt_out_csv, upsert_preferences
+import queries
+
+bp = Blueprint('customer', __name__)
+
+# 2024 Federal Income Eligibility Guidelines (130% of poverty). Module level so
+# it is built once, before workers fork when the app is preloaded.
+INCOME_LIMITS = {
+    1: 1580, 2: 2137, 3: 2694, 4: 3250,
+    5: 3807, 6: 4364, 7: 4921, 8: 5478
+}
+INCOME_LIMIT_PER_EXTRA_MEMBER = 557
+
+def calculate_eligibility(application_data):
+    """Business rules engine for meal program eligibility"""
+    household_size = application_data['household_size']
+    monthly_income = application_data['monthly_income']
+    
+    # Calculate income limit for household size
+    if household_size <= 8:
+        income_limit = INCOME_LIMITS[household_size]
+    else:
+        income_limit = INCOME_LIMITS[8] + ((household_size - 8) * INCOME_LIMIT_PER_EXTRA_MEMBER)
+    
+    # Auto-qualify conditions
+    auto_qualify = (
+        application_data.get('receives_snap', False) or
+        application_data.get('receives_tanf', False) or
+        application_data.get('receives_fdpir', False) or
+        application_data.get('is_homeless', False)
+    )
+    
+    if auto_qualify:
+        return {
+            'eligible': True,
+            'category': 'Categorical',
+            'reason': 'Automatically qualified based on program participation',
+            'income_limit': income_limit,
+            'monthly_income': monthly_income
+        }
+    elif monthly_income <= income_limit:
+        return {
+            'eligible': True,
+            'category': 'Income',
+            'reason': f'Household income (${monthly_income}) is within limit (${income_limit})',
+            'income_limit': income_limit,
+            'monthly_income': monthly_income
+        }
+    else:
+        return {
+            'eligible': False,
+            'category': 'Income',
+            'reason': f'Household income (${monthly_income}) exceeds limit (${income_limit})',
+            'income_limit': income_limit,
+            'monthly_income': monthly_income
+        }
+ 
+def save_application(conn, customer_id, data, eligibility_result):
+    """Insert an EligibilityApplications row; the caller commits (normally the
+    group-commit writer, see write_queue.py)."""
+    c = queries.execute(conn, 'customer.insert_application', (
+        customer_id,
+        data['household_size'],
+        data['monthly_income'],
+        data.get('has_disability', 0),
+        data.get('is_pregnant', 0),
+        data.get('is_homeless', 0),
+        data.get('receives_snap', 0),
+        data.get('receives_tanf', 0),
+        data.get('receives_fdpir', 0),
+        'Eligible' if eligibility_result['eligible'] else 'Not Eligible'
+    ))
+    return c.lastrowid
+ 
+def add_next_steps(eligibility_result):
+    if eligibility_result['eligible']:
+        eligibility_result['next_steps'] = [
+            'Complete the full application',
+            'Upload required documents',
+            'Wait for application review',
+            'Receive your EBT card if approved'
+        ]
+    else:
+        eligibility_result['next_steps'] = [
+            'Check if you qualify for other programs',
+            'Contact your local office for assistance',
+            'Reapply if your circumstances change'
+        ]
+ 
+# === CUSTOMER REGISTRATION & LOGIN ===
+ 
+@bp.route('/api/customer/register', methods=['POST'])
+def customer_register():
+    try:
+        data = request.json
+        
+        # Validate required fields
+        required_fields = ['username', 'email', 'password', 'first_name', 'last_name']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        # Validate email format
+        email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+        if not re.match(email_pattern, data['email']):
+            return jsonify({'error': 'Invalid email format'}), 400
+        
+        # Validate password strength
+        if len(data['password']) < 8:
+            return jsonify({'error': 'Password must be at least 8 characters'}), 400
+        
+        conn = get_db()
+        
+        # Check if username or email already exists
+        if queries.fetchone(conn, 'customer.account_exists', (data['username'], data['email'])):
+            return jsonify({'error': 'Username or email already exists'}), 409
+        
+        # Hash password
+        password_hash = hash_password(data['password'])
+        
+        # Generate MFA secret if requested
+        mfa_secret = None
+        mfa_qr = None
+        if data.get('enable_mfa', False):
+            mfa_secret = generate_mfa_secret()
+            mfa_qr = mfa_qr_code(mfa_secret, data['email'])
+        
+        # Insert new customer
+        c = queries.execute(conn, 'customer.insert_account', (
+            data['username'],
+            password_hash,
+            data['email'],
+            data['first_name'],
+            data['last_name'],
+            data.get('dob'),
+            data.get('phone_number'),
+            data.get('preferred_language', 'en'),
+            1 if data.get('enable_mfa', False) else 0,
+            mfa_secret
+        ))
+        
+        customer_id = c.lastrowid
+        conn.commit()
+        conn.close()
+        
+        response = {
+            'success': True,
+            'customer_id': customer_id,
+            'message': 'Account created successfully'
+        }
+        
+        if mfa_qr:
+            response['mfa_qr_code'] = mfa_qr
+            response['mfa_secret'] = mfa_secret
+        
+        return jsonify(response), 201
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+@bp.route('/api/customer/login', methods=['POST'])
+def customer_login():
+    try:
+        data = request.json
+        username = data.get('username')
+        password = data.get('password')
+        mfa_token = data.get('mfa_token')
+        
+        if not username or not password:
+            return jsonify({'error': 'Username and password required'}), 400
+        
+        conn = get_db()
+        
+        # Get customer account
+        customer = queries.fetchone(conn, 'customer.account_for_login', (username, username))
+        if not customer or not verify_password(password, customer['PasswordHash']):
+            return jsonify({'error': 'Invalid credentials'}), 401
+        
+        # Check if account is active
+        if customer['AccountStatus'] != 'Active':
+            return jsonify({'error': 'Account is not active'}), 401
+        
+        # Check MFA if enabled
+        if customer['MFAEnabled']:
+            if not mfa_token:
+                return jsonify({
+                    'requires_mfa': True,
+                    'customer_id': customer['CustomerID']
+                }), 200
+            
+            if not verify_mfa_token(customer['MFASecret'], mfa_token):
+                return jsonify({'error': 'Invalid MFA token'}), 401
+
+
+ 
+  # Update last login
+        queries.execute(conn, 'customer.update_last_login', (datetime.now(), customer['CustomerID']))
+        
+        # Create session
+        session_token = secrets.token_urlsafe(32)
+        queries.execute(conn, 'customer.insert_session', (
+            customer['CustomerID'],
+            session_token,
+            1 if customer['MFAEnabled'] else 0,
+            datetime.now() + timedelta(hours=24),
+            request.remote_addr,
+            request.headers.get('User-Agent', '')
+        ))
+        
+        conn.commit()
+        conn.close()
+        profile_cache.invalidate(customer['CustomerID'])
+        
+        return jsonify({
+            'success': True,
+            'customer_id': customer['CustomerID'],
+            'session_token': session_token,
+            'customer': {
+                'username': customer['Username'],
+                'email': customer['Email'],
+                'first_name': customer['FirstName'],
+                'last_name': customer['LastName'],
+                'preferred_language': customer['PreferredLanguage']
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+@bp.route('/api/customer/profile/<int:customer_id>', methods=['GET'])
+def get_customer_profile(customer_id):
+    try:
+        def load_profile():
+            conn = get_db()
+            customer = queries.fetchone(conn, 'customer.profile', (customer_id,))
+            conn.close()
+            
+            return {'customer': dict(customer)} if customer else None
+        
+        response = cached_json_response(profile_cache, customer_id, load_profile)
+        if response is None:
+            return jsonify({'error': 'Customer not found'}), 404
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+# === ELIGIBILITY CHECKER ===
+ 
+@bp.route('/api/customer/am-i-eligible', methods=['POST'])
+def check_eligibility():
+    try:
+        data = request.json
+        
+        # Validate required fields
+        required_fields = ['household_size', 'monthly_income']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({'error': f'{field} is required'}), 400
+        
+        # Calculate eligibility
+        eligibility_result = calculate_eligibility(data)
+        
+        # If customer is logged in, save the application
+        customer_id = data.get('customer_id')
+        if customer_id:
+            # Committed together with other requests' applications; result()
+            # returns once this row is durable
+            writer = current_app.extensions['application_writer']
+            future = writer.submit(save_application, customer_id, data, eligibility_result)
+            eligibility_result['application_id'] = future.result(timeout=30)
+        
+        add_next_steps(eligibility_result)
+        
+        return jsonify(eligibility_result)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+ 
+ 
+ 
+@bp.route('/api/customer/documents/upload', methods=['POST'])
+def upload_documents():
+    try:
+        customer_id = request.form.get('customer_id')
+        application_id = request.form.get('application_id')
+        document_type = request.form.get('document_type')
+        
+        if not customer_id:
+            return jsonify({'error': 'Customer ID required'}), 400
+        
+        # Allowed file types
+        ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx'}
+        MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+        
+        def allowed_file(filename):
+            return '.' in filename and \
+                   filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+        
+        uploaded_files = []
+        
+        for file_key in request.files:
+            file = request.files[file_key]
+            
+            if file and file.filename and allowed_file(file.filename):
+                # Check file size
+                file.seek(0, os.SEEK_END)
+                file_size = file.tell()
+                file.seek(0)
+                
+                if file_size > MAX_FILE_SIZE:
+                    return jsonify({'error': f'File {file.filename} is too large (max 5MB)'}), 400
+                
+                # Generate secure filename
+                filename = secure_filename(file.filename)
+                timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+                filename = f"{timestamp}_{filename}"
+                
+                # Create directory structure
+                upload_dir = f"uploads/customers/{customer_id}"
+                os.makedirs(upload_dir, exist_ok=True)
+                
+                file_path = os.path.join(upload_dir, filename)
+                file.save(file_path)
+                
+                # Store in database
+                conn = get_db()
+                c = queries.execute(conn, 'customer.insert_document', (
+                    customer_id,
+                    application_id,
+                    document_type or 'General',
+                    file.filename,
+                    file_size,
+                    file_path,
+                    file.content_type
+                ))
+                
+                document_id = c.lastrowid
+                # Content sniffing and thumbnails happen in document_worker.py
+                enqueue_document(conn, document_id)
+                conn.commit()
+                conn.close()
+                
+                uploaded_files.append({
+                    'document_id': document_id,
+                    'filename': file.filename,
+                    'file_size': file_size,
+                    'status': 'uploaded'
+                })
+        
+        if not uploaded_files:
+            return jsonify({'error': 'No valid files uploaded'}), 400
+        
+        return jsonify({
+            'success': True,
+            'files': uploaded_files,
+            'message': f'{len(uploaded_files)} file(s) uploaded successfully'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+# === EBT CARD REPLACEMENT ===
+ 
+@bp.route('/api/customer/ebt/replacement', methods=['POST'])
+def request_ebt_replacement():
+    try:
+        data = request.json
+        customer_id = data.get('customer_id')
+        reason = data.get('reason')  # 'lost', 'stolen', 'damaged', 'not_received'
+        
+        if not customer_id or not reason:
+            return jsonify({'error': 'Customer ID and reason required'}), 400
+        
+        conn = get_db()
+        try:
+            card = replace_card(conn, current_app.extensions['card_allocator'], customer_id, reason)
+        except ReplacementLimitError as e:
+            return jsonify({'error': str(e)}), 400
+        finally:
+            conn.close()
+        
+        return jsonify({
+            'success': True,
+            'card_id': card['card_id'],
+            'masked_card_number': mask_card_number(card['card_number']),
+            'estimated_delivery': '7-10 business days',
+            'tracking_info': 'You will receive tracking information via email',
+            'replacement_count': card['replacement_count'],
+            'remaining_replacements': card['remaining_replacements']
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+ 
+ 
+# === PROGRAM OPT-IN/OUT ===
+ 
+@bp.route('/api/customer/program-preferences', methods=['POST'])
+def update_program_preferences():
+    try:
+        data = request.json
+        customer_id = data.get('customer_id')
+        
+        if not customer_id:
+            return jsonify({'error': 'Customer ID required'}), 400
+        try:
+            customer_id = int(customer_id)
+        except (TypeError, ValueError):
+            return jsonify({'error': 'Customer ID must be a number'}), 400
+        
+        conn = get_db()
+        try:
+            upsert_preferences(conn, customer_preference_rows(customer_id, data.get('preferences', {})))
+        finally:
+            conn.close()
+        preferences_cache.invalidate(customer_id)
+        
+        return jsonify({
+            'success': True,
+            'message': 'Preferences updated successfully'
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+@bp.route('/api/customer/program-preferences/bulk', methods=['POST'])
+def bulk_update_program_preferences():
+    """Upsert many customers' preferences at once. Accepts either a JSON list
+    under 'preferences' or an opt-out CSV (CustomerID,ProgramType) as 'file'."""
+    try:
+        conn = get_db()
+        try:
+            if 'file' in request.files:
+                count = import_opt_out_csv(conn, request.files['file'].stream)
+            else:
+                records = (request.json or {}).get('preferences', [])
+                count = upsert_preferences(conn, bulk_preference_rows(records))
+        finally:
+            conn.close()
+        # Too many customers to invalidate one by one
+        preferences_cache.clear()
+        
+        return jsonify({
+            'success': True,
+            'updated': count
+        })
+        
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+ 
+@bp.route('/api/customer/program-preferences/<int:customer_id>', methods=['GET'])
+def get_program_preferences(customer_id):
+    try:
+        def load_preferences():
+            conn = get_db()
+            preferences = [dict(row) for row in queries.fetchall(conn, 'customer.preferences', (customer_id,))]
+            conn.close()
+            
+            return {
+                'preferences': preferences
+            }
+        
+        return cached_json_response(preferences_cache, customer_id, load_preferences)
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,189 @@
+"""Data import routes for CALPADS/CALSAWS extracts and the raw results view."""
+import uuid
+from datetime import datetime
+
+from flask import Blueprint, current_app, jsonify, request
+
+from db import get_db
+from import_cdc import apply_row, job_changes
+from import_jobs import finish_job, job_summary, save_progress, start_job
+from import_manifests import find_manifest, payload_hash, previous_row_hashes, record_manifest, row_hash
+from dedup_errors import conflict, record_conflicts, record_rejects
+from import_validation import validator_for
+import queries
+from reconciliation import reconcile_records
+
+bp = Blueprint('imports', __name__)
+
+ROW_HASH_QUERIES = {
+    'CALPADS': 'imports.calpads_row_hash',
+    'CALSAWS': 'imports.calsaws_row_hash',
+}
+
+# === Import API ===
+@bp.route('/api/import-data', methods=['POST'])
+def import_data():
+    data = request.json.get('data', [])
+    source = request.json.get('source')  # e.g., 'CALPADS'
+    # 'append' skips rows whose key exists; 'cdc' updates them in place
+    mode = request.json.get('mode', 'append')
+    if mode not in ('append', 'cdc'):
+        return jsonify({"error": "mode must be 'append' or 'cdc'"}), 400
+    job_id = str(uuid.uuid4())
+    job = None
+
+    conn = get_db()
+    try:
+        validator = validator_for(conn, source)
+        if validator is None:
+            conn.close()
+            return jsonify({"error": "source must be CALPADS or CALSAWS"}), 400
+        job = start_job(conn, job_id, source, len(data), current_app.config['IMPORT_JOB_RETENTION_DAYS'])
+
+        # An identical payload was already imported: nothing to probe or
+        # reconcile. CDC imports always look at the raw rows, since an append
+        # import of the same payload may have skipped rows it was meant to apply
+        hashes = [row_hash(row) if isinstance(row, dict) else '' for row in data]
+        digest = payload_hash(source, hashes)
+        earlier = find_manifest(conn, source, digest) if mode == 'append' else None
+        if earlier is not None:
+            job.unchanged = len(data)
+            job.duplicate_of = earlier['JobID']
+            finish_job(conn, job, 'done')
+            conn.close()
+            return jsonify({"jobId": job_id, "duplicateOf": earlier['JobID']}), 200
+
+        # Bad rows go to DeduplicationErrors; the rest carry on
+        good, rejects = validator.validate_batch(data)
+        for index, message in rejects:
+            job.row_error(index, message)
+        record_rejects(conn, job_id, source, rejects, data)
+
+        # Rows identical to the previous file from this source are skipped
+        # unprobed; the manifest only holds rows that were actually stored
+        previous = previous_row_hashes(conn, source) if mode == 'append' else {}
+        keyed_hashes = {}
+        changed_records = []
+        new_rows = []
+        conflicts = []
+        seen = set()
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        for index, values in good:
+            key = validator.key(values)
+            if previous.get(key) == hashes[index]:
+                keyed_hashes[key] = hashes[index]
+                job.unchanged += 1
+                continue
+
+            if mode == 'cdc':
+                outcome, previous_row = apply_row(conn, job_id, validator, key, data[index], values, hashes[index])
+                if outcome == 'inserted':
+                    job.inserted += 1
+                elif outcome == 'updated':
+                    job.updated += 1
+                else:
+                    keyed_hashes[key] = hashes[index]
+                    job.unchanged += 1
+                    continue
+                keyed_hashes[key] = hashes[index]
+                changed_records.append((key, previous_row))
+                continue
+
+            # Check only the source's own raw table for key duplicates,
+            # including earlier rows of this payload
+            if key in seen:
+                job.skipped += 1
+                continue
+            stored = queries.fetchone(conn, ROW_HASH_QUERIES[validator.source], (key,))
+            if stored is not None:
+                job.skipped += 1
+                if stored['RowHash'] not in (None, hashes[index]):
+                    conflicts.append(conflict(
+                        validator.source,
+                        f"{validator.key_column} {key} was already imported with different data; "
+                        f"import with mode 'cdc' to apply the changes",
+                        f"import:{validator.source}:{key}:{hashes[index]}",
+                        record_key=key, matched_record=key, job_id=job_id, row=data[index], record_id=index
+                    ))
+                continue
+            seen.add(key)
+            keyed_hashes[key] = hashes[index]
+            new_rows.append(values + (hashes[index], timestamp))
+            changed_records.append((key, None))
+
+        # Fixed column order, so every new row shares one cached INSERT
+        queries.executemany(conn, validator.insert_query, new_rows)
+        job.inserted += len(new_rows)
+        record_conflicts(conn, conflicts)
+
+        save_progress(conn, job, 'reconciling')
+        conn.commit()
+        conn.close()
+        conn = None
+
+        failed = False
+        if mode == 'cdc':
+            # Only the beneficiaries and cases behind changed rows
+            if changed_records:
+                failed = reconcile_records(source, changed_records, status='eligible') is not None
+        elif changed_records:
+            # Only the people behind the newly inserted rows
+            failed = reconcile_records(source, changed_records, status='eligible',
+                                       update_existing=False) is not None
+        if failed:
+            job.row_error(None, 'Reconciliation failed')
+
+        conn = get_db()
+        if not job.error_count and not conflicts:
+            # Only a clean import is safe to short-circuit next time; rows that
+            # conflicted were never stored
+            record_manifest(conn, source, digest, job_id, keyed_hashes, len(data))
+        finish_job(conn, job, 'failed' if failed else 'done')
+        conn.close()
+        return jsonify({"jobId": job_id}), 200
+
+    except Exception as e:
+        print(f"Error during import: {e}")
+        if conn is None:
+            conn = get_db()
+        conn.rollback()
+        if job is not None:
+            job.row_error(None, e)
+            finish_job(conn, job, 'failed')
+        conn.close()
+        return jsonify({"error": "Failed to import data"}), 500
+
+@bp.route('/api/import/<job_id>', methods=['GET'])
+def import_status(job_id):
+    conn = get_db()
+    job = job_summary(conn, job_id)
+    conn.close()
+    if not job:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+@bp.route('/api/import/<job_id>/changes', methods=['GET'])
+def import_changes(job_id):
+    try:
+        limit = min(int(request.args.get('limit', 100)), 1000)
+        offset = int(request.args.get('offset', 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    conn = get_db()
+    changes = job_changes(conn, job_id, limit, offset)
+    conn.close()
+    return jsonify({"jobId": job_id, "changes": changes, "limit": limit, "offset": offset})
+
+# === RawCALPADS Display API ===
+@bp.route('/api/results', methods=['GET'])
+def results():
+    try:
+        conn = get_db()
+        rows = queries.fetchall(conn, 'imports.results')
+        conn.close()
+        results = [dict(row) for row in rows]
+        return jsonify(results)
+    except Exception as e:
+        print('Error fetching RawCALPADS records:', e)
+        return jsonify({"error": "Failed to fetch RawCALPADS records"}), 500
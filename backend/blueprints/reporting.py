@@ -0,0 +1,59 @@
+"""Reporting routes: dashboard summary counts, cache/write-queue statistics,
+the Prometheus /metrics endpoint and the profiler switch."""
+from flask import Blueprint, Response, current_app, jsonify, request
+
+from customer_cache import preferences_cache, profile_cache
+from db import get_db
+from metrics import query_stats, request_stats
+import queries
+
+bp = Blueprint('reporting', __name__)
+
+
+@bp.route('/api/reports/summary', methods=['GET'])
+def get_summary_report():
+    conn = get_db()
+    
+    # Get total records
+    total_records = queries.fetchone(conn, 'reporting.count_eligibility_records')['count']
+    
+    # Get pending approvals
+    pending_approvals = queries.fetchone(conn, 'reporting.count_eligibility_by_status', ('Pending',))['count']
+    
+    # Get approved records
+    approved_records = queries.fetchone(conn, 'reporting.count_eligibility_by_status', ('Approved',))['count']
+    
+    conn.close()
+    
+    return jsonify({
+        'totalRecords': total_records,
+        'pendingApprovals': pending_approvals,
+        'approvedRecords': approved_records
+    })
+
+@bp.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    return jsonify([profile_cache.stats(), preferences_cache.stats()])
+
+@bp.route('/api/write-queue/stats', methods=['GET'])
+def write_queue_stats():
+    return jsonify(current_app.extensions['application_writer'].stats())
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    body = request_stats.prometheus() + query_stats.prometheus()
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+@bp.route('/api/profiling', methods=['GET'])
+def profiling_status():
+    return jsonify(current_app.extensions['profiler'].status())
+
+@bp.route('/api/profiling', methods=['POST'])
+def set_profiling():
+    """Body: {"sample_rate": 0.01} profiles 1% of requests; 0 turns it off."""
+    data = request.json or {}
+    try:
+        current_app.extensions['profiler'].set_sample_rate(float(data.get('sample_rate', 0)))
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(current_app.extensions['profiler'].status())
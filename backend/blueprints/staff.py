@@ -0,0 +1,169 @@
+"""Staff portal routes: login, eligibility records, households, documents,
+users, audit logs, the deduplication review queue and case management."""
+from flask import Blueprint, jsonify, request
+
+from addresses import address_key
+from auth import hash_password
+from db import get_db
+from dedup_errors import mark_reviewed, queue_counts, review_queue
+import queries
+
+bp = Blueprint('staff', __name__)
+
+# === Authentication route ===
+@bp.route('/api/auth/login', methods=['POST'])
+def login():
+    data = request.json
+    username = data.get('username')
+    password = data.get('password')
+
+    conn = get_db()
+    user = queries.fetchone(conn, 'staff.user_by_username', (username,))
+    conn.close()
+
+    if user and password and user['PasswordHash'] == hash_password(password):
+        return jsonify({
+            "success": True,
+            "user": {
+                "id": user['UserID'],
+                "username": user['Username'],
+                "email": user['Email'],
+                "roleId": user['RoleID']
+            }
+        })
+    return jsonify({"success": False, "message": "Invalid credentials"}), 401
+
+# === Eligibility routes ===
+@bp.route('/api/eligibility', methods=['GET'])
+def get_eligibility():
+    try:
+        conn = get_db()
+        rows = queries.fetchall(conn, 'staff.eligibility_records')
+        conn.close()
+        results = [dict(row) for row in rows]
+        return jsonify(results)
+    except Exception as e:
+        print('Error fetching eligibility records:', e)
+        return jsonify({"error": "Failed to fetch eligibility records"}), 500
+
+@bp.route('/api/eligibility', methods=['POST'])
+def post_eligibility():
+    data = request.json
+    participantId = data.get('participantId')
+    issuance_type = data.get('issuanceType')
+    issuance_amount = data.get('issuanceAmount')
+    issuance_date = data.get('issuanceDate')
+    approval_status = data.get('approvalStatus', 'Pending')
+    household_id = data.get('householdId')
+
+    try:
+        conn = get_db()
+        c = queries.execute(conn, 'staff.insert_eligibility_record', (participantId, issuance_type, issuance_amount, issuance_date, approval_status, household_id))
+        conn.commit()
+        last_id = c.lastrowid
+        conn.close()
+        return jsonify({"success": True, "id": last_id}), 201
+    except Exception as e:
+        print('Error creating eligibility record:', e)
+        return jsonify({"error": "Failed to create eligibility record"}), 500
+
+# === Households routes ===
+@bp.route('/api/households', methods=['GET'])
+def get_households():
+    conn = get_db()
+    households = queries.fetchall(conn, 'staff.households')
+    conn.close()
+    
+    return jsonify([dict(household) for household in households])
+
+@bp.route('/api/households', methods=['POST'])
+def create_household():
+    data = request.get_json()
+    
+    conn = get_db()
+    cursor = queries.execute(conn, 'staff.insert_household',
+                             (data.get('householdName'), data.get('address'), address_key(data.get('address'))))
+    
+    household_id = cursor.lastrowid
+    conn.commit()
+    conn.close()
+    
+    return jsonify({'success': True, 'id': household_id}), 201
+
+# === Documents routes ===
+@bp.route('/api/documents/<int:eligibility_id>', methods=['GET'])
+def get_documents(eligibility_id):
+    conn = get_db()
+    documents = queries.fetchall(conn, 'staff.documents_for_eligibility', (eligibility_id,))
+    conn.close()
+    
+    return jsonify([dict(doc) for doc in documents])
+
+# === Users routes ===
+@bp.route('/api/users', methods=['GET'])
+def get_users():
+    conn = get_db()
+    users = queries.fetchall(conn, 'staff.users')
+    conn.close()
+    
+    return jsonify([dict(user) for user in users])
+
+# === Audit log routes ===
+@bp.route('/api/audit-logs', methods=['GET'])
+def get_audit_logs():
+    page = request.args.get('page', 1, type=int)
+    per_page = request.args.get('per_page', 50, type=int)
+    offset = (page - 1) * per_page
+    
+    conn = get_db()
+    logs = queries.fetchall(conn, 'staff.audit_logs_page', (per_page, offset))
+    conn.close()
+    
+    return jsonify([dict(log) for log in logs])
+
+# === Data quality routes ===
+@bp.route('/api/deduplication-errors', methods=['GET'])
+def get_deduplication_errors():
+    reviewed = request.args.get('reviewed', 0, type=int)
+    source = request.args.get('source')
+    after_source = request.args.get('after_source', '')
+    after_id = request.args.get('after_id', 0, type=int)
+    limit = request.args.get('limit', 100, type=int)
+
+    conn = get_db()
+    errors, next_cursor = review_queue(conn, reviewed, source, after_source, after_id, limit)
+    counts = queue_counts(conn)
+    conn.close()
+
+    return jsonify({"errors": errors, "next": next_cursor, "unreviewed": counts})
+
+@bp.route('/api/deduplication-errors/<int:error_id>/review', methods=['POST'])
+def review_deduplication_error(error_id):
+    reviewed = (request.json or {}).get('reviewed', True)
+    conn = get_db()
+    found = mark_reviewed(conn, error_id, reviewed)
+    conn.commit()
+    conn.close()
+    if not found:
+        return jsonify({"error": "Error not found"}), 404
+    return jsonify({"success": True})
+
+# === Case routes ===
+@bp.route('/api/cases', methods=['GET'])
+def cases():
+    try:
+        conn = get_db()
+        rows = queries.fetchall(conn, 'staff.cases')
+        conn.close()
+        results = [dict(row) for row in rows]
+        return jsonify(results)
+    except Exception as e:
+        print('Error fetching RawCALPADS records:', e)
+        return jsonify({"error": "Failed to fetch RawCALPADS records"}), 500
+
+@bp.route('/api/notes', methods={'POST'})
+def notes():
+    caseId = request.json.get('caseId')
+    note = request.json.get('note')
+    print(note)
+    return jsonify({"success": True}), 200
@@ -0,0 +1,122 @@
+"""Bulk EBT card issuance for eligible cases.
+
+Walks CaseBenefit rows with Status 'eligible' that have no card yet, in
+CaseID order and one chunk at a time. Each chunk gets its card numbers from
+one allocator call and is written with executemany in a single transaction,
+then appended to the mailing manifest. The manifest is only ever appended
+to, so a run that dies part-way and is started again keeps the cards its
+committed chunks already issued (the rerun skips those cases).
+
+Run with:  python backend/card_issuance.py --manifest mailing_manifest.csv
+"""
+import argparse
+import csv
+import os
+import sqlite3
+from datetime import datetime, timedelta
+
+import queries
+from db import DEFAULT_DB_PATH
+from ebt_cards import CARD_VALID_DAYS, CardNumberAllocator
+
+DB_PATH = DEFAULT_DB_PATH
+CHUNK_SIZE = 5000
+
+MANIFEST_COLUMNS = ['CardID', 'CaseID', 'CardHolderName', 'Address', 'CardNumber', 'ExpirationDate']
+
+
+def get_db(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def fetch_cases_without_card(conn, after_case_id, limit):
+    # Keyset pagination instead of one long-running SELECT, so each chunk's
+    # write transaction never waits on our own open read cursor
+    return queries.fetchall(conn, 'issuance.cases_without_card', (after_case_id, limit))
+
+
+def issue_chunk(conn, allocator, cases):
+    card_numbers = allocator.take(len(cases))
+    issued_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    expiration_date = (datetime.now() + timedelta(days=CARD_VALID_DAYS)).strftime('%Y-%m-%d')
+
+    cards = []
+    for case, card_number in zip(cases, card_numbers):
+        cards.append({
+            'CaseID': case['CaseID'],
+            'CustomerID': case['CustomerID'],
+            'CardHolderName': f"{case['FirstName']} {case['LastName']}",
+            'Address': case['Address'],
+            'CardNumber': card_number,
+            'ExpirationDate': expiration_date,
+        })
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        last_card_id = queries.fetchone(conn, 'issuance.last_card_id')[0]
+        queries.executemany(conn, 'issuance.insert_card', [
+            (card['CustomerID'], card['CaseID'], card['CardNumber'], card['CardHolderName'],
+             card['ExpirationDate'], issued_date)
+            for card in cards
+        ])
+
+        # EBTAccountID is a plain INT key, so ids are assigned here while we
+        # hold the write lock
+        next_account_id = queries.fetchone(conn, 'issuance.next_account_id')[0]
+        queries.executemany(conn, 'issuance.insert_account', [
+            (next_account_id + i, card['CaseID'], card['CardNumber'])
+            for i, card in enumerate(cards)
+        ])
+
+        card_ids = dict(queries.fetchall(conn, 'issuance.card_ids_since', (last_card_id,)))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    for card in cards:
+        card['CardID'] = card_ids[card['CardNumber']]
+    return cards
+
+
+def issue_cards(db_path=DB_PATH, manifest_path='mailing_manifest.csv', chunk_size=CHUNK_SIZE, allocator=None):
+    allocator = allocator or CardNumberAllocator(db_path)
+    conn = get_db(db_path)
+    issued = 0
+
+    try:
+        new_manifest = not os.path.exists(manifest_path) or os.path.getsize(manifest_path) == 0
+        with open(manifest_path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=MANIFEST_COLUMNS, extrasaction='ignore')
+            if new_manifest:
+                writer.writeheader()
+
+            last_case_id = ''
+            while True:
+                cases = fetch_cases_without_card(conn, last_case_id, chunk_size)
+                if not cases:
+                    break
+
+                cards = issue_chunk(conn, allocator, cases)
+                writer.writerows(cards)
+                f.flush()
+                issued += len(cards)
+                last_case_id = cases[-1]['CaseID']
+                print(f"Issued {issued} card(s)")
+    finally:
+        conn.close()
+
+    return issued
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Issue EBT cards for eligible cases without one")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--manifest', default='mailing_manifest.csv')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    total = issue_cards(args.db, args.manifest, args.chunk_size)
+    print(f"Done: {total} card(s) written to {args.manifest}")
@@ -0,0 +1,216 @@
+"""Export the reconciled caseload to columnar files for offline analysis.
+
+Streams Beneficiary joined to CaseBenefit, RawCALPADS and RawCALSAWS into
+one compressed file, ROW_GROUP_SIZE beneficiaries at a time, so memory use
+stays flat however large the caseload is. Parquet (one row group per batch)
+and Arrow IPC (one record batch per batch) need pyarrow; without it the
+export falls back to gzipped CSV. All batches are read in one transaction,
+so the file is a consistent snapshot even while imports keep running.
+
+Each export gets its own directory with the data file and manifest.json
+(row counts, schema, timings and the file's sha256).
+
+Run with:  python backend/caseload_export.py --format parquet --output-dir exports
+"""
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+from db import DEFAULT_DB_PATH
+
+DB_PATH = DEFAULT_DB_PATH
+ROW_GROUP_SIZE = 65536
+
+# (column, type) in file order; types are Arrow type names
+COLUMNS = [
+    ('BeneficiaryID', 'int64'),
+    ('SSID', 'string'),
+    ('FirstName', 'string'),
+    ('LastName', 'string'),
+    ('DOB', 'string'),
+    ('Address', 'string'),
+    ('HouseholdID', 'string'),
+    ('CaseID', 'string'),
+    ('Status', 'string'),
+    ('EligibilityReason', 'string'),
+    ('Created', 'string'),
+    ('LastModified', 'string'),
+    ('SchoolName', 'string'),
+    ('Grade', 'int64'),
+    ('MealStatus', 'string'),
+    ('CaseNumber', 'string'),
+    ('ProgramType', 'string'),
+]
+
+EXTENSIONS = {'parquet': 'parquet', 'arrow': 'arrow', 'csv': 'csv.gz'}
+
+
+def get_db(db_path=DB_PATH):
+    # Autocommit mode, so the export controls its own read transaction
+    return sqlite3.connect(db_path, timeout=30, isolation_level=None)
+
+
+def fetch_batch(conn, after_beneficiary_id, limit):
+    # Keyset pagination over beneficiaries; a beneficiary matched by several
+    # raw rows still lands in a single batch. Each join is an index probe
+    # (idx_casebenefit_beneficiary, idx_rawcalpads_ssid, idx_rawcalsaws_person)
+    return conn.execute("""
+        SELECT b.BeneficiaryID, b.SSID, b.FirstName, b.LastName, b.DOB, b.Address, b.HouseholdID,
+               c.CaseID, c.Status, c.EligibilityReason, c.Created, c.LastModified,
+               p.SchoolName, p.Grade, p.MealStatus, s.CaseNumber, s.ProgramType
+        FROM (SELECT * FROM Beneficiary WHERE BeneficiaryID > ? ORDER BY BeneficiaryID LIMIT ?) b
+        LEFT JOIN CaseBenefit c ON c.BeneficiaryID = b.BeneficiaryID
+        LEFT JOIN RawCALPADS p ON p.SSID = b.SSID
+        LEFT JOIN RawCALSAWS s ON s.FirstName = b.FirstName AND s.LastName = b.LastName AND s.DOB = b.DOB
+        ORDER BY b.BeneficiaryID
+    """, (after_beneficiary_id, limit)).fetchall()
+
+
+def coerce(value, type_name):
+    """Raw tables are loosely typed (Grade arrives as text from CSV files)."""
+    if value is None:
+        return None
+    if type_name == 'string':
+        return str(value)
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+class CsvWriter:
+    def __init__(self, path):
+        self.file = gzip.open(path, 'wt', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([name for name, _ in COLUMNS])
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class ArrowWriter:
+    """Parquet or Arrow IPC through pyarrow, zstd-compressed."""
+
+    def __init__(self, path, file_format):
+        import pyarrow as pa
+
+        self.pa = pa
+        self.schema = pa.schema([(name, getattr(pa, type_name)()) for name, type_name in COLUMNS])
+        if file_format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression='zstd')
+        else:
+            self.sink = pa.OSFile(path, 'wb')
+            self.writer = pa.ipc.new_file(self.sink, self.schema,
+                                          options=pa.ipc.IpcWriteOptions(compression='zstd'))
+        self.file_format = file_format
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        batch = self.pa.RecordBatch.from_arrays(
+            [self.pa.array(values, type=field.type) for values, field in zip(columns, self.schema)],
+            schema=self.schema
+        )
+        if self.file_format == 'parquet':
+            self.writer.write_batch(batch, row_group_size=len(rows))
+        else:
+            self.writer.write_batch(batch)
+
+    def close(self):
+        self.writer.close()
+        if self.file_format == 'arrow':
+            self.sink.close()
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def export_caseload(db_path=DB_PATH, output_dir='exports', file_format=None, row_group_size=ROW_GROUP_SIZE):
+    """Write one export directory and return its manifest."""
+    if file_format is None:
+        file_format = 'parquet' if pyarrow_available() else 'csv'
+    if file_format in ('parquet', 'arrow') and not pyarrow_available():
+        raise RuntimeError(f"{file_format} export needs pyarrow (pip install pyarrow); use --format csv")
+
+    started = time.time()
+    # The uuid fragment keeps two exports started in the same second apart
+    export_id = f"{time.strftime('caseload-%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    export_dir = os.path.join(output_dir, export_id)
+    os.makedirs(output_dir, exist_ok=True)
+    os.mkdir(export_dir)
+    data_path = os.path.join(export_dir, f"caseload.{EXTENSIONS[file_format]}")
+    writer = CsvWriter(data_path) if file_format == 'csv' else ArrowWriter(data_path, file_format)
+
+    conn = get_db(db_path)
+    rows_written = 0
+    batches = 0
+    types = [type_name for _, type_name in COLUMNS]
+    try:
+        conn.execute("BEGIN")
+        last_id = -1
+        while True:
+            rows = fetch_batch(conn, last_id, row_group_size)
+            if not rows:
+                break
+            writer.write([tuple(coerce(v, t) for v, t in zip(row, types)) for row in rows])
+            rows_written += len(rows)
+            batches += 1
+            last_id = rows[-1][0]
+            print(f"Exported {rows_written} row(s)")
+        conn.execute("COMMIT")
+    finally:
+        writer.close()
+        conn.close()
+
+    manifest = {
+        'export_id': export_id,
+        'format': file_format,
+        'file': os.path.basename(data_path),
+        'rows': rows_written,
+        'batches': batches,
+        'row_group_size': row_group_size,
+        'columns': [{'name': name, 'type': type_name} for name, type_name in COLUMNS],
+        'source_db': os.path.abspath(db_path),
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'seconds': round(time.time() - started, 3),
+        'size_bytes': os.path.getsize(data_path),
+        'sha256': sha256_file(data_path),
+    }
+    with open(os.path.join(export_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the reconciled caseload to columnar files")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--output-dir', default='exports')
+    parser.add_argument('--format', choices=sorted(EXTENSIONS), help='Default: parquet if pyarrow is installed, else csv')
+    parser.add_argument('--row-group-size', type=int, default=ROW_GROUP_SIZE)
+    args = parser.parse_args()
+
+    manifest = export_caseload(args.db, args.output_dir, args.format, args.row_group_size)
+    print(f"Done: {manifest['rows']} row(s) in {manifest['seconds']}s, "
+          f"{os.path.join(args.output_dir, manifest['export_id'], manifest['file'])}")
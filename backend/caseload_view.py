@@ -0,0 +1,93 @@
+"""The materialized caseload behind /api/results and /api/cases.
+
+CaseloadResults holds the FULL OUTER JOIN of RawCALPADS and RawCALSAWS (plus
+LunchEligibilityStatus) that /api/results used to compute on every call, and
+CaseloadCases holds CaseBenefit with the beneficiary's name for /api/cases.
+Triggers installed by init_db.py keep both current: a raw row written by an
+import recomputes the rows of that one person (by FirstName, LastName, DOB,
+through the person indexes), and CaseBenefit and Beneficiary writes update
+the cases they touch. Every write path - imports, CDC updates, batch merges,
+reconciliation - is covered without calling anything.
+
+check_caseload compares both tables against the live joins; rebuild_caseload
+recomputes them from scratch. From the command line:
+
+    python backend/caseload_view.py --check
+    python backend/caseload_view.py --rebuild
+"""
+import argparse
+import sqlite3
+import time
+
+import queries
+from db import DEFAULT_DB_PATH
+
+DB_PATH = DEFAULT_DB_PATH
+
+# name -> (table, live query, materialized query, clear query)
+VIEWS = {
+    'results': ('CaseloadResults', 'caseload.live_results', 'caseload.materialized_results', 'caseload.clear_results'),
+    'cases': ('CaseloadCases', 'caseload.live_cases', 'caseload.materialized_cases', 'caseload.clear_cases'),
+}
+
+
+def count_difference(conn, left, right):
+    """Rows of query left that query right doesn't have."""
+    sql = f"SELECT COUNT(*) FROM ({queries.QUERIES[left]} EXCEPT {queries.QUERIES[right]})"
+    return queries.execute_dynamic(conn, 'caseload.check', sql).fetchone()[0]
+
+
+def check_caseload(conn):
+    """{view: {'live', 'materialized', 'missing', 'extra', 'consistent'}}.
+    missing rows are in the live join only, extra ones in the table only;
+    the row counts catch duplicates, which EXCEPT doesn't."""
+    report = {}
+    for name, (table, live, materialized, _) in VIEWS.items():
+        live_rows = queries.execute_dynamic(
+            conn, 'caseload.check', f"SELECT COUNT(*) FROM ({queries.QUERIES[live]})").fetchone()[0]
+        materialized_rows = queries.execute_dynamic(
+            conn, 'caseload.check', f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        missing = count_difference(conn, live, materialized)
+        extra = count_difference(conn, materialized, live)
+        report[name] = {
+            'live': live_rows,
+            'materialized': materialized_rows,
+            'missing': missing,
+            'extra': extra,
+            'consistent': missing == 0 and extra == 0 and live_rows == materialized_rows,
+        }
+    return report
+
+
+def rebuild_caseload(conn):
+    """Recompute both tables from the live joins; the caller commits."""
+    for name, (table, live, _, clear) in VIEWS.items():
+        queries.execute(conn, clear)
+        queries.execute_dynamic(conn, 'caseload.rebuild', f"INSERT INTO {table} {queries.QUERIES[live]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check or rebuild the materialized caseload")
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--rebuild', action='store_true', help='Recompute the tables before checking')
+    parser.add_argument('--check', action='store_true', help='Compare the tables against the live joins')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    if args.rebuild:
+        started = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        rebuild_caseload(conn)
+        conn.commit()
+        print(f"Rebuilt in {time.time() - started:.1f}s")
+    if args.check or not args.rebuild:
+        consistent = True
+        for name, result in check_caseload(conn).items():
+            consistent = consistent and result['consistent']
+            print(f"{name}: {result['materialized']} materialized, {result['live']} live, "
+                  f"{result['missing']} missing, {result['extra']} extra")
+        conn.close()
+        if not consistent:
+            raise SystemExit(1)
+    else:
+        conn.close()
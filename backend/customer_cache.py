@@ -0,0 +1,130 @@
+"""Read-through cache for per-customer JSON payloads.
+
+Entries are keyed by CustomerID and hold the serialized response body plus
+its ETag, so a hit costs neither a query nor a re-serialization, and a
+matching If-None-Match gets a bodyless 304.
+
+The cache lives in process memory. Every write path that changes a cached
+payload must call invalidate() on the same process; with several worker
+processes a stale entry can live for at most `ttl` seconds.
+
+Loaders run outside the lock, so a write can commit and invalidate() while a
+load that read the old rows is still in flight. While loads of a key are in
+flight it has a generation that invalidate() bumps (clear() bumps a global
+epoch), and a load that started under an older one is returned to its caller
+but never cached. The generation is dropped with the key's last load, so only
+keys being loaded right now are tracked.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, request
+
+
+class CacheEntry:
+    def __init__(self, body, expires_at):
+        self.body = body
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.expires_at = expires_at
+
+
+class ReadThroughCache:
+    def __init__(self, name, maxsize=10000, ttl=300):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.in_flight = {}  # key -> [loads running, generation]
+        self.epoch = 0  # bumped by clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, loader):
+        """Return the entry for key, calling loader() on a miss or expiry.
+
+        loader returns the payload to serialize, or None when there is
+        nothing to cache (e.g. unknown customer); None is passed through.
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and entry.expires_at > now:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            loading = self.in_flight.setdefault(key, [0, 0])
+            loading[0] += 1
+            generation = (self.epoch, loading[1])
+
+        # Load outside the lock so one slow query doesn't block other keys
+        try:
+            payload = loader()
+            if payload is None:
+                return None
+
+            entry = CacheEntry(current_app.json.dumps(payload).encode(), now + self.ttl)
+            with self.lock:
+                if generation != (self.epoch, loading[1]):
+                    # Invalidated while loading; the payload may predate the write
+                    return entry
+                self.entries[key] = entry
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.maxsize:
+                    self.entries.popitem(last=False)
+                    self.evictions += 1
+            return entry
+        finally:
+            with self.lock:
+                loading[0] -= 1
+                if not loading[0]:
+                    del self.in_flight[key]
+
+    def invalidate(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+            if key in self.in_flight:
+                self.in_flight[key][1] += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.epoch += 1
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'size': len(self.entries),
+                'maxsize': self.maxsize,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+
+def cached_json_response(cache, key, loader):
+    """Serve a cached payload, honouring If-None-Match. Returns None when the
+    loader found nothing, so the route can send its own 404."""
+    entry = cache.get(key, loader)
+    if entry is None:
+        return None
+
+    if entry.etag in request.if_none_match:
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry.body, mimetype='application/json')
+    response.set_etag(entry.etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+profile_cache = ReadThroughCache('customer_profile')
+preferences_cache = ReadThroughCache('program_preferences')
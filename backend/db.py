@@ -0,0 +1,75 @@
+"""Database access shared by every blueprint.
+
+Connections come from a per-process pool. Route code keeps the existing
+`conn = get_db() ... conn.close()` pattern; close() hands the connection back
+to the pool instead of closing the file.
+"""
+import os
+import queue
+import sqlite3
+
+from flask import current_app
+
+DEFAULT_DB_PATH = os.environ.get(
+    'CALIEDU_DB',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'caliedu.db')
+)
+STATEMENT_CACHE_SIZE = 256
+
+
+class PooledConnection(sqlite3.Connection):
+    pool = None
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+    def discard(self):
+        super().close()
+
+
+class ConnectionPool:
+    def __init__(self, db_path, size=8):
+        self.db_path = db_path
+        self.size = size
+        self.pid = os.getpid()
+        self.idle = queue.LifoQueue(maxsize=size)
+
+    def connect(self):
+        # Connections opened before a fork must not be shared with the child
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.idle = queue.LifoQueue(maxsize=self.size)
+
+        try:
+            conn = self.idle.get_nowait()
+        except queue.Empty:
+            # Large enough to keep every statement in queries.QUERIES prepared
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False,
+                                   factory=PooledConnection, cached_statements=STATEMENT_CACHE_SIZE)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.pool = self
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def release(self, conn):
+        # Whatever the caller left uncommitted is dropped
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            self.idle.put_nowait(conn)
+        except queue.Full:
+            conn.discard()
+
+    def close_all(self):
+        while True:
+            try:
+                self.idle.get_nowait().discard()
+            except queue.Empty:
+                break
+
+
+def get_db():
+    return current_app.extensions['db_pool'].connect()
@@ -0,0 +1,76 @@
+"""DeduplicationErrors: rejected import rows and reconciliation conflicts.
+
+Rows are written in bulk, one executemany per import or reconciliation run.
+A conflict carries the key of the incoming record (RecordKey), the record it
+collided with (MatchedRecord) and why (ErrorMessage). Its ConflictKey is
+unique, so rerunning reconciliation over the same data doesn't log the same
+conflict again, and one a reviewer has already cleared stays cleared.
+
+Staff work through the queue with review_queue, unreviewed first and by
+source, using keyset pagination on the (Reviewed, Source, ErrorID) index so a
+page costs the same however many errors are logged.
+"""
+import json
+from datetime import datetime
+
+import queries
+
+MAX_ROW_DATA = 1000  # RowData is kept for review, not replay
+MAX_PAGE_SIZE = 500
+
+
+def now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def row_data(row):
+    if row is None:
+        return None
+    return json.dumps(row, default=str)[:MAX_ROW_DATA]
+
+
+def record_rejects(conn, job_id, source, rejects, rows):
+    """Write [(index, message)] from validation; the caller commits."""
+    logged_at = now()
+    queries.executemany(conn, 'dedup.insert_reject', [
+        (source.upper(), index, message[:255], logged_at, job_id, row_data(rows[index]))
+        for index, message in rejects
+    ])
+
+
+def conflict(source, message, conflict_key, record_key=None, matched_record=None,
+             job_id=None, row=None, record_id=None):
+    """One conflict row for record_conflicts."""
+    return (source, record_id, record_key, None if matched_record is None else str(matched_record),
+            message[:255], now(), job_id, row_data(row), conflict_key)
+
+
+def record_conflicts(conn, conflicts):
+    """Write conflicts built with conflict(); ones already logged are
+    skipped. The caller commits."""
+    if conflicts:
+        queries.executemany(conn, 'dedup.insert_conflict', conflicts)
+
+
+def review_queue(conn, reviewed=0, source=None, after_source='', after_id=0, limit=100):
+    """One page of the queue and the cursor for the next one (None on the
+    last page)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if source:
+        rows = queries.fetchall(conn, 'dedup.review_page_for_source', (reviewed, source, after_id, limit))
+    else:
+        rows = queries.fetchall(conn, 'dedup.review_page', (reviewed, after_source, after_id, limit))
+    errors = [dict(row) for row in rows]
+    next_cursor = None
+    if len(errors) == limit:
+        next_cursor = {'after_source': errors[-1]['Source'], 'after_id': errors[-1]['ErrorID']}
+    return errors, next_cursor
+
+
+def queue_counts(conn):
+    return {row['Source']: row['count'] for row in queries.fetchall(conn, 'dedup.unreviewed_counts')}
+
+
+def mark_reviewed(conn, error_id, reviewed=True):
+    """Returns False when there is no such error; the caller commits."""
+    return queries.execute(conn, 'dedup.mark_reviewed', (1 if reviewed else 0, error_id)).rowcount > 0
@@ -0,0 +1,194 @@
+"""Background processing for customer document uploads.
+
+upload_documents only saves the file and queues a row in DocumentJobs. The
+workers in this module lease those jobs, sniff the real content type, count
+PDF pages, write a thumbnail for images and mark the document 'Processed'.
+
+Run with:  python backend/document_worker.py --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import sqlite3
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import queries
+from db import DEFAULT_DB_PATH
+
+DB_PATH = DEFAULT_DB_PATH
+THUMBNAIL_DIR = "uploads/thumbnails"
+THUMBNAIL_SIZE = (200, 200)
+LEASE_SECONDS = 60
+MAX_ATTEMPTS = 3
+POLL_INTERVAL = 1.0
+
+# Leading bytes of the file types upload_documents accepts
+MAGIC_NUMBERS = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/msword'),
+    (b'PK\x03\x04', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'),
+]
+
+PDF_PAGE_PATTERN = re.compile(rb'/Type\s*/Page(?![a-zA-Z])')
+
+
+def get_db(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    return conn
+
+
+def now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def enqueue_document(conn, document_id):
+    """Queue a freshly uploaded document. Runs on the caller's connection so it
+    commits together with the CustomerDocuments insert."""
+    queries.execute(conn, 'documents.enqueue_job', (document_id, now()))
+
+
+def lease_job(conn, worker_id, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+    """Claim the oldest queued job, or one whose lease has expired.
+
+    BEGIN IMMEDIATE takes the write lock before the SELECT, so two workers can
+    never lease the same job. An expired lease means the worker died mid-job;
+    once that has used up max_attempts the job is marked 'Failed' instead of
+    being handed to the next worker to crash on.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current_time = now()
+        queries.execute(conn, 'documents.fail_expired_leases', (current_time, max_attempts))
+        job = queries.fetchone(conn, 'documents.next_job', (current_time, max_attempts))
+
+        if not job:
+            conn.execute("COMMIT")
+            return None
+
+        lease_expires = (datetime.now() + timedelta(seconds=lease_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+        queries.execute(conn, 'documents.lease_job', (worker_id, lease_expires, job['JobID']))
+        conn.execute("COMMIT")
+        return dict(job)
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def sniff_mime_type(file_path):
+    with open(file_path, 'rb') as f:
+        header = f.read(16)
+    for magic, mime_type in MAGIC_NUMBERS:
+        if header.startswith(magic):
+            return mime_type
+    return 'application/octet-stream'
+
+
+def count_pdf_pages(file_path):
+    with open(file_path, 'rb') as f:
+        return len(PDF_PAGE_PATTERN.findall(f.read()))
+
+
+def make_thumbnail(file_path, document_id):
+    # Imported here so the upload route doesn't pay for Pillow when it only
+    # enqueues; thumbnails are skipped when Pillow is missing
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    thumbnail_path = os.path.join(THUMBNAIL_DIR, f"{document_id}.png")
+    with Image.open(file_path) as img:
+        img.thumbnail(THUMBNAIL_SIZE)
+        img.save(thumbnail_path, format='PNG')
+    return thumbnail_path
+
+
+def process_document(conn, document_id):
+    document = queries.fetchone(conn, 'documents.document', (document_id,))
+
+    if not document:
+        raise ValueError(f"Document {document_id} not found")
+
+    file_path = document['FilePath']
+    mime_type = sniff_mime_type(file_path)
+
+    page_count = None
+    thumbnail_path = None
+    if mime_type == 'application/pdf':
+        page_count = count_pdf_pages(file_path)
+    elif mime_type.startswith('image/'):
+        page_count = 1
+        thumbnail_path = make_thumbnail(file_path, document_id)
+
+    queries.execute(conn, 'documents.mark_processed', (mime_type, page_count, thumbnail_path, document_id))
+
+
+def complete_job(conn, job_id):
+    queries.execute(conn, 'documents.complete_job', (now(), job_id))
+    conn.commit()
+
+
+def fail_job(conn, job, error, max_attempts=MAX_ATTEMPTS):
+    # Give the job back to the queue until it runs out of attempts
+    status = 'Failed' if job['Attempts'] + 1 >= max_attempts else 'Queued'
+    queries.execute(conn, 'documents.fail_job', (status, str(error)[:255], job['JobID']))
+    conn.commit()
+
+
+def run_worker(db_path=DB_PATH, poll_interval=POLL_INTERVAL, exit_when_idle=False):
+    worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    conn = get_db(db_path)
+    processed = 0
+
+    try:
+        while True:
+            job = lease_job(conn, worker_id)
+            if not job:
+                if exit_when_idle:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                process_document(conn, job['DocumentID'])
+                complete_job(conn, job['JobID'])
+                processed += 1
+            except Exception as e:
+                conn.rollback()
+                print(f"Error processing document {job['DocumentID']}: {e}")
+                fail_job(conn, job, e)
+    finally:
+        conn.close()
+
+    return processed
+
+
+def run_workers(num_workers, db_path=DB_PATH, exit_when_idle=False):
+    """Start num_workers processes. Each leases jobs independently, so
+    throughput grows with the worker count until SQLite's writer lock is the
+    bottleneck (the per-job write is a single short UPDATE)."""
+    with multiprocessing.Pool(num_workers) as pool:
+        results = [
+            pool.apply_async(run_worker, (db_path, POLL_INTERVAL, exit_when_idle))
+            for _ in range(num_workers)
+        ]
+        return sum(r.get() for r in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process uploaded customer documents")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--db', default=DB_PATH)
+    parser.add_argument('--drain', action='store_true', help="exit once the queue is empty")
+    args = parser.parse_args()
+
+    total = run_workers(args.workers, args.db, exit_when_idle=args.drain)
+    print(f"Processed {total} document(s)")
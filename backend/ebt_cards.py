@@ -0,0 +1,169 @@
+"""EBT card issuance.
+
+Card numbers are the California EBT issuer prefix, a sequence number and a
+Luhn check digit. Sequence numbers are handed out in blocks reserved from the
+CardNumberSequence table, so every process draws from its own range and an
+issued number can never hit the UNIQUE CardNumber constraint.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import queries
+
+ISSUER_PREFIX = "507719"
+CARD_NUMBER_LENGTH = 16
+BLOCK_SIZE = 1000
+MAX_REPLACEMENTS = 3
+CARD_VALID_DAYS = 365 * 3
+
+
+class ReplacementLimitError(Exception):
+    pass
+
+
+def luhn_check_digit(partial_number):
+    total = 0
+    # Double every second digit counting from the right of the full number,
+    # i.e. starting with the rightmost digit of the partial number
+    for i, digit in enumerate(reversed(partial_number)):
+        d = int(digit)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return str((10 - total % 10) % 10)
+
+
+def is_valid_card_number(card_number):
+    return (
+        card_number.isdigit()
+        and len(card_number) == CARD_NUMBER_LENGTH
+        and luhn_check_digit(card_number[:-1]) == card_number[-1]
+    )
+
+
+def format_card_number(sequence):
+    width = CARD_NUMBER_LENGTH - len(ISSUER_PREFIX) - 1
+    partial = f"{ISSUER_PREFIX}{sequence:0{width}d}"
+    return partial + luhn_check_digit(partial)
+
+
+def mask_card_number(card_number):
+    return f"****-****-****-{card_number[-4:]}"
+
+
+class CardNumberAllocator:
+    """Hands out card numbers from blocks of BLOCK_SIZE sequence values.
+
+    Only the block reservation touches the database; numbers inside a block
+    come from memory under a lock. Unused numbers in a block are skipped when
+    the process exits, which leaves gaps but never duplicates.
+    """
+
+    def __init__(self, db_path, block_size=BLOCK_SIZE):
+        self.db_path = db_path
+        self.block_size = block_size
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.next_sequence = 0
+        self.block_end = 0
+
+    def reserve_block(self, size):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = queries.fetchone(conn, 'ebt.sequence_next', (ISSUER_PREFIX,))
+            start = row[0] if row else 1
+            queries.execute(conn, 'ebt.sequence_advance', (ISSUER_PREFIX, start + size))
+            conn.commit()
+            return start, start + size
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def check_fork(self):
+        # A forked worker inherits the parent's block; drawing from it would
+        # hand out the same numbers as the parent and its siblings
+        if os.getpid() != self.pid:
+            self.pid = os.getpid()
+            self.lock = threading.Lock()
+            self.next_sequence = 0
+            self.block_end = 0
+
+    def next_number(self):
+        self.check_fork()
+        with self.lock:
+            if self.next_sequence >= self.block_end:
+                self.next_sequence, self.block_end = self.reserve_block(self.block_size)
+            sequence = self.next_sequence
+            self.next_sequence += 1
+        return format_card_number(sequence)
+
+    def take(self, count):
+        """Allocate count numbers at once, reserving a dedicated block for
+        whatever the current block can't cover."""
+        self.check_fork()
+        with self.lock:
+            numbers = []
+            available = min(count, self.block_end - self.next_sequence)
+            numbers.extend(range(self.next_sequence, self.next_sequence + available))
+            self.next_sequence += available
+            if available < count:
+                start, end = self.reserve_block(count - available)
+                numbers.extend(range(start, end))
+        return [format_card_number(n) for n in numbers]
+
+
+def replace_card(conn, allocator, customer_id, reason):
+    """Deactivate the customer's current card and issue a new one.
+
+    The limit check, the UPDATE and the INSERT run in one BEGIN IMMEDIATE
+    transaction so concurrent requests for the same customer are serialized
+    and can't both pass the ReplacementCount check. The card number is taken
+    before the transaction starts, since a block refill needs its own write.
+    """
+    new_card_number = allocator.next_number()
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # A card still in 'Processing' is the current card too, otherwise the
+        # limit would reset after every replacement
+        current_card = queries.fetchone(conn, 'ebt.current_card', (customer_id,))
+
+        replacement_count = current_card['ReplacementCount'] if current_card else 0
+        if replacement_count >= MAX_REPLACEMENTS:
+            raise ReplacementLimitError('Replacement limit reached. Please contact customer service.')
+
+        customer = queries.fetchone(conn, 'ebt.card_holder', (customer_id,))
+
+        if not customer:
+            raise ValueError('Customer not found')
+
+        if current_card:
+            queries.execute(conn, 'ebt.mark_replaced', (current_card['CardID'],))
+
+        c = queries.execute(conn, 'ebt.insert_card', (
+            customer_id,
+            new_card_number,
+            f"{customer['FirstName']} {customer['LastName']}",
+            datetime.now() + timedelta(days=CARD_VALID_DAYS),
+            reason,
+            replacement_count + 1
+        ))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return {
+        'card_id': c.lastrowid,
+        'card_number': new_card_number,
+        'replacement_count': replacement_count + 1,
+        'remaining_replacements': MAX_REPLACEMENTS - 1 - replacement_count
+    }
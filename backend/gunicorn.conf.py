@@ -0,0 +1,27 @@
+"""gunicorn settings for the CalEdu backend. Every value can be overridden
+with the matching CALIEDU_* environment variable."""
+import os
+
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+bind = os.environ.get('CALIEDU_BIND', '0.0.0.0:5000')
+
+# Worker processes and threads per worker. sqlite3 releases the GIL while a
+# query runs, so a few threads per worker help on the read-heavy routes.
+workers = int(os.environ.get('CALIEDU_WORKERS', (os.cpu_count() or 1) * 2 + 1))
+threads = int(os.environ.get('CALIEDU_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+keepalive = int(os.environ.get('CALIEDU_KEEPALIVE', 5))
+timeout = int(os.environ.get('CALIEDU_TIMEOUT', 60))
+
+# Load the app once in the master so workers share its imported modules
+preload_app = os.environ.get('CALIEDU_PRELOAD', '1') == '1'
+
+# Recycle each worker after a jittered number of requests, giving it
+# graceful_timeout seconds to finish in-flight requests
+max_requests = int(os.environ.get('CALIEDU_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('CALIEDU_MAX_REQUESTS_JITTER', 1000))
+graceful_timeout = int(os.environ.get('CALIEDU_GRACEFUL_TIMEOUT', 30))
+
+accesslog = os.environ.get('CALIEDU_ACCESS_LOG')  # e.g. '-' for stdout
+errorlog = '-'
+
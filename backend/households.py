@@ -0,0 +1,170 @@
+"""Household resolution: group beneficiaries into Households.
+
+Beneficiaries at the same normalized address (Beneficiary.AddressKey, see
+addresses.py) who share a surname are one household. Candidates are blocked
+on (AddressKey, surname token), one block per token ("garcia-lopez" is in
+both "garcia" and "lopez"), so only beneficiaries sharing a block are ever
+compared. Members of a block are joined with a union-find, which also merges
+households that a new arrival turns out to bridge.
+
+Resolution is incremental: each run only places beneficiaries whose
+HouseholdID is still NULL. Everyone already placed at their addresses is
+fetched in one join on the AddressKey index, and the new arrivals either join
+the household they match, merge the households they bridge (the lowest
+HouseholdID survives and takes over their members and eligibility records)
+or start a new one. Every beneficiary ends up in a household, alone if
+nothing matched.
+
+Reconciliation runs it in the transaction that adds new beneficiaries.
+Arrivals without an AddressKey get theirs as they are placed; the command
+line run also backfills the keys of everyone placed before the column
+existed:
+
+    python backend/households.py
+"""
+import argparse
+import re
+import sqlite3
+import time
+
+from addresses import address_key, backfill_address_keys
+import queries
+from db import DEFAULT_DB_PATH
+
+DB_PATH = DEFAULT_DB_PATH
+SURNAME_SEPARATORS = re.compile(r"[\s\-']+")
+
+
+def block_keys(last_name, address_key):
+    """One block per surname token at this address."""
+    if address_key is None or not last_name:
+        return []
+    tokens = {token for token in SURNAME_SEPARATORS.split(last_name.lower()) if len(token) > 1}
+    return [(address_key, token) for token in sorted(tokens)]
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+
+    def add(self, node):
+        if node not in self.parent:
+            self.parent[node] = node
+            self.size[node] = 1
+
+    def find(self, node):
+        root = node
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression
+        while self.parent[node] != root:
+            self.parent[node], node = root, self.parent[node]
+        return root
+
+    def union(self, a, b):
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+    def components(self):
+        groups = {}
+        for node in self.parent:
+            groups.setdefault(self.find(node), []).append(node)
+        return groups.values()
+
+
+def resolve_households(conn):
+    """Place every beneficiary without a household; the caller commits.
+
+    Returns {'assigned', 'created', 'merged'} counts.
+    """
+    stats = {'assigned': 0, 'created': 0, 'merged': 0}
+    pending = [dict(row) for row in queries.fetchall(conn, 'households.unassigned')]
+    if not pending:
+        return stats
+
+    # Beneficiaries written without an AddressKey; an address that doesn't
+    # normalize is only tried again if it is still unplaced
+    keyed = []
+    for row in pending:
+        if row['AddressKey'] is None and row['Address']:
+            row['AddressKey'] = address_key(row['Address'])
+            if row['AddressKey'] is not None:
+                keyed.append((row['AddressKey'], row['BeneficiaryID']))
+    queries.executemany(conn, 'addresses.set_beneficiary_key', keyed)
+
+    # Nodes are ('b', BeneficiaryID) for the new arrivals and ('h', HouseholdID)
+    # for the households they may join
+    uf = UnionFind()
+    people = {}
+    first_in_block = {}
+    for row in pending:
+        node = ('b', row['BeneficiaryID'])
+        uf.add(node)
+        people[row['BeneficiaryID']] = row
+        for key in block_keys(row['LastName'], row['AddressKey']):
+            if key in first_in_block:
+                uf.union(first_in_block[key], node)
+            else:
+                first_in_block[key] = node
+
+    queries.execute(conn, 'households.create_new_addresses')
+    queries.execute(conn, 'households.clear_new_addresses')
+    queries.executemany(conn, 'households.insert_new_address',
+                        [(address,) for address in {address for address, _ in first_in_block}])
+    for row in queries.fetchall(conn, 'households.placed_at_new_addresses'):
+        for key in block_keys(row['LastName'], row['AddressKey']):
+            if key in first_in_block:
+                # Beneficiary.HouseholdID is NVARCHAR; ids are ints from here on
+                household = ('h', int(row['HouseholdID']))
+                uf.add(household)
+                uf.union(first_in_block[key], household)
+
+    next_id = queries.fetchone(conn, 'households.next_id')[0]
+    new_households = []
+    assignments = []
+    for members in uf.components():
+        households = sorted(node[1] for node in members if node[0] == 'h')
+        beneficiaries = sorted(node[1] for node in members if node[0] == 'b')
+        if households:
+            target = households[0]
+            for other in households[1:]:
+                queries.execute(conn, 'households.move_members', (target, other))
+                queries.execute(conn, 'households.move_eligibility', (target, other))
+                queries.execute(conn, 'households.delete', (other,))
+                stats['merged'] += 1
+        else:
+            target = next_id
+            next_id += 1
+            founder = people[beneficiaries[0]]
+            new_households.append((target, f"{founder['LastName']} Household", founder['Address'],
+                                   founder['AddressKey']))
+        assignments.extend((target, beneficiary_id) for beneficiary_id in beneficiaries)
+
+    queries.executemany(conn, 'households.insert', new_households)
+    queries.executemany(conn, 'households.assign', assignments)
+    stats['assigned'] = len(assignments)
+    stats['created'] = len(new_households)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Group beneficiaries without a household into Households")
+    parser.add_argument('--db', default=DB_PATH)
+    args = parser.parse_args()
+
+    started = time.time()
+    conn = sqlite3.connect(args.db, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute("BEGIN IMMEDIATE")
+    backfill_address_keys(conn)
+    stats = resolve_households(conn)
+    conn.commit()
+    conn.close()
+    print(f"Done in {time.time() - started:.1f}s: {stats['assigned']} beneficiaries placed, "
+          f"{stats['created']} households created, {stats['merged']} merged")
@@ -0,0 +1,77 @@
+"""Change-data-capture for the raw CALPADS/CALSAWS tables.
+
+In 'cdc' mode an incoming row whose key (SSID or CaseNumber) already exists
+is compared with the stored version instead of being skipped. Each raw row
+keeps the hash it was imported with (RawCALPADS.RowHash), so an unchanged
+row costs one keyed lookup. A changed row is updated in place, only in the
+columns that differ, and every inserted row and changed field is written to
+ImportChangeLog under the import job.
+"""
+from datetime import datetime
+
+import queries
+
+LOOKUP_QUERIES = {
+    'CALPADS': 'cdc.calpads_row',
+    'CALSAWS': 'cdc.calsaws_row',
+}
+
+
+def comparable(value):
+    if value is None:
+        return None
+    return str(value).strip()
+
+
+def changed_fields(stored, incoming):
+    """[(column, old, new)] for the incoming columns that differ."""
+    changes = []
+    for column, value in incoming.items():
+        if comparable(stored[column]) != comparable(value):
+            changes.append((column, stored[column], value))
+    return changes
+
+
+def apply_row(conn, job_id, validator, key, row, values, digest):
+    """Insert, update or leave one validated row; the caller commits.
+
+    values is the row as normalized by validator. Returns (outcome,
+    previous) where outcome is 'inserted', 'updated' or 'unchanged' and
+    previous is the stored row before the change (None for an insert).
+    """
+    source = validator.source
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    stored = queries.fetchone(conn, LOOKUP_QUERIES[source], (key,))
+
+    if stored is None:
+        queries.execute(conn, validator.insert_query, values + (digest, timestamp))
+        queries.execute(conn, 'cdc.log_change', (job_id, source, key, 'insert', None, None, None, timestamp))
+        return 'inserted', None
+
+    if stored['RowHash'] == digest:
+        return 'unchanged', stored
+
+    # Only the columns the file supplied; a missing column keeps its value
+    incoming = {column: value for column, value in zip(validator.columns, values) if column in row}
+    changes = changed_fields(stored, incoming)
+    assignments = [f"{column} = ?" for column, _, _ in changes] + ['RowHash = ?']
+    params = [new for _, _, new in changes] + [digest]
+    if changes:
+        assignments.append('ImportTimestamp = ?')
+        params.append(timestamp)
+    queries.execute_dynamic(conn, 'cdc.update_raw_row',
+                            f"UPDATE {validator.table} SET {', '.join(assignments)} WHERE {validator.key_column} = ?",
+                            params + [key])
+    if not changes:
+        # Stored before row hashes existed; now it has one
+        return 'unchanged', stored
+
+    queries.executemany(conn, 'cdc.log_change', [
+        (job_id, source, key, 'update', column, comparable(old), comparable(new), timestamp)
+        for column, old, new in changes
+    ])
+    return 'updated', stored
+
+
+def job_changes(conn, job_id, limit, offset):
+    return [dict(row) for row in queries.fetchall(conn, 'cdc.changes_for_job', (job_id, limit, offset))]
@@ -0,0 +1,98 @@
+"""Import job records.
+
+Every /api/import-data call gets an ImportJobs row, so its status survives a
+restart and can be read from any worker. The row keeps counts, timing and
+the first MAX_ERROR_SAMPLES row errors, never the payload itself. Jobs older
+than the retention period are deleted whenever a new one starts.
+"""
+import json
+import time
+from datetime import datetime, timedelta
+
+import queries
+
+MAX_ERROR_SAMPLES = 20
+
+
+def now():
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+class ImportJob:
+    """Counters for one import while it runs."""
+
+    def __init__(self, job_id, source, total_rows):
+        self.job_id = job_id
+        self.source = source
+        self.total_rows = total_rows
+        self.inserted = 0
+        self.updated = 0
+        self.skipped = 0
+        self.unchanged = 0
+        self.duplicate_of = None
+        self.error_count = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def row_error(self, index, error):
+        self.error_count += 1
+        if len(self.errors) < MAX_ERROR_SAMPLES:
+            self.errors.append({'row': index, 'error': str(error)})
+
+
+def purge_expired(conn, retention_days):
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d %H:%M:%S')
+    return queries.execute(conn, 'import_jobs.purge', (cutoff,)).rowcount
+
+
+def start_job(conn, job_id, source, total_rows, retention_days):
+    """Record the job as 'processing' and commit, so it is visible while the
+    import runs."""
+    purge_expired(conn, retention_days)
+    queries.execute(conn, 'import_jobs.insert', (job_id, source, total_rows, now()))
+    conn.commit()
+    return ImportJob(job_id, source, total_rows)
+
+
+def save_progress(conn, job, status):
+    """Update status and counters; the caller commits."""
+    queries.execute(conn, 'import_jobs.update', (
+        status,
+        job.inserted,
+        job.updated,
+        job.skipped,
+        job.unchanged,
+        job.error_count,
+        json.dumps(job.errors),
+        job.duplicate_of,
+        job.job_id
+    ))
+
+
+def finish_job(conn, job, status):
+    save_progress(conn, job, status)
+    duration_ms = int((time.perf_counter() - job.started) * 1000)
+    queries.execute(conn, 'import_jobs.finish', (status, now(), duration_ms, job.job_id))
+    conn.commit()
+
+
+def job_summary(conn, job_id):
+    row = queries.fetchone(conn, 'import_jobs.get', (job_id,))
+    if row is None:
+        return None
+    return {
+        'jobId': row['JobID'],
+        'source': row['Source'],
+        'status': row['Status'],
+        'totalRows': row['TotalRows'],
+        'insertedRows': row['InsertedRows'],
+        'updatedRows': row['UpdatedRows'],
+        'skippedRows': row['SkippedRows'],
+        'unchangedRows': row['UnchangedRows'],
+        'errorCount': row['ErrorCount'],
+        'errors': json.loads(row['ErrorSample'] or '[]'),
+        'createdAt': row['CreatedAt'],
+        'finishedAt': row['FinishedAt'],
+        'durationMs': row['DurationMs'],
+        'duplicateOf': row['DuplicateOf']
+    }
@@ -0,0 +1,184 @@
+"""Validation of incoming CALPADS/CALSAWS rows.
+
+A validator is compiled once per source from the raw table's schema: each
+import column gets a checker for its declared type (NVARCHAR(n) length, INT,
+DATE as YYYY-MM-DD) plus the extra rules in FIELD_RULES. Validating a row
+normalizes it into a tuple in IMPORT_COLUMNS order, so every good row goes
+through the same cached INSERT ('imports.insert_calpads' and friends) instead
+of one built from the keys the client happened to send.
+
+Rows that fail are returned with a message for the caller to write to
+DeduplicationErrors (dedup_errors.record_rejects), so one bad row never stops
+the batch.
+"""
+import re
+from datetime import date, datetime
+
+RAW_TABLES = {
+    'CALPADS': 'RawCALPADS',
+    'CALSAWS': 'RawCALSAWS',
+}
+
+# Columns a file may supply, in the order of the cached INSERTs
+IMPORT_COLUMNS = {
+    'CALPADS': ('SSID', 'FirstName', 'LastName', 'DOB', 'Address', 'SchoolName', 'Grade', 'MealStatus'),
+    'CALSAWS': ('CaseNumber', 'FirstName', 'LastName', 'DOB', 'Address', 'ProgramType'),
+}
+KEY_COLUMNS = {
+    'CALPADS': 'SSID',
+    'CALSAWS': 'CaseNumber',
+}
+INSERT_QUERIES = {
+    'CALPADS': 'imports.insert_calpads',
+    'CALSAWS': 'imports.insert_calsaws',
+}
+
+GRADE_RANGE = range(0, 13)  # K (0) through 12
+
+
+def check_grade(value):
+    if value not in GRADE_RANGE:
+        raise ValueError(f"must be between {GRADE_RANGE.start} and {GRADE_RANGE.stop - 1}")
+
+
+def check_dob(value):
+    if value > date.today().isoformat():
+        raise ValueError("is in the future")
+
+
+FIELD_RULES = {
+    'Grade': check_grade,
+    'DOB': check_dob,
+}
+
+VARCHAR_PATTERN = re.compile(r'N?VARCHAR\((\d+)\)', re.IGNORECASE)
+
+
+def text_checker(max_length):
+    def check(value):
+        if isinstance(value, (dict, list, bool)):
+            raise ValueError("must be text")
+        value = str(value).strip()
+        if max_length is not None and len(value) > max_length:
+            raise ValueError(f"is longer than {max_length} characters")
+        return value
+    return check
+
+
+def int_checker(value):
+    if isinstance(value, bool):
+        raise ValueError("must be a whole number")
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, int):
+        return value
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise ValueError("must be a whole number") from None
+
+
+def date_checker(value):
+    value = str(value).strip()
+    try:
+        datetime.strptime(value, '%Y-%m-%d')
+    except ValueError:
+        raise ValueError("must be a date (YYYY-MM-DD)") from None
+    return value
+
+
+def checker_for(declared_type):
+    declared_type = (declared_type or '').upper()
+    match = VARCHAR_PATTERN.fullmatch(declared_type)
+    if match:
+        return text_checker(int(match.group(1)))
+    if declared_type in ('INT', 'INTEGER'):
+        return int_checker
+    if declared_type == 'DATE':
+        return date_checker
+    return text_checker(None)
+
+
+class RowValidator:
+    """Checks and normalizes rows for one source; build with
+    compile_validator."""
+
+    def __init__(self, source, checks):
+        self.source = source
+        self.table = RAW_TABLES[source]
+        self.columns = IMPORT_COLUMNS[source]
+        self.key_column = KEY_COLUMNS[source]
+        self.key_position = self.columns.index(self.key_column)
+        self.insert_query = INSERT_QUERIES[source]
+        self.allowed = frozenset(self.columns)
+        self.checks = checks  # [(column, convert, rule or None)] in column order
+
+    def validate(self, row):
+        """(values, None) for a good row, (None, message) for a bad one."""
+        if not isinstance(row, dict):
+            return None, "row is not an object"
+        unknown = [column for column in row if column not in self.allowed]
+        if unknown:
+            return None, f"unknown column {unknown[0]}"
+
+        values = []
+        for column, convert, rule in self.checks:
+            value = row.get(column)
+            if value is None or value == '':
+                if column == self.key_column:
+                    return None, f"{column} is required"
+                values.append(None)
+                continue
+            try:
+                value = convert(value)
+                if rule is not None:
+                    rule(value)
+            except ValueError as e:
+                return None, f"{column} {e}"
+            values.append(value)
+        return tuple(values), None
+
+    def validate_batch(self, rows):
+        """([(index, values)], [(index, message)]) for a whole payload."""
+        good, bad = [], []
+        for index, row in enumerate(rows):
+            values, error = self.validate(row)
+            if error is None:
+                good.append((index, values))
+            else:
+                bad.append((index, error))
+        return good, bad
+
+    def key(self, values):
+        return values[self.key_position]
+
+
+def table_schema(conn, source):
+    """[(column, declared type)] of the source's raw table."""
+    return [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info({RAW_TABLES[source]})")]
+
+
+def compile_validator(source, schema):
+    declared = dict(schema)
+    missing = [column for column in IMPORT_COLUMNS[source] if column not in declared]
+    if missing:
+        raise ValueError(f"{RAW_TABLES[source]} has no column {missing[0]}; run init_db.py")
+    checks = [
+        (column, checker_for(declared[column]), FIELD_RULES.get(column))
+        for column in IMPORT_COLUMNS[source]
+    ]
+    return RowValidator(source, checks)
+
+
+_validators = {}
+
+
+def validator_for(conn, source):
+    """The compiled validator for source (compiled on first use in this
+    process), or None for an unknown source."""
+    source = (source or '').upper()
+    if source not in RAW_TABLES:
+        return None
+    if source not in _validators:
+        _validators[source] = compile_validator(source, table_schema(conn, source))
+    return _validators[source]
@@ -0,0 +1,343 @@
+"""Replay a weighted request mix against the app at a target rate.
+
+Requests are drawn from a mix file (see load_mix.json) with a seeded RNG and
+scheduled open-loop: request i is due at i / rate seconds, whether or not
+earlier requests have finished. Latency is measured from the due time, so a
+server that falls behind shows up as growing latency instead of a quietly
+lower request rate. --rate 0 sends as fast as the clients can.
+
+Everything runs offline. --transport test-client calls the Flask app through
+its test client; --transport server starts it on a local port in this
+process and sends real HTTP. By default the database is copied to a scratch
+file first, because the mix registers customers, uploads files and imports
+rows.
+
+    python backend/load_test.py --rate 50 --duration 30 --clients 16
+    python backend/load_test.py --transport server --mix my_mix.json --output load.json
+"""
+import argparse
+import contextlib
+import http.client
+import io
+import json
+import os
+import queue
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from db import DEFAULT_DB_PATH
+from metrics import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = os.path.join(BACKEND_DIR, 'load_mix.json')
+
+SETUP_CUSTOMER = {
+    'username': 'loadtest',
+    'email': 'loadtest@example.com',
+    'password': 'loadtest-password',
+    'first_name': 'Load',
+    'last_name': 'Test',
+}
+
+
+def load_mix(path):
+    with open(path) as f:
+        mix = json.load(f)
+    entries = mix['requests']
+    for entry in entries:
+        if entry.get('weight', 0) <= 0:
+            raise ValueError(f"Mix entry {entry.get('name')!r} needs a positive weight")
+    return entries
+
+
+def render(value, context):
+    """Fill {n} and {customer_id} placeholders in strings, lists and dicts.
+    A string that is exactly one placeholder becomes the raw value, so
+    "{customer_id}" stays an int in JSON bodies."""
+    if isinstance(value, str):
+        for key, replacement in context.items():
+            if value == '{' + key + '}':
+                return replacement
+        return value.format(**context)
+    if isinstance(value, dict):
+        return {k: render(v, context) for k, v in value.items()}
+    if isinstance(value, list):
+        return [render(v, context) for v in value]
+    return value
+
+
+def import_rows(source, n, count):
+    rows = []
+    for j in range(count):
+        key = f"LT{n:07d}{j:03d}"
+        row = {'FirstName': f"Load{j}", 'LastName': f"Test{n}", 'DOB': '2012-05-01', 'Address': f"{n} Test St"}
+        if source.upper() == 'CALPADS':
+            row.update({'SSID': key, 'SchoolName': 'Load Test Elementary', 'Grade': 3, 'MealStatus': 'Free'})
+        else:
+            row.update({'CaseNumber': key, 'ProgramType': 'CalFresh'})
+        rows.append(row)
+    return rows
+
+
+def fake_file(filename, size):
+    # Starts with the PDF magic number so document_worker classifies it
+    header = b'%PDF-1.4\n' if filename.lower().endswith('.pdf') else b''
+    return header + b'0' * max(size - len(header), 0)
+
+
+def build_request(entry, n, context):
+    """Turn a mix entry into (method, path, json, form, files)."""
+    context = dict(context, n=n)
+    body = render(entry.get('json'), context)
+    if 'import' in entry:
+        spec = entry['import']
+        body = {'source': spec['source'], 'data': import_rows(spec['source'], n, spec.get('rows', 10))}
+    files = {
+        field: (render(spec['filename'], context), fake_file(render(spec['filename'], context), spec.get('size', 1024)))
+        for field, spec in entry.get('files', {}).items()
+    }
+    return entry['method'], render(entry['path'], context), body, render(entry.get('form'), context), files
+
+
+class TestClientTransport:
+    """One Flask test client per client thread."""
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def send(self, method, path, body, form, files):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        if files:
+            data = dict(form or {})
+            for field, (filename, content) in files.items():
+                data[field] = (io.BytesIO(content), filename)
+            response = client.open(path, method=method, data=data, content_type='multipart/form-data')
+        elif form:
+            response = client.open(path, method=method, data=form)
+        else:
+            response = client.open(path, method=method, json=body)
+        response.get_data()
+        return response.status_code
+
+    def close(self):
+        pass
+
+
+class ServerTransport:
+    """Serve the app with werkzeug on a free local port, one keep-alive HTTP
+    connection per client thread."""
+
+    def __init__(self, app):
+        from werkzeug.serving import make_server
+        self.server = make_server('127.0.0.1', 0, app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, name='load-test-server', daemon=True)
+        self.thread.start()
+        self.local = threading.local()
+
+    def connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=60)
+        return conn
+
+    @staticmethod
+    def multipart(form, files):
+        boundary = uuid.uuid4().hex
+        parts = []
+        for name, value in (form or {}).items():
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode())
+        for name, (filename, content) in files.items():
+            parts.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                f'Content-Type: application/octet-stream\r\n\r\n'.encode() + content + b'\r\n'
+            )
+        parts.append(f'--{boundary}--\r\n'.encode())
+        return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+    def send(self, method, path, body, form, files):
+        if files or form:
+            payload, content_type = self.multipart(form, files)
+        elif body is not None:
+            payload, content_type = json.dumps(body).encode(), 'application/json'
+        else:
+            payload, content_type = None, None
+        headers = {'Content-Type': content_type} if content_type else {}
+        conn = self.connection()
+        try:
+            conn.request(method, path, body=payload, headers=headers)
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            # Drop the connection; the next request opens a new one
+            conn.close()
+            self.local.conn = None
+            raise
+        return response.status
+
+    def close(self):
+        self.server.shutdown()
+
+
+def setup_customer(app):
+    """Register (or, on a reused database, log in as) the customer the mix
+    uses. Done through the test client whatever the transport, since it's not
+    part of the measurement."""
+    client = app.test_client()
+    client.post('/api/customer/register', json=SETUP_CUSTOMER)
+    response = client.post('/api/customer/login', json={
+        'username': SETUP_CUSTOMER['username'],
+        'password': SETUP_CUSTOMER['password']
+    })
+    customer_id = (response.json or {}).get('customer_id')
+    if not customer_id:
+        raise RuntimeError(f"Could not log in as the load test customer: {response.json}")
+    return customer_id
+
+
+def schedule(mix, rate, duration, seed):
+    rng = random.Random(seed)
+    weights = [entry['weight'] for entry in mix]
+    if rate > 0:
+        count = int(rate * duration)
+        picks = rng.choices(mix, weights=weights, k=count)
+        return [(i / rate, entry) for i, entry in enumerate(picks)]
+    # Closed loop: plenty of requests, the clients stop at the deadline
+    return [(0.0, entry) for entry in rng.choices(mix, weights=weights, k=1_000_000)]
+
+
+def run_load(transport, mix, rate, duration, clients, seed, context):
+    jobs = queue.Queue()
+    for n, (due, entry) in enumerate(schedule(mix, rate, duration, seed)):
+        jobs.put((n, due, entry))
+    samples = []  # (name, latency, service_time, status or None)
+    lock = threading.Lock()
+    started = time.perf_counter()
+    deadline = started + duration
+
+    def client():
+        local = []
+        while True:
+            try:
+                n, due, entry = jobs.get_nowait()
+            except queue.Empty:
+                break
+            due_at = started + due
+            now = time.perf_counter()
+            if now >= deadline and rate <= 0:
+                break
+            if due_at > now:
+                time.sleep(due_at - now)
+            sent = time.perf_counter()
+            try:
+                status = transport.send(*build_request(entry, n, context))
+            except Exception as e:
+                print(f"{entry['name']}: {e}", file=sys.stderr)
+                status = None
+            done = time.perf_counter()
+            local.append((entry['name'], done - max(due_at, started), done - sent, status))
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=client, name=f'load-client-{i}') for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - started
+
+
+def summarize(samples):
+    def stats(rows):
+        latencies = [r[1] for r in rows]
+        errors = sum(1 for r in rows if r[3] is None or r[3] >= 400)
+        return {
+            'requests': len(rows),
+            'errors': errors,
+            'error_rate': round(errors / len(rows), 4) if rows else 0.0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+            'p90_ms': round(percentile(latencies, 0.9) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'max_ms': round(max(latencies) * 1000, 3) if latencies else None,
+            'service_p50_ms': round(percentile([r[2] for r in rows], 0.5) * 1000, 3),
+            'status_codes': {
+                str(code): sum(1 for r in rows if r[3] == code)
+                for code in sorted({r[3] for r in rows}, key=lambda c: (c is None, c or 0))
+            },
+        }
+
+    by_name = {}
+    for row in samples:
+        by_name.setdefault(row[0], []).append(row)
+    return stats(samples), {name: stats(rows) for name, rows in sorted(by_name.items())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mix', default=DEFAULT_MIX)
+    parser.add_argument('--rate', type=float, default=20, help='Requests per second; 0 for as fast as possible')
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--transport', choices=['test-client', 'server'], default='test-client')
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help='Database to copy for the run')
+    parser.add_argument('--in-place', action='store_true', help='Run against --db itself instead of a copy')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    args = parser.parse_args()
+
+    mix = load_mix(args.mix)
+    workdir = tempfile.mkdtemp(prefix='caliedu-load-')
+    db_path = os.path.abspath(args.db)
+    if not args.in_place:
+        db_path = os.path.join(workdir, 'caliedu.db')
+        shutil.copyfile(args.db, db_path)
+    previous_dir = os.getcwd()
+    # Uploads are saved relative to the working directory
+    os.chdir(workdir)
+
+    from app import create_app
+    app = create_app({'DB_PATH': db_path})
+    try:
+        # Route code print()s as it goes; keep stdout for the report
+        with contextlib.redirect_stdout(sys.stderr):
+            transport = TestClientTransport(app) if args.transport == 'test-client' else ServerTransport(app)
+            try:
+                context = {'customer_id': setup_customer(app)}
+                samples, elapsed = run_load(transport, mix, args.rate, args.duration, args.clients,
+                                            args.seed, context)
+            finally:
+                transport.close()
+    finally:
+        os.chdir(previous_dir)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    overall, endpoints = summarize(samples)
+    report = {
+        'mix': os.path.abspath(args.mix),
+        'transport': args.transport,
+        'target_rate': args.rate,
+        'achieved_rate': round(len(samples) / elapsed, 3) if elapsed else None,
+        'duration_seconds': round(elapsed, 3),
+        'clients': args.clients,
+        'seed': args.seed,
+        'overall': overall,
+        'endpoints': endpoints,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""In-process metrics, exported in Prometheus text format on /metrics.
+
+Counters are per process; with several gunicorn workers each scrape sees the
+worker that answered it.
+"""
+import threading
+from collections import deque
+
+SAMPLE_SIZE = 1024  # latencies kept per series for the quantiles
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def percentile(samples, p):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def label_string(labels):
+    escaped = (
+        (k, str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for k, v in labels
+    )
+    return '{' + ','.join(f'{k}="{v}"' for k, v in escaped) + '}'
+
+
+class QueryStat:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+
+class QueryStats:
+    """Call count, total/p50/p99 latency and rows per (endpoint, query)."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+
+    def record(self, endpoint, query, seconds, rows):
+        with self.lock:
+            stat = self.stats.get((endpoint, query))
+            if stat is None:
+                stat = self.stats[(endpoint, query)] = QueryStat()
+            stat.calls += 1
+            stat.seconds += seconds
+            stat.rows += rows
+            stat.samples.append(seconds)
+
+    def snapshot(self):
+        with self.lock:
+            return [
+                {
+                    'endpoint': endpoint,
+                    'query': query,
+                    'calls': stat.calls,
+                    'total_seconds': stat.seconds,
+                    'p50_seconds': percentile(stat.samples, 0.5),
+                    'p99_seconds': percentile(stat.samples, 0.99),
+                    'rows': stat.rows
+                }
+                for (endpoint, query), stat in self.stats.items()
+            ]
+
+    def reset(self):
+        with self.lock:
+            self.stats.clear()
+
+    def prometheus(self):
+        lines = [
+            '# HELP sqlite_query_seconds Time spent executing and fetching a named query.',
+            '# TYPE sqlite_query_seconds summary',
+        ]
+        snapshot = sorted(self.snapshot(), key=lambda s: (s['endpoint'], s['query']))
+        for s in snapshot:
+            labels = [('endpoint', s['endpoint']), ('query', s['query'])]
+            lines.append(f"sqlite_query_seconds{label_string(labels + [('quantile', '0.5')])} {s['p50_seconds']:.6f}")
+            lines.append(f"sqlite_query_seconds{label_string(labels + [('quantile', '0.99')])} {s['p99_seconds']:.6f}")
+            lines.append(f"sqlite_query_seconds_sum{label_string(labels)} {s['total_seconds']:.6f}")
+            lines.append(f"sqlite_query_seconds_count{label_string(labels)} {s['calls']}")
+        lines.append('# HELP sqlite_query_rows_total Rows returned (reads) or affected (writes) by a named query.')
+        lines.append('# TYPE sqlite_query_rows_total counter')
+        for s in snapshot:
+            labels = [('endpoint', s['endpoint']), ('query', s['query'])]
+            lines.append(f"sqlite_query_rows_total{label_string(labels)} {s['rows']}")
+        return '\n'.join(lines) + '\n'
+
+
+class RequestStat:
+    def __init__(self):
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.seconds = 0.0
+
+
+class EndpointTotals:
+    def __init__(self):
+        self.db_seconds = 0.0
+        self.python_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+
+class RequestStats:
+    """Latency histogram per (method, endpoint, status), plus DB time, Python
+    time and payload bytes per endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = {}
+        self.totals = {}
+
+    def record(self, method, endpoint, status, seconds, db_seconds, request_bytes, response_bytes):
+        with self.lock:
+            stat = self.latency.get((method, endpoint, status))
+            if stat is None:
+                stat = self.latency[(method, endpoint, status)] = RequestStat()
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    stat.buckets[i] += 1
+            stat.count += 1
+            stat.seconds += seconds
+
+            totals = self.totals.get(endpoint)
+            if totals is None:
+                totals = self.totals[endpoint] = EndpointTotals()
+            totals.db_seconds += db_seconds
+            totals.python_seconds += max(seconds - db_seconds, 0.0)
+            totals.request_bytes += request_bytes
+            totals.response_bytes += response_bytes
+
+    def reset(self):
+        with self.lock:
+            self.latency.clear()
+            self.totals.clear()
+
+    def prometheus(self):
+        lines = [
+            '# HELP http_request_duration_seconds Wall time per request.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        with self.lock:
+            latency = sorted(
+                (key, list(stat.buckets), stat.count, stat.seconds)
+                for key, stat in self.latency.items()
+            )
+            totals = sorted(
+                (endpoint, t.db_seconds, t.python_seconds, t.request_bytes, t.response_bytes)
+                for endpoint, t in self.totals.items()
+            )
+        for (method, endpoint, status), buckets, count, seconds in latency:
+            labels = [('method', method), ('endpoint', endpoint), ('status', status)]
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                lines.append(f"http_request_duration_seconds_bucket{label_string(labels + [('le', bound)])} {n}")
+            lines.append(f"http_request_duration_seconds_bucket{label_string(labels + [('le', '+Inf')])} {count}")
+            lines.append(f"http_request_duration_seconds_sum{label_string(labels)} {seconds:.6f}")
+            lines.append(f"http_request_duration_seconds_count{label_string(labels)} {count}")
+
+        counters = [
+            ('http_request_db_seconds_total', 'Time spent in named queries while serving requests.', 1, '{:.6f}'),
+            ('http_request_python_seconds_total', 'Request time not spent in named queries.', 2, '{:.6f}'),
+            ('http_request_bytes_total', 'Request body bytes received.', 3, '{}'),
+            ('http_response_bytes_total', 'Response body bytes sent.', 4, '{}'),
+        ]
+        for name, help_text, index, fmt in counters:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for row in totals:
+                lines.append(f"{name}{label_string([('endpoint', row[0])])} {fmt.format(row[index])}")
+        return '\n'.join(lines) + '\n'
+
+
+query_stats = QueryStats()
+request_stats = RequestStats()
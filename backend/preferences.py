@@ -0,0 +1,91 @@
+"""Program preference upserts.
+
+ProgramPreferences has a unique key on (CustomerID, ProgramType), so every
+write here is an INSERT ... ON CONFLICT DO UPDATE (preferences.upsert and
+preferences.upsert_opt_out in queries.py) run through executemany.
+"""
+import csv
+import io
+from datetime import datetime
+
+import queries
+
+CHUNK_SIZE = 10000
+
+def preference_row(customer_id, program_type, preferences, updated_date):
+    return (
+        customer_id,
+        program_type,
+        preferences.get('opted_in', 1),
+        preferences.get('communication_method', 'Email'),
+        preferences.get('language_preference', 'en'),
+        updated_date
+    )
+
+
+def customer_preference_rows(customer_id, preferences):
+    """Rows for one customer's {program_type: {...}} dict, as posted to
+    /api/customer/program-preferences."""
+    updated_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    return [
+        preference_row(customer_id, program_type, prefs, updated_date)
+        for program_type, prefs in preferences.items()
+    ]
+
+
+def bulk_preference_rows(records):
+    """Rows for a list of {'customer_id', 'program_type', ...} records."""
+    updated_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for record in records:
+        if not record.get('customer_id') or not record.get('program_type'):
+            raise ValueError('customer_id and program_type are required for every preference')
+        yield preference_row(record['customer_id'], record['program_type'], record, updated_date)
+
+
+def execute_in_chunks(conn, query_name, rows, chunk_size=CHUNK_SIZE):
+    count = 0
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            queries.executemany(conn, query_name, chunk)
+            count += len(chunk)
+            chunk = []
+    if chunk:
+        queries.executemany(conn, query_name, chunk)
+        count += len(chunk)
+    return count
+
+
+def upsert_preferences(conn, rows):
+    """Upsert preference rows in one transaction. Returns the row count."""
+    try:
+        count = execute_in_chunks(conn, 'preferences.upsert', rows)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return count
+
+
+def opt_out_rows(csv_file):
+    """Read (CustomerID, ProgramType) pairs from the communications team's
+    opt-out CSV. Blank lines and rows missing either value are skipped."""
+    updated_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    for row in csv.DictReader(csv_file):
+        customer_id = (row.get('CustomerID') or '').strip()
+        program_type = (row.get('ProgramType') or '').strip()
+        if customer_id and program_type:
+            yield (int(customer_id), program_type, updated_date)
+
+
+def import_opt_out_csv(conn, stream):
+    """Apply an opt-out CSV from a binary stream (e.g. an uploaded file)."""
+    csv_file = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    try:
+        count = execute_in_chunks(conn, 'preferences.upsert_opt_out', opt_out_rows(csv_file))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return count
@@ -0,0 +1,581 @@
+"""Named SQL statements.
+
+Every statement the app runs is registered here under a name. Because the
+SQL text for a name never changes, sqlite3's per-connection statement cache
+(see ConnectionPool) reuses the prepared statement on every call. The
+execute/fetch helpers time each call and record it in metrics.query_stats
+under the name and the Flask endpoint that ran it.
+"""
+import threading
+import time
+
+from flask import g, has_request_context, request
+
+from metrics import query_stats
+
+QUERIES = {
+    # === Staff ===
+    'staff.user_by_username': """
+        SELECT * FROM Users WHERE Username = ?
+    """,
+    'staff.eligibility_records': """
+        SELECT e.*, h.HouseholdName, h.Address
+        FROM EligibilityRecords e
+        LEFT JOIN Households h ON e.HouseholdID = h.HouseholdID
+    """,
+    'staff.insert_eligibility_record': """
+        INSERT INTO EligibilityRecords
+        (ParticipantID, IssuanceType, IssuanceAmount, IssuanceDate, ApprovalStatus, HouseholdID)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'staff.households': """
+        SELECT * FROM Households
+    """,
+    'staff.insert_household': """
+        INSERT INTO Households (HouseholdName, Address, AddressKey)
+        VALUES (?, ?, ?)
+    """,
+    'staff.documents_for_eligibility': """
+        SELECT d.*, u.Username as UploadedByName
+        FROM Documents d
+        LEFT JOIN Users u ON d.UploadedBy = u.UserID
+        WHERE d.EligibilityID = ?
+    """,
+    'staff.users': """
+        SELECT u.UserID, u.Username, u.Email, u.RoleID, u.LastLogin, r.RoleName
+        FROM Users u
+        LEFT JOIN Roles r ON u.RoleID = r.RoleID
+    """,
+    'staff.audit_logs_page': """
+        SELECT a.*, u.Username
+        FROM AuditLogs a
+        LEFT JOIN Users u ON a.UserID = u.UserID
+        ORDER BY a.ActionDate DESC
+        LIMIT ? OFFSET ?
+    """,
+    # Materialized by the caseload triggers in init_db.py (caseload_view.py)
+    'staff.cases': """
+        SELECT CaseID as caseId, Name AS name, Status as status, Created as created,
+               LastModified as lastModified, EligibilityReason as eligibilityReason,
+               Documents as documents, Notes as notes
+        FROM CaseloadCases
+    """,
+
+    # === Customer ===
+    'customer.account_exists': """
+        SELECT CustomerID FROM CustomerAccounts
+        WHERE Username = ? OR Email = ?
+    """,
+    'customer.insert_account': """
+        INSERT INTO CustomerAccounts
+        (Username, PasswordHash, Email, FirstName, LastName, DOB, PhoneNumber,
+         PreferredLanguage, MFAEnabled, MFASecret)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'customer.account_for_login': """
+        SELECT * FROM CustomerAccounts
+        WHERE Username = ? OR Email = ?
+    """,
+    'customer.update_last_login': """
+        UPDATE CustomerAccounts
+        SET LastLogin = ?
+        WHERE CustomerID = ?
+    """,
+    'customer.insert_session': """
+        INSERT INTO CustomerSessions
+        (CustomerID, SessionToken, MFAVerified, ExpiresAt, IPAddress, UserAgent)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'customer.profile': """
+        SELECT CustomerID, Username, Email, PhoneNumber, FirstName, LastName, DOB,
+               PreferredLanguage, MFAEnabled, AccountStatus, CreatedAt, LastLogin,
+               EmailVerified, PhoneVerified
+        FROM CustomerAccounts
+        WHERE CustomerID = ?
+    """,
+    'customer.insert_application': """
+        INSERT INTO EligibilityApplications
+        (CustomerID, HouseholdSize, MonthlyIncome, HasDisability, IsPregnant,
+         IsHomeless, ReceivesSNAP, ReceivesTANF, ReceivesFDPIR, EligibilityResult)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'customer.insert_document': """
+        INSERT INTO CustomerDocuments
+        (CustomerID, ApplicationID, DocumentType, FileName, FileSize,
+         FilePath, MimeType, Status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, 'Uploaded')
+    """,
+    'customer.preferences': """
+        SELECT * FROM ProgramPreferences
+        WHERE CustomerID = ?
+    """,
+
+    # === Documents (document_worker.py) ===
+    'documents.enqueue_job': """
+        INSERT INTO DocumentJobs (DocumentID, Status, Attempts, CreatedAt)
+        VALUES (?, 'Queued', 0, ?)
+    """,
+    'documents.fail_expired_leases': """
+        UPDATE DocumentJobs
+        SET Status = 'Failed', LeaseOwner = NULL, LeaseExpires = NULL,
+            LastError = 'Lease expired on the last attempt'
+        WHERE Status = 'Leased' AND LeaseExpires < ? AND Attempts >= ?
+    """,
+    'documents.next_job': """
+        SELECT JobID, DocumentID, Attempts FROM DocumentJobs
+        WHERE Status = 'Queued'
+           OR (Status = 'Leased' AND LeaseExpires < ? AND Attempts < ?)
+        ORDER BY JobID LIMIT 1
+    """,
+    'documents.lease_job': """
+        UPDATE DocumentJobs
+        SET Status = 'Leased', LeaseOwner = ?, LeaseExpires = ?, Attempts = Attempts + 1
+        WHERE JobID = ?
+    """,
+    'documents.document': """
+        SELECT DocumentID, FilePath FROM CustomerDocuments WHERE DocumentID = ?
+    """,
+    'documents.mark_processed': """
+        UPDATE CustomerDocuments
+        SET DetectedMimeType = ?, PageCount = ?, ThumbnailPath = ?, Status = 'Processed'
+        WHERE DocumentID = ?
+    """,
+    'documents.complete_job': """
+        UPDATE DocumentJobs
+        SET Status = 'Done', LeaseOwner = NULL, LeaseExpires = NULL, FinishedAt = ?
+        WHERE JobID = ?
+    """,
+    'documents.fail_job': """
+        UPDATE DocumentJobs
+        SET Status = ?, LeaseOwner = NULL, LeaseExpires = NULL, LastError = ?
+        WHERE JobID = ?
+    """,
+
+    # === EBT cards (ebt_cards.py) ===
+    'ebt.current_card': """
+        SELECT CardID, ReplacementCount FROM CustomerEBTCards
+        WHERE CustomerID = ? AND Status IN ('Active', 'Processing')
+        ORDER BY IssuedDate DESC, CardID DESC LIMIT 1
+    """,
+    'ebt.card_holder': """
+        SELECT FirstName, LastName FROM CustomerAccounts
+        WHERE CustomerID = ?
+    """,
+    'ebt.mark_replaced': """
+        UPDATE CustomerEBTCards
+        SET Status = 'Replaced'
+        WHERE CardID = ?
+    """,
+    'ebt.insert_card': """
+        INSERT INTO CustomerEBTCards
+        (CustomerID, CardNumber, CardHolderName, ExpirationDate, Status,
+         ReplacementReason, ReplacementCount)
+        VALUES (?, ?, ?, ?, 'Processing', ?, ?)
+    """,
+    'ebt.sequence_next': """
+        SELECT NextValue FROM CardNumberSequence WHERE Prefix = ?
+    """,
+    'ebt.sequence_advance': """
+        INSERT INTO CardNumberSequence (Prefix, NextValue) VALUES (?, ?)
+        ON CONFLICT(Prefix) DO UPDATE SET NextValue = excluded.NextValue
+    """,
+
+    # === Bulk card issuance (card_issuance.py) ===
+    'issuance.cases_without_card': """
+        SELECT c.CaseID, b.FirstName, b.LastName, b.Address, l.CustomerID
+        FROM CaseBenefit c
+        JOIN Beneficiary b ON c.BeneficiaryID = b.BeneficiaryID
+        LEFT JOIN CustomerBeneficiaryLink l ON l.BeneficiaryID = b.BeneficiaryID
+        WHERE c.Status = 'eligible' AND c.CaseID > ?
+          AND NOT EXISTS (SELECT 1 FROM CustomerEBTCards k WHERE k.CaseID = c.CaseID)
+        GROUP BY c.CaseID
+        ORDER BY c.CaseID
+        LIMIT ?
+    """,
+    'issuance.last_card_id': """
+        SELECT COALESCE(MAX(CardID), 0) FROM CustomerEBTCards
+    """,
+    'issuance.insert_card': """
+        INSERT INTO CustomerEBTCards
+        (CustomerID, CaseID, CardNumber, CardHolderName, ExpirationDate, Status,
+         IssuedDate, ReplacementCount)
+        VALUES (?, ?, ?, ?, ?, 'Processing', ?, 0)
+    """,
+    'issuance.next_account_id': """
+        SELECT COALESCE(MAX(EBTAccountID), 0) + 1 FROM EBTAccounts
+    """,
+    'issuance.insert_account': """
+        INSERT INTO EBTAccounts (EBTAccountID, CaseID, AccountNumber, Status, BenefitBalance)
+        VALUES (?, ?, ?, 'Pending', 0)
+    """,
+    'issuance.card_ids_since': """
+        SELECT CardNumber, CardID FROM CustomerEBTCards WHERE CardID > ?
+    """,
+
+    # === Program preferences (preferences.py) ===
+    'preferences.upsert': """
+        INSERT INTO ProgramPreferences
+        (CustomerID, ProgramType, OptedIn, CommunicationMethod, LanguagePreference, UpdatedDate)
+        VALUES (?, ?, ?, ?, ?, ?)
+        ON CONFLICT (CustomerID, ProgramType) DO UPDATE SET
+            OptedIn = excluded.OptedIn,
+            CommunicationMethod = excluded.CommunicationMethod,
+            LanguagePreference = excluded.LanguagePreference,
+            UpdatedDate = excluded.UpdatedDate
+    """,
+    # Opt-outs only flip OptedIn; the customer's other settings are kept
+    'preferences.upsert_opt_out': """
+        INSERT INTO ProgramPreferences (CustomerID, ProgramType, OptedIn, UpdatedDate)
+        VALUES (?, ?, 0, ?)
+        ON CONFLICT (CustomerID, ProgramType) DO UPDATE SET
+            OptedIn = 0,
+            UpdatedDate = excluded.UpdatedDate
+    """,
+
+    # === Imports ===
+    'imports.calpads_row_hash': """
+        SELECT RowHash FROM RawCALPADS WHERE SSID = ? LIMIT 1
+    """,
+    'imports.calsaws_row_hash': """
+        SELECT RowHash FROM RawCALSAWS WHERE CaseNumber = ? LIMIT 1
+    """,
+    'imports.insert_calpads': """
+        INSERT INTO RawCALPADS
+        (SSID, FirstName, LastName, DOB, Address, SchoolName, Grade, MealStatus, RowHash, ImportTimestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'imports.insert_calsaws': """
+        INSERT INTO RawCALSAWS
+        (CaseNumber, FirstName, LastName, DOB, Address, ProgramType, RowHash, ImportTimestamp)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    # Materialized by the caseload triggers in init_db.py (caseload_view.py)
+    'imports.results': """
+        SELECT SSID, FirstName, LastName, DOB, Address, MealStatus, CaseNumber, CALSAWS_ProgramType, IsEligible,
+               Reason
+        FROM CaseloadResults
+    """,
+
+    # === Deduplication errors (dedup_errors.py) ===
+    # ErrorID is a plain INT key; each row takes the next one
+    'dedup.insert_reject': """
+        INSERT INTO DeduplicationErrors (ErrorID, Source, RecordID, ErrorMessage, Reviewed, LoggedAt, JobID, RowData)
+        SELECT COALESCE(MAX(ErrorID), 0) + 1, ?, ?, ?, 0, ?, ?, ? FROM DeduplicationErrors
+    """,
+    'dedup.insert_conflict': """
+        INSERT OR IGNORE INTO DeduplicationErrors
+        (ErrorID, Source, RecordID, RecordKey, MatchedRecord, ErrorMessage, Reviewed, LoggedAt, JobID, RowData,
+         ConflictKey)
+        SELECT COALESCE(MAX(ErrorID), 0) + 1, ?, ?, ?, ?, ?, 0, ?, ?, ?, ? FROM DeduplicationErrors
+    """,
+    'dedup.review_page': """
+        SELECT ErrorID, Source, RecordID, RecordKey, MatchedRecord, ErrorMessage, Reviewed, LoggedAt, JobID, RowData
+        FROM DeduplicationErrors
+        WHERE Reviewed = ? AND (Source, ErrorID) > (?, ?)
+        ORDER BY Source, ErrorID
+        LIMIT ?
+    """,
+    'dedup.review_page_for_source': """
+        SELECT ErrorID, Source, RecordID, RecordKey, MatchedRecord, ErrorMessage, Reviewed, LoggedAt, JobID, RowData
+        FROM DeduplicationErrors
+        WHERE Reviewed = ? AND Source = ? AND ErrorID > ?
+        ORDER BY ErrorID
+        LIMIT ?
+    """,
+    'dedup.unreviewed_counts': """
+        SELECT Source, COUNT(*) AS count FROM DeduplicationErrors
+        WHERE Reviewed = 0
+        GROUP BY Source
+    """,
+    'dedup.mark_reviewed': """
+        UPDATE DeduplicationErrors SET Reviewed = ? WHERE ErrorID = ?
+    """,
+
+    # === Household resolution (households.py) ===
+    'households.unassigned': """
+        SELECT BeneficiaryID, LastName, Address, AddressKey FROM Beneficiary
+        WHERE HouseholdID IS NULL
+        ORDER BY BeneficiaryID
+    """,
+    'households.create_new_addresses': """
+        CREATE TEMP TABLE IF NOT EXISTS NewAddresses (AddressKey NVARCHAR(255) PRIMARY KEY)
+    """,
+    'households.clear_new_addresses': """
+        DELETE FROM temp.NewAddresses
+    """,
+    'households.insert_new_address': """
+        INSERT OR IGNORE INTO temp.NewAddresses (AddressKey) VALUES (?)
+    """,
+    # One index seek on Beneficiary.AddressKey per new address (CROSS JOIN
+    # keeps SQLite from scanning Beneficiary instead)
+    'households.placed_at_new_addresses': """
+        SELECT b.AddressKey, b.LastName, b.HouseholdID
+        FROM temp.NewAddresses n
+        CROSS JOIN Beneficiary b ON b.AddressKey = n.AddressKey
+        WHERE b.HouseholdID IS NOT NULL
+    """,
+    'households.next_id': """
+        SELECT COALESCE(MAX(HouseholdID), 0) + 1 FROM Households
+    """,
+    'households.insert': """
+        INSERT INTO Households (HouseholdID, HouseholdName, Address, AddressKey) VALUES (?, ?, ?, ?)
+    """,
+    'households.assign': """
+        UPDATE Beneficiary SET HouseholdID = ? WHERE BeneficiaryID = ?
+    """,
+    'households.move_members': """
+        UPDATE Beneficiary SET HouseholdID = ? WHERE HouseholdID = ?
+    """,
+    'households.move_eligibility': """
+        UPDATE EligibilityRecords SET HouseholdID = ? WHERE HouseholdID = ?
+    """,
+    'households.delete': """
+        DELETE FROM Households WHERE HouseholdID = ?
+    """,
+
+    # === Materialized caseload (caseload_view.py) ===
+    # The live joins CaseloadResults and CaseloadCases stand in for
+    'caseload.live_results': """
+        SELECT p.SSID, COALESCE(p.FirstName, s.FirstName) AS FirstName,
+               COALESCE(p.LastName, s.LastName) AS LastName, COALESCE(p.DOB, s.DOB) AS DOB,
+               COALESCE(s.Address, p.Address) AS Address, p.MealStatus, s.CaseNumber,
+               s.ProgramType AS CALSAWS_ProgramType, e.IsEligible, e.Reason
+        FROM RawCALPADS p
+        FULL OUTER JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        LEFT JOIN LunchEligibilityStatus e ON p.SSID = e.SSID
+    """,
+    'caseload.live_cases': """
+        SELECT c.CaseID, c.BeneficiaryID, b.FirstName || ' ' || b.LastName AS Name, c.Status, c.Created,
+               c.LastModified, c.EligibilityReason, c.Documents, c.Notes
+        FROM CaseBenefit c LEFT JOIN Beneficiary b ON c.BeneficiaryID = b.BeneficiaryID
+    """,
+    'caseload.materialized_results': """
+        SELECT SSID, FirstName, LastName, DOB, Address, MealStatus, CaseNumber, CALSAWS_ProgramType, IsEligible,
+               Reason
+        FROM CaseloadResults
+    """,
+    'caseload.materialized_cases': """
+        SELECT CaseID, BeneficiaryID, Name, Status, Created, LastModified, EligibilityReason, Documents, Notes
+        FROM CaseloadCases
+    """,
+    'caseload.clear_results': """
+        DELETE FROM CaseloadResults
+    """,
+    'caseload.clear_cases': """
+        DELETE FROM CaseloadCases
+    """,
+
+    # === Address keys (addresses.py) ===
+    'addresses.beneficiaries_without_key': """
+        SELECT BeneficiaryID AS RowID, Address FROM Beneficiary
+        WHERE AddressKey IS NULL AND Address IS NOT NULL AND BeneficiaryID > ?
+        ORDER BY BeneficiaryID
+        LIMIT ?
+    """,
+    'addresses.set_beneficiary_key': """
+        UPDATE Beneficiary SET AddressKey = ? WHERE BeneficiaryID = ?
+    """,
+    'addresses.households_without_key': """
+        SELECT rowid AS RowID, Address FROM Households
+        WHERE AddressKey IS NULL AND Address IS NOT NULL AND rowid > ?
+        ORDER BY rowid
+        LIMIT ?
+    """,
+    'addresses.set_household_key': """
+        UPDATE Households SET AddressKey = ? WHERE rowid = ?
+    """,
+
+    # === Import jobs (import_jobs.py) ===
+    'import_jobs.insert': """
+        INSERT INTO ImportJobs (JobID, Source, Status, TotalRows, CreatedAt)
+        VALUES (?, ?, 'processing', ?, ?)
+    """,
+    'import_jobs.update': """
+        UPDATE ImportJobs
+        SET Status = ?, InsertedRows = ?, UpdatedRows = ?, SkippedRows = ?, UnchangedRows = ?,
+            ErrorCount = ?, ErrorSample = ?, DuplicateOf = ?
+        WHERE JobID = ?
+    """,
+    'import_jobs.finish': """
+        UPDATE ImportJobs
+        SET Status = ?, FinishedAt = ?, DurationMs = ?
+        WHERE JobID = ?
+    """,
+    'import_jobs.get': """
+        SELECT * FROM ImportJobs WHERE JobID = ?
+    """,
+    'import_jobs.purge': """
+        DELETE FROM ImportJobs WHERE CreatedAt < ?
+    """,
+
+    # === Import manifests (import_manifests.py) ===
+    'manifests.find': """
+        SELECT ManifestID, JobID FROM ImportManifests
+        WHERE Source = ? AND PayloadHash = ?
+    """,
+    'manifests.latest': """
+        SELECT ManifestID FROM ImportManifests
+        WHERE Source = ?
+        ORDER BY ManifestID DESC LIMIT 1
+    """,
+    'manifests.rows': """
+        SELECT RowKey, RowHash FROM ImportManifestRows WHERE ManifestID = ?
+    """,
+    'manifests.insert': """
+        INSERT OR IGNORE INTO ImportManifests (Source, PayloadHash, JobID, RowCount, CreatedAt)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    'manifests.insert_row': """
+        INSERT OR REPLACE INTO ImportManifestRows (ManifestID, RowKey, RowHash)
+        VALUES (?, ?, ?)
+    """,
+    'manifests.prune_rows': """
+        DELETE FROM ImportManifestRows
+        WHERE ManifestID IN (SELECT ManifestID FROM ImportManifests WHERE Source = ? AND ManifestID < ?)
+    """,
+
+    # === Change-data-capture imports (import_cdc.py) ===
+    'cdc.calpads_row': """
+        SELECT * FROM RawCALPADS WHERE SSID = ? LIMIT 1
+    """,
+    'cdc.calsaws_row': """
+        SELECT * FROM RawCALSAWS WHERE CaseNumber = ? LIMIT 1
+    """,
+    'cdc.log_change': """
+        INSERT INTO ImportChangeLog (JobID, Source, RowKey, ChangeType, FieldName, OldValue, NewValue, ChangedAt)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+    'cdc.changes_for_job': """
+        SELECT ChangeID, Source, RowKey, ChangeType, FieldName, OldValue, NewValue, ChangedAt
+        FROM ImportChangeLog
+        WHERE JobID = ?
+        ORDER BY ChangeID
+        LIMIT ? OFFSET ?
+    """,
+
+    # === Reconciliation ===
+    'reconciliation.joined_people': """
+        SELECT p.SSID, COALESCE(p.FirstName, s.FirstName) AS FirstName,
+               COALESCE(p.LastName, s.LastName) AS LastName, COALESCE(p.DOB, s.DOB) AS DOB,
+               s.Address AS CalsawsAddress, p.Address AS CalpadsAddress
+        FROM RawCALPADS p
+        FULL OUTER JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+    """,
+    'reconciliation.insert_beneficiary': """
+        INSERT OR REPLACE INTO Beneficiary (SSID, FirstName, LastName, DOB, Address, AddressKey)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """,
+    'reconciliation.joined_cases': """
+        SELECT COALESCE(p.MealStatus, s.ProgramType) AS EligibilityReason, b.BeneficiaryID
+        FROM RawCALPADS p
+        FULL OUTER JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        LEFT JOIN Beneficiary b ON COALESCE(p.FirstName, s.FirstName) = b.FirstName
+            AND COALESCE(p.LastName, s.LastName) = b.LastName AND COALESCE(p.DOB, s.DOB) = b.DOB
+    """,
+    'reconciliation.case_for_beneficiary': """
+        SELECT CaseID, EligibilityReason FROM CaseBenefit WHERE BeneficiaryID = ? LIMIT 1
+    """,
+    'reconciliation.insert_case': """
+        INSERT OR REPLACE INTO CaseBenefit (EligibilityReason, BeneficiaryID, CaseID, Created, Status)
+        VALUES (?, ?, ?, ?, ?)
+    """,
+    'reconciliation.person_by_ssid': """
+        SELECT p.SSID, COALESCE(p.FirstName, s.FirstName) AS FirstName,
+               COALESCE(p.LastName, s.LastName) AS LastName, COALESCE(p.DOB, s.DOB) AS DOB,
+               s.Address AS CalsawsAddress, p.Address AS CalpadsAddress,
+               COALESCE(p.MealStatus, s.ProgramType) AS EligibilityReason
+        FROM RawCALPADS p
+        LEFT JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        WHERE p.SSID = ?
+    """,
+    'reconciliation.person_by_case': """
+        SELECT p.SSID, COALESCE(p.FirstName, s.FirstName) AS FirstName,
+               COALESCE(p.LastName, s.LastName) AS LastName, COALESCE(p.DOB, s.DOB) AS DOB,
+               s.Address AS CalsawsAddress, p.Address AS CalpadsAddress,
+               COALESCE(p.MealStatus, s.ProgramType) AS EligibilityReason
+        FROM RawCALSAWS s
+        LEFT JOIN RawCALPADS p ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        WHERE s.CaseNumber = ?
+    """,
+    'reconciliation.beneficiary_by_ssid': """
+        SELECT BeneficiaryID, SSID FROM Beneficiary WHERE SSID = ? LIMIT 1
+    """,
+    'reconciliation.beneficiary_by_person': """
+        SELECT BeneficiaryID, SSID FROM Beneficiary WHERE FirstName = ? AND LastName = ? AND DOB = ? LIMIT 1
+    """,
+    'reconciliation.update_beneficiary': """
+        UPDATE Beneficiary SET SSID = COALESCE(?, SSID), FirstName = ?, LastName = ?, DOB = ?, Address = ?,
+            AddressKey = ?
+        WHERE BeneficiaryID = ?
+    """,
+    'reconciliation.update_case_reason': """
+        UPDATE CaseBenefit SET EligibilityReason = ?, LastModified = ?
+        WHERE BeneficiaryID = ? AND COALESCE(EligibilityReason, '') != COALESCE(?, '')
+    """,
+    'reconciliation.case_count': """
+        SELECT COUNT(*) FROM CaseBenefit
+    """,
+
+    # === Reporting ===
+    'reporting.count_eligibility_records': """
+        SELECT COUNT(*) as count FROM EligibilityRecords
+    """,
+    'reporting.count_eligibility_by_status': """
+        SELECT COUNT(*) as count FROM EligibilityRecords WHERE ApprovalStatus = ?
+    """,
+}
+
+
+def current_endpoint():
+    # Outside a request (group-commit writer, CLI scripts, workers) the
+    # thread name says where the query came from
+    if has_request_context():
+        return request.endpoint or request.path
+    return threading.current_thread().name
+
+
+def record(name, started, rows):
+    seconds = time.perf_counter() - started
+    query_stats.record(current_endpoint(), name, seconds, rows)
+    if has_request_context():
+        # Read back by request_metrics to split DB time from Python time
+        g.db_seconds = g.get('db_seconds', 0.0) + seconds
+
+
+def execute(conn, name, params=()):
+    """Run a write (or a read whose cursor the caller iterates itself)."""
+    started = time.perf_counter()
+    cursor = conn.execute(QUERIES[name], params)
+    record(name, started, max(cursor.rowcount, 0))
+    return cursor
+
+
+def executemany(conn, name, seq_of_params):
+    started = time.perf_counter()
+    cursor = conn.executemany(QUERIES[name], seq_of_params)
+    record(name, started, max(cursor.rowcount, 0))
+    return cursor
+
+
+def fetchall(conn, name, params=()):
+    started = time.perf_counter()
+    rows = conn.execute(QUERIES[name], params).fetchall()
+    record(name, started, len(rows))
+    return rows
+
+
+def fetchone(conn, name, params=()):
+    started = time.perf_counter()
+    row = conn.execute(QUERIES[name], params).fetchone()
+    record(name, started, 1 if row is not None else 0)
+    return row
+
+
+def execute_dynamic(conn, name, sql, params=()):
+    """For the few statements whose text still depends on the input (the raw
+    import INSERT). They are timed like the rest but can't share a cached
+    statement across different column sets."""
+    started = time.perf_counter()
+    cursor = conn.execute(sql, params)
+    record(name, started, max(cursor.rowcount, 0))
+    return cursor
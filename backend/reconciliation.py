@@ -0,0 +1,177 @@
+"""Reconciliation of the raw CALPADS/CALSAWS imports into Beneficiary and
+CaseBenefit rows. Called by the import blueprint after each import.
+Conflicts found on the way are logged to DeduplicationErrors, and new
+beneficiaries are placed into households before the commit."""
+from datetime import datetime
+
+from flask import jsonify
+
+from db import get_db
+from addresses import address_key, preferred_address
+from dedup_errors import conflict, record_conflicts
+from households import resolve_households
+import queries
+
+
+def insert_beneficiary():
+    try:
+        conn = get_db()
+
+        # Fetch joined records
+        rows = queries.fetchall(conn, 'reconciliation.joined_people')
+        rows = [dict(row) for row in rows]
+        conflicts = []
+        # Evaluate and insert eligibility
+        for row in rows:
+            first_name = row['FirstName']
+            last_name = row['LastName']
+            dob = row['DOB']
+            existing = queries.fetchone(conn, 'reconciliation.beneficiary_by_person', (first_name, last_name, dob))
+            
+            if existing:
+                # Same person by name and DOB, but a different student
+                if row['SSID'] and existing['SSID'] and str(existing['SSID']) != str(row['SSID']):
+                    conflicts.append(conflict(
+                        'RECONCILIATION',
+                        f"Beneficiary {existing['BeneficiaryID']} ({first_name} {last_name}, {dob}) has SSID "
+                        f"{existing['SSID']}; CALPADS record has SSID {row['SSID']}",
+                        f"ssid:{existing['BeneficiaryID']}:{row['SSID']}",
+                        record_key=row['SSID'], matched_record=existing['BeneficiaryID'], row=row
+                    ))
+                continue
+            
+            address = preferred_address(row['CalsawsAddress'], row['CalpadsAddress'])
+            queries.execute(conn, 'reconciliation.insert_beneficiary',
+                            (row['SSID'], first_name, last_name, dob, address, address_key(address)))
+        
+        record_conflicts(conn, conflicts)
+        resolve_households(conn)
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print('Error fetching records:', e)
+        return jsonify({"error": "Failed to fetch records"}), 500
+
+def insert_case_benefit(status='pending'):
+    try:
+        conn = get_db()
+
+        # Fetch joined records
+        rows = queries.fetchall(conn, 'reconciliation.joined_cases')
+        rows = [dict(row) for row in rows]
+        conflicts = []
+
+        # Evaluate and insert eligibility
+        for row in rows:
+            beneficiary_id = row['BeneficiaryID']
+            if beneficiary_id == None:
+                continue
+            existing = queries.fetchone(conn, 'reconciliation.case_for_beneficiary', (beneficiary_id,))
+            
+            if existing:
+                reason = row['EligibilityReason']
+                if reason and existing['EligibilityReason'] and reason != existing['EligibilityReason']:
+                    conflicts.append(conflict(
+                        'RECONCILIATION',
+                        f"Case {existing['CaseID']} has eligibility reason {existing['EligibilityReason']}; "
+                        f"raw records give {reason}",
+                        f"reason:{existing['CaseID']}:{reason}",
+                        record_key=str(beneficiary_id), matched_record=existing['CaseID'], row=row
+                    ))
+                continue
+            
+            queries.execute(conn, 'reconciliation.insert_case', (
+                row['EligibilityReason'],
+                beneficiary_id,
+                str(beneficiary_id) + '-2025',
+                datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                status
+            ))
+        
+        record_conflicts(conn, conflicts)
+        conn.commit()
+        count = queries.fetchone(conn, 'reconciliation.case_count')[0]
+        print(count)
+        conn.close()
+    except Exception as e:
+        print('Error fetching records:', e)
+        return jsonify({"error": "Failed to fetch records"}), 500
+
+def reconcile_records(source, records, status='pending', update_existing=True):
+    """Refresh only the Beneficiary/CaseBenefit rows behind the given raw
+    records. records is [(key, previous raw row or None)]; the previous row
+    finds a beneficiary whose name or DOB just changed.
+
+    CDC imports update existing beneficiaries and cases in place. Append
+    imports pass update_existing=False: like insert_beneficiary and
+    insert_case_benefit, they only add what is missing and log mismatches
+    with existing records as conflicts."""
+    try:
+        conn = get_db()
+        lookup = 'reconciliation.person_by_ssid' if source.upper() == 'CALPADS' else 'reconciliation.person_by_case'
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conflicts = []
+
+        for key, previous in records:
+            for person in queries.fetchall(conn, lookup, (key,)):
+                identity = (person['FirstName'], person['LastName'], person['DOB'])
+                address = preferred_address(person['CalsawsAddress'], person['CalpadsAddress'])
+                found = None
+                if person['SSID']:
+                    found = queries.fetchone(conn, 'reconciliation.beneficiary_by_ssid', (person['SSID'],))
+                if found is None and previous is not None:
+                    found = queries.fetchone(conn, 'reconciliation.beneficiary_by_person',
+                                             (previous['FirstName'], previous['LastName'], previous['DOB']))
+                if found is None:
+                    found = queries.fetchone(conn, 'reconciliation.beneficiary_by_person', identity)
+
+                if found is None:
+                    beneficiary_id = queries.execute(conn, 'reconciliation.insert_beneficiary',
+                                                     (person['SSID'],) + identity + (address, address_key(address))).lastrowid
+                elif update_existing:
+                    beneficiary_id = found['BeneficiaryID']
+                    queries.execute(conn, 'reconciliation.update_beneficiary',
+                                    (person['SSID'],) + identity + (address, address_key(address), beneficiary_id))
+                else:
+                    beneficiary_id = found['BeneficiaryID']
+                    # Same person by name and DOB, but a different student
+                    if person['SSID'] and found['SSID'] and str(found['SSID']) != str(person['SSID']):
+                        first_name, last_name, dob = identity
+                        conflicts.append(conflict(
+                            'RECONCILIATION',
+                            f"Beneficiary {beneficiary_id} ({first_name} {last_name}, {dob}) has SSID "
+                            f"{found['SSID']}; CALPADS record has SSID {person['SSID']}",
+                            f"ssid:{beneficiary_id}:{person['SSID']}",
+                            record_key=person['SSID'], matched_record=beneficiary_id, row=dict(person)
+                        ))
+
+                case = queries.fetchone(conn, 'reconciliation.case_for_beneficiary', (beneficiary_id,))
+                if case is not None and update_existing:
+                    queries.execute(conn, 'reconciliation.update_case_reason',
+                                    (person['EligibilityReason'], now, beneficiary_id, person['EligibilityReason']))
+                elif case is not None:
+                    reason = person['EligibilityReason']
+                    if reason and case['EligibilityReason'] and reason != case['EligibilityReason']:
+                        conflicts.append(conflict(
+                            'RECONCILIATION',
+                            f"Case {case['CaseID']} has eligibility reason {case['EligibilityReason']}; "
+                            f"raw records give {reason}",
+                            f"reason:{case['CaseID']}:{reason}",
+                            record_key=str(beneficiary_id), matched_record=case['CaseID'], row=dict(person)
+                        ))
+                else:
+                    queries.execute(conn, 'reconciliation.insert_case', (
+                        person['EligibilityReason'],
+                        beneficiary_id,
+                        str(beneficiary_id) + '-2025',
+                        now,
+                        status
+                    ))
+
+        record_conflicts(conn, conflicts)
+        resolve_households(conn)
+        conn.commit()
+        conn.close()
+    except Exception as e:
+        print('Error reconciling records:', e)
+        return jsonify({"error": "Failed to reconcile records"}), 500
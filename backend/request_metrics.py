@@ -0,0 +1,142 @@
+"""Per-request timing and the sampling profiler.
+
+init_app() hooks every request: wall time, time spent in named queries (see
+queries.record), and request/response sizes go to metrics.request_stats and
+out on /metrics.
+
+The profiler is off by default. When a sample rate is set, that fraction of
+requests runs under cProfile and the stats are written to PROFILE_DIR as
+<endpoint>-<time>-<pid>-<id>.prof (open with `python -m pstats` or snakeviz).
+The rate is kept in a control file in PROFILE_DIR, so changing it through
+POST /api/profiling reaches every worker process, not just the one that
+served the request.
+"""
+import cProfile
+import os
+import random
+import threading
+import time
+import uuid
+
+from flask import current_app, g, request
+
+from metrics import request_stats
+
+CONTROL_FILE = 'sample_rate'
+CONTROL_CHECK_INTERVAL = 1.0  # seconds between checks of the control file
+
+
+class SamplingProfiler:
+    def __init__(self, output_dir, sample_rate=0.0):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.lock = threading.Lock()
+        self.control_mtime = None
+        self.next_check = 0.0
+        self.profiles_written = 0
+
+    @property
+    def control_path(self):
+        return os.path.join(self.output_dir, CONTROL_FILE)
+
+    def set_sample_rate(self, rate):
+        if not 0.0 <= rate <= 1.0:
+            raise ValueError('sample_rate must be between 0 and 1')
+        os.makedirs(self.output_dir, exist_ok=True)
+        tmp_path = f"{self.control_path}.{os.getpid()}"
+        with open(tmp_path, 'w') as f:
+            f.write(str(rate))
+        os.replace(tmp_path, self.control_path)
+        with self.lock:
+            self.sample_rate = rate
+            self.next_check = 0.0
+
+    def current_rate(self):
+        now = time.monotonic()
+        if now < self.next_check:
+            return self.sample_rate
+        with self.lock:
+            self.next_check = now + CONTROL_CHECK_INTERVAL
+            try:
+                mtime = os.stat(self.control_path).st_mtime
+                if mtime != self.control_mtime:
+                    with open(self.control_path) as f:
+                        self.sample_rate = float(f.read().strip() or 0)
+                    self.control_mtime = mtime
+            except (OSError, ValueError):
+                pass
+            return self.sample_rate
+
+    def start(self):
+        rate = self.current_rate()
+        if rate <= 0 or random.random() >= rate:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active (e.g. on Python 3.12+, where
+            # only one can run at a time); skip this sample
+            return None
+        return profile
+
+    def finish(self, profile, endpoint):
+        profile.disable()
+        os.makedirs(self.output_dir, exist_ok=True)
+        filename = '{}-{}-{}-{}.prof'.format(
+            (endpoint or 'unmatched').replace('.', '_'),
+            time.strftime('%Y%m%d-%H%M%S'),
+            os.getpid(),
+            uuid.uuid4().hex[:8]
+        )
+        profile.dump_stats(os.path.join(self.output_dir, filename))
+        self.profiles_written += 1
+
+    def status(self):
+        return {
+            'sample_rate': self.current_rate(),
+            'output_dir': os.path.abspath(self.output_dir),
+            'profiles_written': self.profiles_written
+        }
+
+
+def before_request():
+    g.request_started = time.perf_counter()
+    g.db_seconds = 0.0
+    g.profile = current_app.extensions['profiler'].start()
+
+
+def after_request(response):
+    profile = g.pop('profile', None)
+    if profile is not None:
+        current_app.extensions['profiler'].finish(profile, request.endpoint)
+
+    started = g.get('request_started')
+    if started is not None:
+        request_stats.record(
+            request.method,
+            request.endpoint or 'unmatched',
+            str(response.status_code),
+            time.perf_counter() - started,
+            g.get('db_seconds', 0.0),
+            request.content_length or 0,
+            response.calculate_content_length() or 0
+        )
+    return response
+
+
+def teardown_request(error=None):
+    # after_request is skipped if the response itself failed to build
+    profile = g.pop('profile', None)
+    if profile is not None:
+        profile.disable()
+
+
+def init_app(app):
+    app.extensions['profiler'] = SamplingProfiler(
+        app.config['PROFILE_DIR'],
+        app.config['PROFILE_SAMPLE_RATE']
+    )
+    app.before_request(before_request)
+    app.after_request(after_request)
+    app.teardown_request(teardown_request)
@@ -0,0 +1,114 @@
+"""Compare requests per second of the Werkzeug dev server and gunicorn.
+
+Starts each server on its own port against the same database, drives it with
+concurrent clients for a fixed duration and prints one line per server.
+
+    python backend/serving_benchmark.py --clients 32 --duration 10
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Mix of a cheap CPU-only route and two read routes
+DEFAULT_REQUESTS = [
+    ('POST', '/api/customer/am-i-eligible', {'household_size': 4, 'monthly_income': 2500}),
+    ('GET', '/api/cases', None),
+    ('GET', '/api/reports/summary', None),
+]
+
+
+def wait_until_up(base_url, timeout=15):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(base_url + '/api/reports/summary', timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {base_url} did not start")
+
+
+def send(base_url, method, path, body):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(req, timeout=30) as resp:
+        resp.read()
+
+
+def client_process(base_url, threads, stop_at):
+    counts = [0] * threads
+    errors = [0] * threads
+
+    def client(i):
+        n = i
+        while time.time() < stop_at:
+            method, path, body = DEFAULT_REQUESTS[n % len(DEFAULT_REQUESTS)]
+            n += 1
+            try:
+                send(base_url, method, path, body)
+                counts[i] += 1
+            except OSError:
+                errors[i] += 1
+
+    workers = [threading.Thread(target=client, args=(i,)) for i in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    return sum(counts), sum(errors)
+
+
+def drive(base_url, clients, duration):
+    # Clients are spread over processes so the load generator itself isn't
+    # limited to one core by the GIL
+    processes = min(clients, os.cpu_count() or 1)
+    stop_at = time.time() + duration
+    with multiprocessing.Pool(processes) as pool:
+        results = pool.starmap(client_process, [
+            (base_url, clients // processes + (1 if i < clients % processes else 0), stop_at)
+            for i in range(processes)
+        ])
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def run_server(name, command, port, clients, duration, env):
+    proc = subprocess.Popen(command, cwd=BACKEND_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        wait_until_up(base_url)
+        ok, failed = drive(base_url, clients, duration)
+    finally:
+        proc.terminate()
+        proc.wait()
+    print(f"{name:<10} {ok / duration:>10.1f} req/s  ({ok} ok, {failed} errors, {clients} clients)")
+    return ok / duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--workers', type=int, default=(os.cpu_count() or 1) * 2 + 1)
+    parser.add_argument('--threads', type=int, default=4)
+    args = parser.parse_args()
+
+    env = dict(os.environ, CALIEDU_WORKERS=str(args.workers), CALIEDU_THREADS=str(args.threads))
+
+    dev_command = [sys.executable, '-c',
+                   "from app import create_app; create_app().run(port=5101, threaded=True)"]
+    gunicorn_command = [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                        '--bind', '127.0.0.1:5102', 'wsgi:app']
+
+    baseline = run_server('dev', dev_command, 5101, args.clients, args.duration, env)
+    production = run_server('gunicorn', gunicorn_command, 5102, args.clients, args.duration, env)
+    print(f"speedup    {production / baseline:>10.2f}x")
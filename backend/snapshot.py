@@ -0,0 +1,144 @@
+"""Prebuilt database images.
+
+Building a database means running init_db.py and populate_dummy_data.py,
+which takes minutes with a large dataset. A snapshot does that once: the
+result is analyzed, VACUUMed into a single compact file and cached under a
+key derived from both scripts, the scale and the seed. Every later test run
+or container start clones the image instead, with a file copy or the SQLite
+backup API, in milliseconds. Editing either script changes the key, so a
+stale image is never reused.
+
+    python backend/snapshot.py build --scale 100
+    python backend/snapshot.py clone /tmp/test.db --scale 100
+
+The app clones one automatically when CALIEDU_SNAPSHOT_SCALE is set and
+CALIEDU_DB doesn't exist yet (see app.create_app).
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+INIT_DB_SCRIPT = os.path.join(ROOT_DIR, 'init_db.py')
+POPULATE_SCRIPT = os.path.join(ROOT_DIR, 'populate_dummy_data.py')
+SNAPSHOT_DIR = os.environ.get('CALIEDU_SNAPSHOT_DIR', os.path.join(ROOT_DIR, 'snapshots'))
+
+
+def snapshot_key(scale, seed):
+    digest = hashlib.sha1()
+    for path in (INIT_DB_SCRIPT, POPULATE_SCRIPT):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest.update(f"{scale}:{seed}".encode())
+    return digest.hexdigest()[:12]
+
+
+def snapshot_path(scale, seed, snapshot_dir=SNAPSHOT_DIR):
+    return os.path.join(snapshot_dir, f"caliedu-{snapshot_key(scale, seed)}.db")
+
+
+def build_snapshot(scale=0, seed=0, snapshot_dir=SNAPSHOT_DIR):
+    """Build the image for (scale, seed) unless it is already cached.
+
+    Scale 0 is the regular populate_dummy_data.py run; anything higher uses
+    its bulk mode at that scale. Returns the image path.
+    """
+    path = snapshot_path(scale, seed, snapshot_dir)
+    if os.path.exists(path):
+        return path
+
+    started = time.time()
+    os.makedirs(snapshot_dir, exist_ok=True)
+    build_dir = tempfile.mkdtemp(prefix='snapshot-', dir=snapshot_dir)
+    try:
+        # Both scripts write ./caliedu.db
+        subprocess.run([sys.executable, os.path.abspath(INIT_DB_SCRIPT)],
+                       cwd=build_dir, check=True, stdout=subprocess.DEVNULL)
+        populate = [sys.executable, os.path.abspath(POPULATE_SCRIPT), '--seed', str(seed)]
+        if scale:
+            populate += ['--bulk', '--scale', str(scale)]
+        subprocess.run(populate, cwd=build_dir, check=True, stdout=subprocess.DEVNULL)
+
+        db_path = os.path.join(build_dir, 'caliedu.db')
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("ANALYZE")
+        # One self-contained file: no -wal/-shm to copy alongside it
+        conn.execute("PRAGMA journal_mode=DELETE")
+        conn.execute("VACUUM")
+        conn.close()
+
+        with open(path + '.json', 'w') as f:
+            json.dump({
+                'scale': scale,
+                'seed': seed,
+                'built_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'build_seconds': round(time.time() - started, 3),
+                'size_bytes': os.path.getsize(db_path),
+            }, f, indent=2)
+        os.replace(db_path, path)
+    finally:
+        shutil.rmtree(build_dir, ignore_errors=True)
+    return path
+
+
+def clone_snapshot(dest, scale=0, seed=0, method='copy', snapshot_dir=SNAPSHOT_DIR):
+    """Replace dest with a copy of the (scale, seed) image, building it first
+    if needed.
+
+    'copy' is a plain file copy and the fastest. 'backup' goes through the
+    SQLite backup API, which is safe even if something has dest open.
+    """
+    source = build_snapshot(scale, seed, snapshot_dir)
+    dest = os.path.abspath(dest)
+    if method == 'copy':
+        tmp_path = f"{dest}.{os.getpid()}.tmp"
+        shutil.copyfile(source, tmp_path)
+        # A leftover WAL from an earlier database would be replayed into the copy
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(dest + suffix):
+                os.remove(dest + suffix)
+        os.replace(tmp_path, dest)
+    elif method == 'backup':
+        src = sqlite3.connect(source)
+        dst = sqlite3.connect(dest)
+        try:
+            src.backup(dst)
+        finally:
+            dst.close()
+            src.close()
+    else:
+        raise ValueError(f"Unknown clone method {method!r}")
+    return dest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=['build', 'clone', 'path'])
+    parser.add_argument('dest', nargs='?', help='clone: database file to create')
+    parser.add_argument('--scale', type=int, default=0, help='0 for the regular dummy data, N for bulk mode at scale N')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--method', choices=['copy', 'backup'], default='copy')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.command == 'path':
+        print(snapshot_path(args.scale, args.seed, args.snapshot_dir))
+    elif args.command == 'build':
+        print(build_snapshot(args.scale, args.seed, args.snapshot_dir))
+    else:
+        if not args.dest:
+            parser.error('clone needs a destination file')
+        clone_snapshot(args.dest, args.scale, args.seed, args.method, args.snapshot_dir)
+        print(f"{args.dest} ready in {(time.perf_counter() - started) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
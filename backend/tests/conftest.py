@@ -0,0 +1,37 @@
+"""Shared fixtures: a fresh database built by init_db.py and an app on it.
+
+Run from the repository root with:  python -m pytest backend/tests
+"""
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INIT_DB_SCRIPT = os.path.join(BACKEND_DIR, '..', 'init_db.py')
+
+# The backend modules import each other by bare name
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    subprocess.run([sys.executable, os.path.abspath(INIT_DB_SCRIPT)], cwd=tmp_path,
+                   check=True, stdout=subprocess.DEVNULL)
+    return str(tmp_path / 'caliedu.db')
+
+
+@pytest.fixture
+def db(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def client(db_path):
+    from app import create_app
+    return create_app({'DB_PATH': db_path}).test_client()
@@ -0,0 +1,112 @@
+"""Card numbers, block allocation and card replacement."""
+import sqlite3
+import threading
+
+import pytest
+
+from ebt_cards import (BLOCK_SIZE, CARD_NUMBER_LENGTH, ISSUER_PREFIX, MAX_REPLACEMENTS, CardNumberAllocator,
+                       ReplacementLimitError, format_card_number, is_valid_card_number, luhn_check_digit,
+                       replace_card)
+
+
+def test_luhn_check_digit_known_numbers():
+    # Standard test card numbers
+    assert luhn_check_digit('7992739871') == '3'
+    assert luhn_check_digit('411111111111111') == '1'
+
+
+def test_generated_numbers_pass_luhn(db_path):
+    allocator = CardNumberAllocator(db_path, block_size=10)
+    numbers = [allocator.next_number() for _ in range(25)] + allocator.take(40)
+    for number in numbers:
+        assert len(number) == CARD_NUMBER_LENGTH
+        assert number.startswith(ISSUER_PREFIX)
+        assert is_valid_card_number(number)
+    assert len(set(numbers)) == len(numbers)
+
+
+def test_single_digit_errors_fail_luhn():
+    number = format_card_number(12345)
+    for position in range(CARD_NUMBER_LENGTH):
+        digit = str((int(number[position]) + 1) % 10)
+        assert not is_valid_card_number(number[:position] + digit + number[position + 1:])
+
+
+def test_allocators_never_overlap(db_path):
+    first = CardNumberAllocator(db_path, block_size=7)
+    second = CardNumberAllocator(db_path, block_size=7)
+    drawn = {id(first): [], id(second): []}
+    for _ in range(5):
+        for allocator in (first, second):
+            drawn[id(allocator)].append(allocator.next_number())
+            drawn[id(allocator)].extend(allocator.take(11))
+
+    assert not set(drawn[id(first)]) & set(drawn[id(second)])
+
+
+def test_concurrent_allocators_never_overlap(db_path):
+    per_thread = BLOCK_SIZE // 4
+    results = []
+    barrier = threading.Barrier(4)
+
+    def draw():
+        allocator = CardNumberAllocator(db_path, block_size=50)
+        barrier.wait()
+        numbers = [allocator.next_number() for _ in range(per_thread)]
+        results.append(numbers)
+
+    threads = [threading.Thread(target=draw) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    numbers = [number for numbers in results for number in numbers]
+    assert len(numbers) == 4 * per_thread
+    assert len(set(numbers)) == len(numbers)
+
+
+@pytest.fixture
+def customer_id(db):
+    cursor = db.execute("""
+        INSERT INTO CustomerAccounts (Username, PasswordHash, Email, FirstName, LastName)
+        VALUES ('card-test', 'x', 'card-test@example.com', 'Rosa', 'Diaz')
+    """)
+    db.commit()
+    return cursor.lastrowid
+
+
+def test_concurrent_replacements_leave_one_current_card(db, db_path, customer_id):
+    allocator = CardNumberAllocator(db_path)
+    attempts = MAX_REPLACEMENTS + 5
+    outcomes = []
+    barrier = threading.Barrier(attempts)
+
+    def replace():
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        try:
+            barrier.wait()
+            outcomes.append(replace_card(conn, allocator, customer_id, 'Lost'))
+        except ReplacementLimitError as e:
+            outcomes.append(e)
+        finally:
+            conn.close()
+
+    threads = [threading.Thread(target=replace) for _ in range(attempts)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    issued = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+    assert len(outcomes) == attempts
+    assert sorted(card['replacement_count'] for card in issued) == list(range(1, MAX_REPLACEMENTS + 1))
+
+    cards = db.execute("SELECT CardNumber, Status, ReplacementCount FROM CustomerEBTCards WHERE CustomerID = ?",
+                       (customer_id,)).fetchall()
+    current = [card for card in cards if card['Status'] in ('Active', 'Processing')]
+    assert len(current) == 1
+    assert current[0]['ReplacementCount'] == MAX_REPLACEMENTS
+    assert len(cards) == MAX_REPLACEMENTS
+    assert all(is_valid_card_number(card['CardNumber']) for card in cards)
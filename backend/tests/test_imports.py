@@ -0,0 +1,92 @@
+"""The /api/import-data pipeline: append, CDC, manifests and conflicts."""
+import json
+
+from batch_import import run_import
+
+STUDENT = {
+    'SSID': 'T1001', 'FirstName': 'Ana', 'LastName': 'Reyes', 'DOB': '2012-04-01',
+    'Address': '12 Oak St, Fresno, CA', 'SchoolName': 'Lincoln Elementary', 'Grade': 5, 'MealStatus': 'Free',
+}
+
+
+def import_rows(client, rows, mode='append', source='CALPADS'):
+    response = client.post('/api/import-data', json={'source': source, 'data': rows, 'mode': mode})
+    assert response.status_code == 200, response.json
+    job = client.get(f"/api/import/{response.json['jobId']}").json
+    assert job['status'] == 'done', job
+    return job
+
+
+def manifest_count(db):
+    return db.execute("SELECT COUNT(*) FROM ImportManifests").fetchone()[0]
+
+
+def test_cdc_update_applies_only_changed_fields(client, db):
+    import_rows(client, [STUDENT])
+    job = import_rows(client, [dict(STUDENT, Grade=6, MealStatus='Reduced')], mode='cdc')
+
+    assert job['updatedRows'] == 1
+    stored = db.execute("SELECT * FROM RawCALPADS WHERE SSID = 'T1001'").fetchall()
+    assert len(stored) == 1
+    assert (stored[0]['Grade'], stored[0]['MealStatus']) == (6, 'Reduced')
+    assert stored[0]['SchoolName'] == 'Lincoln Elementary'
+
+    changes = client.get(f"/api/import/{job['jobId']}/changes").json['changes']
+    assert sorted((c['ChangeType'], c['FieldName'], c['OldValue'], c['NewValue']) for c in changes) == [
+        ('update', 'Grade', '5', '6'),
+        ('update', 'MealStatus', 'Free', 'Reduced'),
+    ]
+
+
+def test_cdc_insert_is_logged(client):
+    job = import_rows(client, [STUDENT], mode='cdc')
+
+    assert job['insertedRows'] == 1
+    changes = client.get(f"/api/import/{job['jobId']}/changes").json['changes']
+    assert [(c['ChangeType'], c['RowKey']) for c in changes] == [('insert', 'T1001')]
+
+
+def test_append_resubmission_short_circuits(client, db):
+    first = import_rows(client, [STUDENT])
+    again = import_rows(client, [STUDENT])
+
+    assert again['duplicateOf'] == first['jobId']
+    assert again['unchangedRows'] == 1
+    assert db.execute("SELECT COUNT(*) FROM RawCALPADS WHERE SSID = 'T1001'").fetchone()[0] == 1
+
+
+def test_conflicting_row_is_queued_and_blocks_manifest(client, db):
+    import_rows(client, [STUDENT])
+    manifests = manifest_count(db)
+
+    changed = dict(STUDENT, Grade=6)
+    job = import_rows(client, [changed])
+    assert job['skippedRows'] == 1
+    conflicts = db.execute(
+        "SELECT RecordKey FROM DeduplicationErrors WHERE Source = 'CALPADS' AND ConflictKey LIKE 'import:%'"
+    ).fetchall()
+    assert [row['RecordKey'] for row in conflicts] == ['T1001']
+    assert manifest_count(db) == manifests
+
+    # Not short-circuited: the same payload is probed again, and CDC applies it
+    again = import_rows(client, [changed])
+    assert again['duplicateOf'] is None and again['skippedRows'] == 1
+    applied = import_rows(client, [changed], mode='cdc')
+    assert applied['duplicateOf'] is None and applied['updatedRows'] == 1
+
+
+def test_batch_merge_conflict_blocks_manifest(client, db, db_path, tmp_path):
+    import_rows(client, [STUDENT])
+    manifests = manifest_count(db)
+    extract = tmp_path / 'CALPADS-extract.json'
+    extract.write_text(json.dumps({'source': 'CALPADS', 'data': [dict(STUDENT, Grade=6)]}))
+
+    assert run_import([str(extract)], db_path, workers=1)
+    assert manifest_count(db) == manifests
+    assert db.execute(
+        "SELECT COUNT(*) FROM DeduplicationErrors WHERE ConflictKey LIKE 'import:CALPADS:T1001:%'"
+    ).fetchone()[0] == 1
+
+    # The conflicting row must not count as unchanged afterwards
+    job = import_rows(client, [dict(STUDENT, Grade=6), dict(STUDENT, SSID='T1002', FirstName='Luz')])
+    assert job['unchangedRows'] == 0 and job['skippedRows'] == 1 and job['insertedRows'] == 1
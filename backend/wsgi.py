@@ -0,0 +1,19 @@
+"""Production WSGI entry point.
+
+    gunicorn -c backend/gunicorn.conf.py wsgi:app
+
+With preload_app on (the default in gunicorn.conf.py) this module is imported
+once in the master, so the blueprints, the income guideline tables and the
+modules the routes import lazily are loaded before the workers fork.
+"""
+from app import create_app
+
+
+def warm_up():
+    """Import what the routes otherwise pull in on first use."""
+    import pyotp  # noqa: F401
+    import qrcode  # noqa: F401
+
+
+app = create_app()
+warm_up()
@@ -1,3 +1,5 @@
+import hashlib
+import re
 import sqlite3
 
 conn = sqlite3.connect("caliedu.db")
@@ -91,6 +93,7 @@ c.execute("""CREATE TABLE IF NOT EXISTS EBTAccounts (
     Status NVARCHAR(50),
     BenefitBalance DECIMAL(10,2),
     ExpungementDate DATE,
+    CaseID NVARCHAR(50),
     FOREIGN KEY (EligibilityID) REFERENCES EligibilityRecords(EligibilityID)
 );
 """)
@@ -240,6 +243,54 @@ c.execute("""CREATE TABLE IF NOT EXISTS CaseBenefit (
     FOREIGN KEY (BeneficiaryID) REFERENCES Beneficiary(BeneficiaryID)
 );""")
 
+# One row per /api/import-data call; see backend/import_jobs.py
+c.execute("""CREATE TABLE IF NOT EXISTS ImportJobs (
+    JobID NVARCHAR(36) PRIMARY KEY,
+    Source NVARCHAR(20),
+    Status NVARCHAR(20) DEFAULT 'processing',
+    TotalRows INT DEFAULT 0,
+    InsertedRows INT DEFAULT 0,
+    SkippedRows INT DEFAULT 0,
+    ErrorCount INT DEFAULT 0,
+    ErrorSample TEXT,
+    CreatedAt DATETIME,
+    FinishedAt DATETIME,
+    DurationMs INT
+);""")
+c.execute("CREATE INDEX IF NOT EXISTS idx_importjobs_created ON ImportJobs (CreatedAt)")
+
+# Content hashes of imported payloads (backend/import_manifests.py). Only the
+# newest manifest per source keeps its per-row hashes.
+c.execute("""CREATE TABLE IF NOT EXISTS ImportManifests (
+    ManifestID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Source NVARCHAR(20),
+    PayloadHash CHAR(64),
+    JobID NVARCHAR(36),
+    RowCount INT,
+    CreatedAt DATETIME,
+    UNIQUE (Source, PayloadHash)
+);""")
+c.execute("""CREATE TABLE IF NOT EXISTS ImportManifestRows (
+    ManifestID INT,
+    RowKey NVARCHAR(50),
+    RowHash CHAR(64),
+    PRIMARY KEY (ManifestID, RowKey),
+    FOREIGN KEY (ManifestID) REFERENCES ImportManifests(ManifestID)
+);""")
+
+# Inserts and field-level updates made by CDC imports (backend/import_cdc.py)
+c.execute("""CREATE TABLE IF NOT EXISTS ImportChangeLog (
+    ChangeID INTEGER PRIMARY KEY AUTOINCREMENT,
+    JobID NVARCHAR(36),
+    Source NVARCHAR(20),
+    RowKey NVARCHAR(50),
+    ChangeType NVARCHAR(10), -- 'insert' or 'update'
+    FieldName NVARCHAR(100),
+    OldValue NVARCHAR(1000),
+    NewValue NVARCHAR(1000),
+    ChangedAt DATETIME
+);""")
+
     # Customer Accounts Table
 c.execute('''
     CREATE TABLE IF NOT EXISTS CustomerAccounts (
@@ -318,12 +369,32 @@ c.execute('''
         ReviewedDate DATETIME,
         ReviewNotes TEXT,
         ExpirationDate DATE,
+        DetectedMimeType NVARCHAR(100),
+        PageCount INT,
+        ThumbnailPath NVARCHAR(500),
         FOREIGN KEY (CustomerID) REFERENCES CustomerAccounts(CustomerID),
         FOREIGN KEY (ApplicationID) REFERENCES EligibilityApplications(ApplicationID),
         FOREIGN KEY (ReviewedBy) REFERENCES Users(UserID)
     );
     ''')
  
+    # Post-upload processing queue (see backend/document_worker.py)
+c.execute('''
+    CREATE TABLE IF NOT EXISTS DocumentJobs (
+        JobID INTEGER PRIMARY KEY AUTOINCREMENT,
+        DocumentID INT,
+        Status NVARCHAR(20) DEFAULT 'Queued',
+        Attempts INT DEFAULT 0,
+        LeaseOwner NVARCHAR(50),
+        LeaseExpires DATETIME,
+        LastError NVARCHAR(255),
+        CreatedAt DATETIME,
+        FinishedAt DATETIME,
+        FOREIGN KEY (DocumentID) REFERENCES CustomerDocuments(DocumentID)
+    );
+    ''')
+c.execute("CREATE INDEX IF NOT EXISTS idx_documentjobs_status ON DocumentJobs (Status, JobID)")
+ 
     # EBT Card Management
 c.execute('''
     CREATE TABLE IF NOT EXISTS CustomerEBTCards (
@@ -336,10 +407,19 @@ c.execute('''
         IssuedDate DATETIME DEFAULT CURRENT_TIMESTAMP,
         ReplacementReason NVARCHAR(50),
         ReplacementCount INT DEFAULT 0,
+        CaseID NVARCHAR(50),
         FOREIGN KEY (CustomerID) REFERENCES CustomerAccounts(CustomerID)
     );
     ''')
  
+    # Next unissued card sequence per issuer prefix (see backend/ebt_cards.py)
+c.execute('''
+    CREATE TABLE IF NOT EXISTS CardNumberSequence (
+        Prefix NVARCHAR(10) PRIMARY KEY,
+        NextValue INTEGER NOT NULL
+    );
+    ''')
+ 
     # Program Participation Preferences
 c.execute('''
     CREATE TABLE IF NOT EXISTS ProgramPreferences (
@@ -350,6 +430,7 @@ c.execute('''
         CommunicationMethod NVARCHAR(20) DEFAULT 'Email',
         LanguagePreference NVARCHAR(10) DEFAULT 'en',
         UpdatedDate DATETIME DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE (CustomerID, ProgramType),
         FOREIGN KEY (CustomerID) REFERENCES CustomerAccounts(CustomerID)
     );
     ''')
@@ -370,15 +451,209 @@ c.execute('''
     ''')
 
 
-c.execute("SELECT COUNT(*) FROM CaseBenefit")
-count = c.fetchone()[0]
-print(count)
-c.execute("SELECT * FROM CaseBenefit")
-columns = [desc[0] for desc in c.description]
-rows = c.fetchall()
+# Columns added after the first release; CREATE TABLE IF NOT EXISTS won't add
+# them to an existing database
+def add_column_if_missing(table, column, definition):
+    c.execute(f"PRAGMA table_info({table})")
+    if column not in [row[1] for row in c.fetchall()]:
+        c.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+add_column_if_missing('CustomerDocuments', 'DetectedMimeType', 'NVARCHAR(100)')
+add_column_if_missing('CustomerDocuments', 'PageCount', 'INT')
+add_column_if_missing('CustomerDocuments', 'ThumbnailPath', 'NVARCHAR(500)')
+add_column_if_missing('CustomerEBTCards', 'CaseID', 'NVARCHAR(50)')
+add_column_if_missing('EBTAccounts', 'CaseID', 'NVARCHAR(50)')
+add_column_if_missing('ImportJobs', 'UnchangedRows', 'INT DEFAULT 0')
+add_column_if_missing('ImportJobs', 'DuplicateOf', 'NVARCHAR(36)')
+add_column_if_missing('ImportJobs', 'UpdatedRows', 'INT DEFAULT 0')
+add_column_if_missing('RawCALPADS', 'RowHash', 'CHAR(64)')
+add_column_if_missing('RawCALSAWS', 'RowHash', 'CHAR(64)')
+add_column_if_missing('DeduplicationErrors', 'JobID', 'NVARCHAR(36)')
+add_column_if_missing('DeduplicationErrors', 'RowData', 'TEXT')
+add_column_if_missing('DeduplicationErrors', 'RecordKey', 'NVARCHAR(50)')
+add_column_if_missing('DeduplicationErrors', 'MatchedRecord', 'NVARCHAR(50)')
+add_column_if_missing('DeduplicationErrors', 'ConflictKey', 'NVARCHAR(200)')
+add_column_if_missing('Beneficiary', 'AddressKey', 'NVARCHAR(255)')
+add_column_if_missing('Households', 'AddressKey', 'NVARCHAR(255)')
+
+# Bulk card issuance (backend/card_issuance.py) scans eligible cases by CaseID
+# and probes for an existing card per case
+c.execute("CREATE INDEX IF NOT EXISTS idx_casebenefit_status ON CaseBenefit (Status, CaseID)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_customerebtcards_case ON CustomerEBTCards (CaseID)")
+
+# Imports probe the raw tables by source key; CDC imports also read the
+# change log back per job
+c.execute("CREATE INDEX IF NOT EXISTS idx_rawcalpads_ssid ON RawCALPADS (SSID)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_rawcalsaws_case ON RawCALSAWS (CaseNumber)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_importchangelog_job ON ImportChangeLog (JobID, ChangeID)")
+
+# Reconciliation probes for an existing beneficiary by person and for an
+# existing case by beneficiary once per raw row
+c.execute("CREATE INDEX IF NOT EXISTS idx_beneficiary_person ON Beneficiary (LastName, FirstName, DOB)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_casebenefit_beneficiary ON CaseBenefit (BeneficiaryID)")
+
+# Raw rows pair up with beneficiaries by person (FirstName, LastName, DOB):
+# the caseload export (backend/caseload_export.py) joins RawCALSAWS per
+# beneficiary that way, next to the CaseBenefit probe above
+c.execute("CREATE INDEX IF NOT EXISTS idx_rawcalpads_person ON RawCALPADS (LastName, FirstName, DOB)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_rawcalsaws_person ON RawCALSAWS (LastName, FirstName, DOB)")
+
+# Review queue for DeduplicationErrors (backend/dedup_errors.py): unreviewed
+# first, by source; ConflictKey keeps a conflict from being logged twice
+c.execute("CREATE INDEX IF NOT EXISTS idx_deduplicationerrors_review ON DeduplicationErrors (Reviewed, Source, ErrorID)")
+c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_deduplicationerrors_conflict ON DeduplicationErrors (ConflictKey)")
+
+# Household resolution finds unplaced beneficiaries and moves the members of
+# merged households
+c.execute("CREATE INDEX IF NOT EXISTS idx_beneficiary_household ON Beneficiary (HouseholdID)")
+
+# Normalized addresses (backend/addresses.py); household resolution looks
+# beneficiaries up by AddressKey
+c.execute("CREATE INDEX IF NOT EXISTS idx_beneficiary_addresskey ON Beneficiary (AddressKey)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_households_addresskey ON Households (AddressKey)")
+
+# Materialized caseload (backend/caseload_view.py): /api/results and
+# /api/cases read these tables, and the triggers below keep them in step with
+# the raw imports, LunchEligibilityStatus, CaseBenefit and Beneficiary
+caseload_exists = c.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'CaseloadResults'").fetchone()
+c.execute("""CREATE TABLE IF NOT EXISTS CaseloadResults (
+    SSID NVARCHAR(20),
+    FirstName NVARCHAR(100),
+    LastName NVARCHAR(100),
+    DOB DATE,
+    Address NVARCHAR(255),
+    MealStatus NVARCHAR(50),
+    CaseNumber NVARCHAR(50),
+    CALSAWS_ProgramType NVARCHAR(50),
+    IsEligible BOOLEAN,
+    Reason TEXT
+);""")
+c.execute("""CREATE TABLE IF NOT EXISTS CaseloadCases (
+    CaseID NVARCHAR(50) PRIMARY KEY,
+    BeneficiaryID INTEGER,
+    Name NVARCHAR(201),
+    Status NVARCHAR(10),
+    Created TIMESTAMP,
+    LastModified TIMESTAMP,
+    EligibilityReason NVARCHAR(255),
+    Documents INT,
+    Notes NVARCHAR(1000)
+);""")
+
+# The triggers recompute every CaseloadResults row for one person, finding
+# the raw rows through the person indexes above
+c.execute("CREATE INDEX IF NOT EXISTS idx_caseloadresults_person ON CaseloadResults (LastName, FirstName, DOB)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_caseloadresults_ssid ON CaseloadResults (SSID)")
+c.execute("CREATE INDEX IF NOT EXISTS idx_caseloadcases_beneficiary ON CaseloadCases (BeneficiaryID)")
+
+
+def refresh_person(row):
+    """Trigger statements recomputing the CaseloadResults rows of the person
+    in row (NEW or OLD): the FULL OUTER JOIN of /api/results, for one
+    person."""
+    person = f"FirstName IS {row}.FirstName AND {{0}}LastName IS {row}.LastName AND {{0}}DOB IS {row}.DOB"
+    return f"""
+        DELETE FROM CaseloadResults WHERE {person.format('')};
+        INSERT INTO CaseloadResults
+        SELECT p.SSID, p.FirstName, p.LastName, p.DOB, COALESCE(s.Address, p.Address), p.MealStatus,
+               s.CaseNumber, s.ProgramType, e.IsEligible, e.Reason
+        FROM RawCALPADS p
+        LEFT JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        LEFT JOIN LunchEligibilityStatus e ON p.SSID = e.SSID
+        WHERE p.{person.format('p.')};
+        INSERT INTO CaseloadResults
+        SELECT NULL, s.FirstName, s.LastName, s.DOB, s.Address, NULL, s.CaseNumber, s.ProgramType, NULL, NULL
+        FROM RawCALSAWS s
+        WHERE s.{person.format('s.')} AND NOT EXISTS (
+            SELECT 1 FROM RawCALPADS p WHERE p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        );"""
+
+
+def refresh_case(row):
+    return f"""
+        INSERT OR REPLACE INTO CaseloadCases
+        SELECT {row}.CaseID, {row}.BeneficiaryID,
+               (SELECT b.FirstName || ' ' || b.LastName FROM Beneficiary b WHERE b.BeneficiaryID = {row}.BeneficiaryID),
+               {row}.Status, {row}.Created, {row}.LastModified, {row}.EligibilityReason, {row}.Documents, {row}.Notes;"""
+
+
+def set_beneficiary_name(row, name):
+    return f"UPDATE CaseloadCases SET Name = {name} WHERE BeneficiaryID = {row}.BeneficiaryID;"
+
+
+caseload_triggers = {
+    'trg_caseload_rawcalpads_insert': ("AFTER INSERT ON RawCALPADS", refresh_person('NEW')),
+    'trg_caseload_rawcalpads_update': (
+        "AFTER UPDATE OF SSID, FirstName, LastName, DOB, Address, MealStatus ON RawCALPADS",
+        refresh_person('OLD') + refresh_person('NEW')),
+    'trg_caseload_rawcalpads_delete': ("AFTER DELETE ON RawCALPADS", refresh_person('OLD')),
+    'trg_caseload_rawcalsaws_insert': ("AFTER INSERT ON RawCALSAWS", refresh_person('NEW')),
+    'trg_caseload_rawcalsaws_update': (
+        "AFTER UPDATE OF CaseNumber, FirstName, LastName, DOB, Address, ProgramType ON RawCALSAWS",
+        refresh_person('OLD') + refresh_person('NEW')),
+    'trg_caseload_rawcalsaws_delete': ("AFTER DELETE ON RawCALSAWS", refresh_person('OLD')),
+    'trg_caseload_lunch_insert': ("AFTER INSERT ON LunchEligibilityStatus", """
+        UPDATE CaseloadResults SET IsEligible = NEW.IsEligible, Reason = NEW.Reason WHERE SSID = NEW.SSID;"""),
+    'trg_caseload_lunch_update': ("AFTER UPDATE ON LunchEligibilityStatus", """
+        UPDATE CaseloadResults SET IsEligible = NULL, Reason = NULL WHERE SSID = OLD.SSID;
+        UPDATE CaseloadResults SET IsEligible = NEW.IsEligible, Reason = NEW.Reason WHERE SSID = NEW.SSID;"""),
+    'trg_caseload_lunch_delete': ("AFTER DELETE ON LunchEligibilityStatus", """
+        UPDATE CaseloadResults SET IsEligible = NULL, Reason = NULL WHERE SSID = OLD.SSID;"""),
+    # INSERT OR REPLACE on CaseBenefit fires only the insert trigger
+    'trg_caseload_casebenefit_insert': ("AFTER INSERT ON CaseBenefit", refresh_case('NEW')),
+    'trg_caseload_casebenefit_update': ("AFTER UPDATE ON CaseBenefit", """
+        DELETE FROM CaseloadCases WHERE CaseID = OLD.CaseID;""" + refresh_case('NEW')),
+    'trg_caseload_casebenefit_delete': ("AFTER DELETE ON CaseBenefit", """
+        DELETE FROM CaseloadCases WHERE CaseID = OLD.CaseID;"""),
+    'trg_caseload_beneficiary_insert': (
+        "AFTER INSERT ON Beneficiary",
+        set_beneficiary_name('NEW', "NEW.FirstName || ' ' || NEW.LastName")),
+    'trg_caseload_beneficiary_update': (
+        "AFTER UPDATE OF BeneficiaryID, FirstName, LastName ON Beneficiary",
+        set_beneficiary_name('OLD', 'NULL') + set_beneficiary_name('NEW', "NEW.FirstName || ' ' || NEW.LastName")),
+    'trg_caseload_beneficiary_delete': ("AFTER DELETE ON Beneficiary", set_beneficiary_name('OLD', 'NULL')),
+}
+# Recreated every run so changes to the definitions above reach existing databases
+for name, (event, body) in caseload_triggers.items():
+    c.execute(f"DROP TRIGGER IF EXISTS {name}")
+    c.execute(f"CREATE TRIGGER {name} {event} FOR EACH ROW BEGIN {body}\nEND")
+
+if not caseload_exists:
+    c.execute("""
+        INSERT INTO CaseloadResults
+        SELECT p.SSID, COALESCE(p.FirstName, s.FirstName), COALESCE(p.LastName, s.LastName),
+               COALESCE(p.DOB, s.DOB), COALESCE(s.Address, p.Address), p.MealStatus, s.CaseNumber,
+               s.ProgramType, e.IsEligible, e.Reason
+        FROM RawCALPADS p
+        FULL OUTER JOIN RawCALSAWS s ON p.FirstName = s.FirstName AND p.LastName = s.LastName AND p.DOB = s.DOB
+        LEFT JOIN LunchEligibilityStatus e ON p.SSID = e.SSID
+    """)
+    c.execute("""
+        INSERT INTO CaseloadCases
+        SELECT c.CaseID, c.BeneficiaryID, b.FirstName || ' ' || b.LastName, c.Status, c.Created,
+               c.LastModified, c.EligibilityReason, c.Documents, c.Notes
+        FROM CaseBenefit c LEFT JOIN Beneficiary b ON c.BeneficiaryID = b.BeneficiaryID
+    """)
+
+# Older databases have ProgramPreferences without the unique key; keep the
+# newest row per (CustomerID, ProgramType) before adding it
+c.execute("""
+    DELETE FROM ProgramPreferences WHERE PreferenceID NOT IN (
+        SELECT MAX(PreferenceID) FROM ProgramPreferences GROUP BY CustomerID, ProgramType
+    )
+""")
+c.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_programpreferences_customer ON ProgramPreferences (CustomerID, ProgramType)")
+
+# Staff accounts seeded by older versions of populate_dummy_data.py store the
+# password as-is; login only accepts its SHA-256 hash (backend/auth.py)
+sha256_hex = re.compile(r'[0-9a-f]{64}')
+c.executemany("UPDATE Users SET PasswordHash = ? WHERE UserID = ?", [
+    (hashlib.sha256(password.encode()).hexdigest(), user_id)
+    for user_id, password in c.execute("SELECT UserID, PasswordHash FROM Users").fetchall()
+    if not sha256_hex.fullmatch(password)
+])
+
 
-"""for row in rows:
-    print(dict(zip(columns, row)))"""
 conn.commit()
 conn.close()
 
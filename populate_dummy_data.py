@@ -1,5 +1,10 @@
+import argparse
+import hashlib
+import multiprocessing
+import os
 import sqlite3
 import random
+import time
 from datetime import datetime, timedelta
 from faker import Faker
 import uuid
@@ -46,7 +51,8 @@ def populate_users():
         c.execute("""
             INSERT OR IGNORE INTO Users (UserID, Username, PasswordHash, Email, RoleID, MFAEnabled, LastLogin)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (user_id, username, password, email, role_id, mfa_enabled, last_login))
+        """, (user_id, username, hashlib.sha256(password.encode()).hexdigest(), email, role_id,
+              mfa_enabled, last_login))
     
     conn.commit()
     conn.close()
@@ -490,6 +496,372 @@ def populate_audit_logs_enhanced():
     conn.close()
     print("✅ Audit Logs Enhanced populated")
 
+
+# === Bulk mode ===
+# `python populate_dummy_data.py --bulk --scale 1000` writes 1000x the rows of
+# the default run (100k beneficiaries, ~1.6M rows in total). Instead of a Faker
+# call and an execute per row, names, addresses, dates and text are drawn from
+# pools built once, rows are made a batch at a time with random.choices and
+# written with executemany. Each large table is generated in its own process
+# into a staging database with journaling off; the staging databases are then
+# attached to caliedu.db and copied in, one journaled transaction per table.
+
+POOL_SIZE = 2000
+BATCH_SIZE = 10000
+
+# Rows per scale unit; scale 1 matches the default run
+BULK_COUNTS = {
+    'Households': 50,
+    'Beneficiary': 100,
+    'EligibilityRecords': 200,
+    'AuditLogs': 500,
+    'EBTAccounts': 100,
+    'BenefitIssuances': 150,
+    'Documents': 100,
+    'Comments': 80,
+    'Tasks': 80,
+    'DeduplicationErrors': 20,
+    'Communications': 100,
+    'AuditLogsEnhanced': 200,
+}
+
+PRIMARY_KEYS = {
+    'Households': 'HouseholdID',
+    'Beneficiary': 'BeneficiaryID',
+    'EligibilityRecords': 'EligibilityID',
+    'AuditLogs': 'LogID',
+    'EBTAccounts': 'EBTAccountID',
+    'BenefitIssuances': 'IssuanceID',
+    'Documents': 'DocumentID',
+    'Comments': 'CommentID',
+    'Tasks': 'TaskID',
+    'DeduplicationErrors': 'ErrorID',
+    'Communications': 'CommunicationID',
+    'AuditLogsEnhanced': 'LogID',
+}
+
+
+def build_pools(seed):
+    """Faker output to draw from; the only place bulk mode calls Faker."""
+    Faker.seed(seed)
+    f = Faker()
+    fmt_date = lambda d: d.strftime('%Y-%m-%d')
+    fmt_time = lambda d: d.strftime('%Y-%m-%d %H:%M:%S')
+    return {
+        'first_names': [f.first_name() for _ in range(POOL_SIZE)],
+        'last_names': [f.last_name() for _ in range(POOL_SIZE)],
+        'addresses': [f.address().replace('\n', ', ') for _ in range(POOL_SIZE)],
+        'birth_dates': [fmt_date(f.date_of_birth(minimum_age=0, maximum_age=80)) for _ in range(POOL_SIZE)],
+        'past_dates': [fmt_date(f.date_between(start_date='-1y', end_date='now')) for _ in range(POOL_SIZE)],
+        'issuance_dates': [fmt_date(f.date_between(start_date='-1y', end_date='+30d')) for _ in range(POOL_SIZE)],
+        'future_dates': [fmt_date(f.date_between(start_date='+1y', end_date='+3y')) for _ in range(POOL_SIZE)],
+        'due_dates': [fmt_date(f.date_between(start_date='-30d', end_date='+60d')) for _ in range(POOL_SIZE)],
+        'recent_times': [fmt_time(f.date_time_between(start_date='-90d', end_date='now')) for _ in range(POOL_SIZE)],
+        'past_times': [fmt_time(f.date_time_between(start_date='-1y', end_date='now')) for _ in range(POOL_SIZE)],
+        'sentences': [f.sentence(nb_words=5) for _ in range(POOL_SIZE)],
+        'texts': [f.text(max_nb_chars=200) for _ in range(POOL_SIZE)],
+        'words': [f.word() for _ in range(POOL_SIZE)],
+        'file_names': [f.file_name() for _ in range(POOL_SIZE)],
+        'card_numbers': [f.credit_card_number(card_type='visa') for _ in range(POOL_SIZE)],
+    }
+
+
+def id_range(offsets, counts, table):
+    """IDs of the rows this run adds to table, for foreign keys."""
+    return range(offsets[table] + 1, offsets[table] + counts[table] + 1)
+
+
+def amounts(rng, low, high, k):
+    return [round(rng.uniform(low, high), 2) for _ in range(k)]
+
+
+def bulk_households(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        [f"Household_{name}_{i}" for name, i in zip(rng.choices(pools['last_names'], k=k), ids)],
+        rng.choices(pools['addresses'], k=k),
+    ))
+
+
+def bulk_beneficiary(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(pools['first_names'], k=k),
+        rng.choices(pools['last_names'], k=k),
+        [str(n) for n in rng.choices(range(10000000, 100000000), k=k)],
+        rng.choices(pools['birth_dates'], k=k),
+        rng.choices(pools['addresses'], k=k),
+        [str(n) for n in rng.choices(id_range(offsets, counts, 'Households'), k=k)],
+    ))
+
+
+def bulk_eligibility_records(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'Beneficiary'), k=k),
+        rng.choices(['CalFresh', 'CalWORKs', 'Medi-Cal', 'WIC', 'Housing Assistance'], k=k),
+        amounts(rng, 50, 800, k),
+        rng.choices(pools['issuance_dates'], k=k),
+        rng.choices(['Approved', 'Pending', 'Denied', 'Under Review'], k=k),
+        rng.choices(id_range(offsets, counts, 'Households'), k=k),
+    ))
+
+
+def bulk_audit_logs(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(range(1, 6), k=k),
+        rng.choices(['LOGIN', 'LOGOUT', 'CREATE_CASE', 'UPDATE_CASE', 'DELETE_CASE', 'VIEW_REPORT'], k=k),
+        rng.choices(['Users', 'Beneficiary', 'EligibilityRecords', 'BenefitIssuances'], k=k),
+        rng.choices(id_range(offsets, counts, 'Beneficiary'), k=k),
+        rng.choices(pools['sentences'], k=k),
+        rng.choices(pools['sentences'], k=k),
+        rng.choices(pools['recent_times'], k=k),
+    ))
+
+
+def bulk_ebt_accounts(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'EligibilityRecords'), k=k),
+        rng.choices(pools['card_numbers'], k=k),
+        rng.choices(['Active', 'Inactive', 'Suspended', 'Closed'], k=k),
+        amounts(rng, 0, 500, k),
+        [d if keep else None for d, keep in zip(rng.choices(pools['future_dates'], k=k), rng.choices([True, False], k=k))],
+    ))
+
+
+def bulk_benefit_issuances(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'EligibilityRecords'), k=k),
+        rng.choices(pools['past_dates'], k=k),
+        amounts(rng, 25, 600, k),
+        rng.choices(['CalFresh', 'CalWORKs', 'Cash Aid', 'Emergency Food'], k=k),
+        rng.choices([0, 1], k=k),
+        rng.choices([0, 1], k=k),
+    ))
+
+
+def bulk_documents(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'EligibilityRecords'), k=k),
+        rng.choices(pools['file_names'], k=k),
+        rng.choices(['PDF', 'JPEG', 'PNG', 'DOC', 'TXT'], k=k),
+        rng.choices(range(1, 6), k=k),
+        rng.choices(pools['past_times'], k=k),
+    ))
+
+
+def bulk_comments(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'EligibilityRecords'), k=k),
+        rng.choices(range(1, 6), k=k),
+        rng.choices(pools['texts'], k=k),
+        rng.choices(pools['past_times'], k=k),
+    ))
+
+
+def bulk_tasks(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(range(1, 6), k=k),
+        rng.choices(range(1, 6), k=k),
+        rng.choices(['Review Application', 'Verify Documents', 'Process Renewal', 'Investigate Case'], k=k),
+        rng.choices(id_range(offsets, counts, 'Beneficiary'), k=k),
+        rng.choices(pools['due_dates'], k=k),
+        rng.choices(['Open', 'In Progress', 'Completed', 'Cancelled'], k=k),
+        rng.choices(pools['recent_times'], k=k),
+    ))
+
+
+def bulk_deduplication_errors(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(['CALPADS', 'CalSAWS'], k=k),
+        rng.choices(id_range(offsets, counts, 'Beneficiary'), k=k),
+        [f"Duplicate record found: {s}" for s in rng.choices(pools['sentences'], k=k)],
+        rng.choices([0, 1], k=k),
+        rng.choices(pools['recent_times'], k=k),
+    ))
+
+
+def bulk_communications(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(id_range(offsets, counts, 'EligibilityRecords'), k=k),
+        rng.choices(['Mail', 'Email', 'SMS'], k=k),
+        rng.choices(pools['texts'], k=k),
+        rng.choices(pools['past_times'], k=k),
+        rng.choices(range(1, 6), k=k),
+    ))
+
+
+def bulk_audit_logs_enhanced(rng, pools, ids, offsets, counts):
+    k = len(ids)
+    return list(zip(
+        ids,
+        rng.choices(range(1, 6), k=k),
+        rng.choices(['INSERT', 'UPDATE', 'DELETE', 'SELECT'], k=k),
+        rng.choices(['Users', 'Beneficiary', 'EligibilityRecords', 'BenefitIssuances'], k=k),
+        rng.choices(id_range(offsets, counts, 'Beneficiary'), k=k),
+        rng.choices(['FirstName', 'LastName', 'Status', 'Amount', 'Address'], k=k),
+        rng.choices(pools['words'], k=k),
+        rng.choices(pools['words'], k=k),
+        rng.choices(pools['recent_times'], k=k),
+    ))
+
+
+# table: (columns, batch generator)
+BULK_TABLES = {
+    'Households': (['HouseholdID', 'HouseholdName', 'Address'], bulk_households),
+    'Beneficiary': (['BeneficiaryID', 'FirstName', 'LastName', 'SSID', 'DOB', 'Address', 'HouseholdID'],
+                    bulk_beneficiary),
+    'EligibilityRecords': (['EligibilityID', 'ParticipantID', 'IssuanceType', 'IssuanceAmount', 'IssuanceDate',
+                            'ApprovalStatus', 'HouseholdID'], bulk_eligibility_records),
+    'AuditLogs': (['LogID', 'UserID', 'Action', 'TableAffected', 'RecordID', 'OldValue', 'NewValue', 'ActionDate'],
+                  bulk_audit_logs),
+    'EBTAccounts': (['EBTAccountID', 'EligibilityID', 'AccountNumber', 'Status', 'BenefitBalance', 'ExpungementDate'],
+                    bulk_ebt_accounts),
+    'BenefitIssuances': (['IssuanceID', 'EligibilityID', 'IssuanceDate', 'IssuanceAmount', 'IssuanceType',
+                          'IsReplacement', 'Approved'], bulk_benefit_issuances),
+    'Documents': (['DocumentID', 'EligibilityID', 'FileName', 'FileType', 'UploadedBy', 'UploadDate'], bulk_documents),
+    'Comments': (['CommentID', 'EligibilityID', 'UserID', 'CommentText', 'CreatedAt'], bulk_comments),
+    'Tasks': (['TaskID', 'AssignedTo', 'CreatedBy', 'TaskType', 'RelatedRecordID', 'DueDate', 'Status', 'CreatedAt'],
+              bulk_tasks),
+    'DeduplicationErrors': (['ErrorID', 'Source', 'RecordID', 'ErrorMessage', 'Reviewed', 'LoggedAt'],
+                            bulk_deduplication_errors),
+    'Communications': (['CommunicationID', 'EligibilityID', 'CommunicationType', 'Content', 'SentDate', 'SentBy'],
+                       bulk_communications),
+    'AuditLogsEnhanced': (['LogID', 'UserID', 'ActionType', 'TableName', 'RecordID', 'FieldName', 'OldValue',
+                           'NewValue', 'ActionDate'], bulk_audit_logs_enhanced),
+}
+
+
+def relaxed_connection(path):
+    conn = sqlite3.connect(path)
+    # Staging databases are deleted and regenerated if a load fails, so skip
+    # their rollback journal and fsyncs
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    return conn
+
+
+def write_staging_table(job):
+    """Worker: generate one table into its own staging database."""
+    table, create_sql, staging_path, offsets, counts, pools, seed = job
+    started = time.time()
+    columns, generate = BULK_TABLES[table]
+    rng = random.Random(f"{seed}-{table}")
+
+    conn = relaxed_connection(staging_path)
+    conn.execute(create_sql)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['?'] * len(columns))})"
+    first_id = offsets[table] + 1
+    last_id = offsets[table] + counts[table]
+    conn.execute("BEGIN")
+    for start in range(first_id, last_id + 1, BATCH_SIZE):
+        ids = range(start, min(start + BATCH_SIZE, last_id + 1))
+        conn.executemany(sql, generate(rng, pools, ids, offsets, counts))
+    conn.commit()
+    conn.close()
+    return table, counts[table], time.time() - started
+
+
+def merge_staging_tables(db_path, staged, offsets):
+    """Attach each staging database to caliedu.db and copy its table in.
+
+    caliedu.db keeps its journal, so a failed copy rolls back cleanly. ATTACH
+    can't run inside a transaction, so each table commits on its own; if a
+    later table fails, the rows already merged (ids above the offsets the
+    load started from) are deleted again, so a rerun doesn't stack new rows
+    on a half-merged load.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    merged = []
+    try:
+        for table, staging_path in staged:
+            columns = ', '.join(BULK_TABLES[table][0])
+            conn.execute("ATTACH DATABASE ? AS staging", (staging_path,))
+            try:
+                conn.execute("BEGIN")
+                conn.execute(f"INSERT INTO main.{table} ({columns}) SELECT {columns} FROM staging.{table}")
+                conn.commit()
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                conn.execute("DETACH DATABASE staging")
+            merged.append(table)
+    except Exception:
+        conn.execute("BEGIN")
+        for table in merged:
+            conn.execute(f"DELETE FROM {table} WHERE {PRIMARY_KEYS[table]} > ?", (offsets[table],))
+        conn.commit()
+        raise
+    finally:
+        conn.close()
+
+
+def populate_bulk(db_path='caliedu.db', scale=1000, workers=None, seed=0):
+    started = time.time()
+    # Lookup tables are tiny and referenced by ID; reuse the regular loaders
+    populate_roles()
+    populate_users()
+    populate_admin_users()
+    populate_system_configs()
+    populate_role_permissions()
+    populate_communication_templates()
+
+    counts = {table: n * scale for table, n in BULK_COUNTS.items()}
+    conn = sqlite3.connect(db_path)
+    # New rows go after whatever is already there
+    offsets = {
+        table: conn.execute(f"SELECT COALESCE(MAX({PRIMARY_KEYS[table]}), 0) FROM {table}").fetchone()[0]
+        for table in BULK_TABLES
+    }
+    create_sql = {
+        table: conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+        for table in BULK_TABLES
+    }
+    conn.close()
+
+    pools = build_pools(seed)
+    staging_dir = f"{db_path}.staging"
+    os.makedirs(staging_dir, exist_ok=True)
+    jobs = []
+    # Biggest tables first so the pool isn't left waiting on one straggler
+    for table in sorted(BULK_TABLES, key=lambda t: -counts[t]):
+        staging_path = os.path.join(staging_dir, f"{table}.db")
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        jobs.append((table, create_sql[table], staging_path, offsets, counts, pools, seed))
+
+    try:
+        with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+            for table, rows, seconds in pool.imap_unordered(write_staging_table, jobs):
+                print(f"✅ {table}: {rows} rows generated in {seconds:.1f}s")
+        merge_staging_tables(db_path, [(job[0], job[2]) for job in jobs], offsets)
+    finally:
+        for job in jobs:
+            if os.path.exists(job[2]):
+                os.remove(job[2])
+        os.rmdir(staging_dir)
+
+    print(f"\n🎉 {sum(counts.values())} rows added in {time.time() - started:.1f}s")
+
 def main():
     print("🚀 Starting to populate dummy data...")
     
@@ -538,4 +910,17 @@ def main():
         traceback.print_exc()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fill caliedu.db with dummy data")
+    parser.add_argument('--bulk', action='store_true', help='Generate a large dataset (see "Bulk mode")')
+    parser.add_argument('--scale', type=int, default=1000, help='Bulk mode: multiple of the default row counts')
+    parser.add_argument('--workers', type=int, help='Bulk mode: generator processes (default: CPU count)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Seeded so snapshot images (backend/snapshot.py) are reproducible
+    random.seed(args.seed)
+    Faker.seed(args.seed)
+    if args.bulk:
+        populate_bulk(scale=args.scale, workers=args.workers, seed=args.seed)
+    else:
+        main()
\ No newline at end of file